@@ -0,0 +1,4 @@
+"""Benchmarks for the to-do storage engines and the CLI.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
@@ -0,0 +1,52 @@
+"""Times encoding and decoding a synthetic database with each JSON codec.
+
+    python -m benchmarks.codec --size 100000
+
+Compares the standard library with orjson, when it is installed, in the
+pretty and compact formats, and reports the encoded size of each.
+"""
+import argparse
+import json
+import sys
+from typing import List
+from unittest.mock import patch
+
+from benchmarks.dataset import synthetic_todos
+from benchmarks.run import best_of
+from todocli import codec
+
+
+def time_codecs(size: int, repeat: int) -> dict:
+    todos = list(synthetic_todos(size))
+    backends = {"json": False}
+    try:
+        import orjson
+
+        backends["orjson"] = orjson
+    except ImportError:
+        pass
+    results = {}
+    for backend, module in backends.items():
+        with patch.object(codec, "_orjson", module):
+            for fmt in codec.FORMATS:
+                data = codec.dumps(todos, fmt)
+                results[f"{backend}_{fmt}"] = {
+                    "bytes": len(data),
+                    "dumps": best_of(lambda: codec.dumps(todos, fmt), repeat),
+                    "loads": best_of(lambda: codec.loads(data), repeat),
+                }
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    results = time_codecs(args.size, args.repeat)
+    print(json.dumps({"size": args.size, "results": results}, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Fast synthetic to-do datasets.
+
+``tests.helper.generate_todos`` asks Faker for every row, which takes
+minutes for a million todos. These are built from a fixed vocabulary and a
+seeded random generator instead, so the same size always gives the same
+database.
+"""
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from todocli.engines import get_engine
+
+WORDS = (
+    "buy call email fix write review plan book pay clean send read "
+    "update renew check cancel milk report invoice dentist car taxes "
+    "garden tickets slides budget backup printer meeting groceries"
+).split()
+FIRST_DUE = date(2024, 1, 1)
+DUE_DAYS = 3 * 365
+
+
+def synthetic_todos(
+    size: int, seed: int = 0, done_ratio: float = 0.2
+) -> Iterator[dict]:
+    """Yields ``size`` todos with IDs 1 to ``size``.
+
+    About a tenth of them have no due date.
+    """
+    rng = random.Random(seed)
+    days = [
+        (FIRST_DUE + timedelta(days)).strftime("%Y-%m-%d")
+        for days in range(DUE_DAYS)
+    ]
+    for todo_id in range(1, size + 1):
+        yield {
+            "ID": todo_id,
+            "Description": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))),
+            "Priority": rng.randint(1, 3),
+            "Due": rng.choice(days) if rng.random() > 0.1 else None,
+            "Done": rng.random() < done_ratio,
+        }
+
+
+def build_database(
+    db_path: Path,
+    size: int,
+    engine: str = "json",
+    seed: int = 0,
+    **options,
+):
+    """Creates a database of ``size`` synthetic todos and returns a manager.
+
+    The todos are added in a single transaction, so each engine stores
+    them the way it would after a bulk import.
+    """
+    manager_class = get_engine(engine)
+    manager_class.create(db_path)
+    manager = manager_class(db_path, **options)
+    done = []
+    with manager.transaction():
+        for todo in synthetic_todos(size, seed):
+            manager.add(todo["Description"], todo["Priority"], todo["Due"])
+            if todo["Done"]:
+                done.append(todo["ID"])
+        for todo_id in done:
+            manager.set_done(todo_id)
+    return manager
@@ -0,0 +1,201 @@
+"""Times manager operations and CLI commands across database sizes.
+
+    python -m benchmarks.run --sizes 1000,100000 --output results.json
+    python -m benchmarks.run --sizes 1000 --save-baseline
+
+Each result is the best of ``--repeat`` runs, in seconds. Results are
+compared against ``benchmarks/baseline.json`` and the run exits with status
+1 if any operation got more than ``--tolerance`` slower. Baselines are only
+meaningful on the machine that recorded them.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.dataset import build_database
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).with_name("baseline.json")
+DB_NAMES = {
+    "json": "todo.json",
+    "journal": "todo.journal",
+    "sqlite": "todo.db",
+    "binary": "todo.bin",
+    "fixed": "todo.fixed",
+}
+SORT_BY = "Priority,Due"
+CLI_COMMANDS = {
+    "cli_version": ["--version"],
+    "cli_add": ["add", "benchmark task", "--priority", "1"],
+    "cli_complete": ["complete", "1"],
+    "cli_list_top": ["list", "--sort-by", SORT_BY, "--top", "10"],
+    "cli_stats": ["stats", "--oneline"],
+}
+
+Results = Dict[str, Dict[str, float]]
+
+
+def best_of(
+    func: Callable[[], object],
+    repeat: int,
+    setup: Optional[Callable[[], object]] = None,
+) -> float:
+    """Returns the fastest of ``repeat`` runs of ``func``, each after an
+    untimed call of ``setup`` if it is given."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _write_config(directory: Path, db_path: Path, engine: str) -> Path:
+    config_path = directory / "config.ini"
+    config_path.write_text(
+        f"[General]\ndatabase = {db_path}\nengine = {engine}\n"
+    )
+    return config_path
+
+
+def _render_list(config_path: Path) -> Callable[[], object]:
+    """Runs ``list --sort-by`` in process, rendering included."""
+    from typer.testing import CliRunner
+
+    from todocli import cli, config
+
+    config.CONFIG_FILE_PATH = config_path
+    runner = CliRunner()
+    return lambda: runner.invoke(cli.app, ["list", "--sort-by", SORT_BY])
+
+
+def time_manager(
+    size: int, engine: str, repeat: int, directory: Path
+) -> Dict[str, float]:
+    db_path = directory / DB_NAMES[engine]
+    manager = build_database(db_path, size, engine)
+    ids: Iterator[int] = iter(range(1, size + 1))
+    timings = {
+        "add": best_of(lambda: manager.add("benchmark task", 2), repeat),
+        "set_done": best_of(lambda: manager.set_done(next(ids)), repeat),
+        "remove": best_of(lambda: manager.remove(next(ids)), repeat),
+        "read_todos": best_of(manager.read_todos, repeat),
+        # The first read builds the stored counts the later ones poll.
+        "read_stats": best_of(manager.read_stats, repeat),
+        "select_top": best_of(
+            lambda: manager.select_todos(SORT_BY.split(","), 0, 10), repeat
+        ),
+        "list_sort": best_of(
+            _render_list(_write_config(directory, db_path, engine)), repeat
+        ),
+    }
+    timings.update(time_cli(directory, repeat))
+    # A single clear varies too much to compare, so each run gets a fresh
+    # database to clear.
+    timings["clear"] = best_of(
+        manager.remove_all,
+        repeat,
+        setup=lambda: build_database(db_path, size, engine),
+    )
+    return timings
+
+
+def time_cli(directory: Path, repeat: int) -> Dict[str, float]:
+    """Times whole ``python -m todocli`` processes, startup included."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    timings = {}
+    for name, args in CLI_COMMANDS.items():
+        timings[name] = best_of(
+            lambda: subprocess.run(
+                [sys.executable, "-m", "todocli", *args],
+                cwd=directory,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            ),
+            repeat,
+        )
+    return timings
+
+
+def run(sizes: List[int], engine: str, repeat: int) -> dict:
+    results: Results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            results[str(size)] = time_manager(
+                size, engine, repeat, Path(directory)
+            )
+    return {
+        "meta": {
+            "engine": engine,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: Results, baseline: Results, tolerance: float
+) -> List[Tuple[str, str, float, float]]:
+    """Returns ``(size, operation, baseline, current)`` for each regression."""
+    regressions = []
+    for size, timings in results.items():
+        for operation, seconds in timings.items():
+            before = baseline.get(size, {}).get(operation)
+            if before is not None and seconds > before * (1 + tolerance):
+                regressions.append((size, operation, before, seconds))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="1000,100000")
+    parser.add_argument("--engine", default="json", choices=sorted(DB_NAMES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = run(sizes, args.engine, args.repeat)
+    text = json.dumps(report, indent=4)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        args.baseline.write_text(text + "\n")
+        return 0
+    if not args.baseline.exists():
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["meta"]["engine"] != args.engine:
+        print("Baseline was recorded for another engine", file=sys.stderr)
+        return 0
+    regressions = compare(
+        report["results"], baseline["results"], args.tolerance
+    )
+    for size, operation, before, seconds in regressions:
+        print(
+            f"{operation} at {size} todos: {before * 1000:.2f}ms -> "
+            f"{seconds * 1000:.2f}ms",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
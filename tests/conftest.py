@@ -14,3 +14,39 @@ def todo_manager(mock_json_file):
     mock_json_file.write_text("[]")
     todo_manager = tm.TodoManager(mock_json_file)
     yield todo_manager
+
+
+@pytest.fixture
+def journal_manager(tmp_path):
+    from todocli.journal import JournalTodoManager
+
+    db_file = tmp_path / "todo.journal"
+    JournalTodoManager.create(db_file)
+    yield JournalTodoManager(db_file)
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    from todocli.sqlite_manager import SQLiteTodoManager
+
+    db_file = tmp_path / "todo.db"
+    SQLiteTodoManager.create(db_file)
+    yield SQLiteTodoManager(db_file)
+
+
+@pytest.fixture
+def binary_manager(tmp_path):
+    from todocli.binary_manager import BinaryTodoManager
+
+    db_file = tmp_path / "todo.bin"
+    BinaryTodoManager.create(db_file)
+    yield BinaryTodoManager(db_file)
+
+
+@pytest.fixture
+def fixed_manager(tmp_path):
+    from todocli.fixed_manager import FixedTodoManager
+
+    db_file = tmp_path / "todo.fixed"
+    FixedTodoManager.create(db_file)
+    yield FixedTodoManager(db_file)
@@ -21,3 +21,18 @@ def generate_todos(num, include_due_date=True, **kwargs):
             "Done": False,
         }
         yield (todo_task, todo_priority, todo_due_date_str, return_todo)
+
+
+def add_todos(manager, num, done=(), **kwargs):
+    """Adds ``num`` generated todos through ``manager``, then completes the
+    ``done`` IDs among them, and returns the todos as they now stand."""
+    todos = []
+    for todo in generate_todos(num, **kwargs):
+        todo_task, todo_priority, todo_due_date_str, return_todo = todo
+        added = manager.add(todo_task, todo_priority, todo_due_date_str)
+        todos.append(dict(return_todo, ID=added.todo["ID"]))
+    for todo in todos:
+        if todo["ID"] in done:
+            manager.set_done(todo["ID"])
+            todo["Done"] = True
+    return todos
@@ -0,0 +1,170 @@
+"""Tests for archiving completed todos."""
+
+import json
+from datetime import date
+
+import pytest
+
+from todocli import archive
+from todocli import todo_manager as tm
+from todocli.archive import ArchivePolicy
+from todocli.return_codes import Code
+
+from .helper import add_todos
+
+DAY = date(2030, 1, 10)
+
+
+@pytest.mark.parametrize("compression", archive.COMPRESSIONS)
+def test_archive_done(todo_manager, compression):
+    db_path = todo_manager._db_path
+    todos = add_todos(todo_manager, 4, done=(1, 3))
+    moved = archive.archive_done(
+        todo_manager, db_path, ArchivePolicy(compression)
+    )
+    assert moved == tm.DBResponse([todos[0], todos[2]], Code.SUCCESS)
+    assert todo_manager.read_todos() == tm.DBResponse(
+        [todos[1], todos[3]], Code.SUCCESS
+    )
+    assert archive.archive_path(db_path, compression).exists()
+    assert list(archive.iter_archived(db_path)) == [todos[0], todos[2]]
+    assert todo_manager.add("task", 1).todo["ID"] == 5
+
+
+def test_archive_appends(todo_manager):
+    db_path = todo_manager._db_path
+    todos = add_todos(todo_manager, 2, done=(1,))
+    archive.archive_done(todo_manager, db_path)
+    todos[1] = todo_manager.set_done(2).todo
+    archive.archive_done(todo_manager, db_path)
+    assert list(archive.iter_archived(db_path)) == todos
+    assert todo_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_archive_before(todo_manager):
+    db_path = todo_manager._db_path
+    todos = add_todos(todo_manager, 3, done=(1, 2, 3))
+    archive.record_completions(db_path, [2], date(2030, 1, 1))
+    archive.record_completions(db_path, [3], DAY)
+    assert archive.archive_due(todo_manager, db_path, date(2030, 1, 1))
+    assert not archive.archive_due(todo_manager, db_path, date(2029, 12, 31))
+    moved, code = archive.archive_done(
+        todo_manager, db_path, before=date(2030, 1, 5)
+    )
+    # Todo 1 has no completion day, so it counts as done long ago.
+    assert moved == todos[:2]
+    assert archive.read_completions(db_path) == {3: "2030-01-10"}
+    assert not archive.archive_due(todo_manager, db_path, date(2030, 1, 5))
+
+
+def test_stale_completions_are_pruned(todo_manager):
+    db_path = todo_manager._db_path
+    add_todos(todo_manager, 3, done=(1, 3))
+    archive.record_completions(db_path, [1, 2, 3, 9], date(2030, 1, 1))
+    todo_manager.remove(1)
+    # Todo 1 is gone, 2 is open and 9 never existed.
+    assert archive.archive_due(todo_manager, db_path, date(2030, 1, 1))
+    assert archive.read_completions(db_path) == {3: "2030-01-01"}
+    todo_manager.remove(3)
+    assert not archive.archive_due(todo_manager, db_path, date(2030, 1, 1))
+    assert archive.read_completions(db_path) == {}
+
+
+def test_archive_nothing_due_skips_the_write(todo_manager, monkeypatch):
+    db_path = todo_manager._db_path
+    add_todos(todo_manager, 2, done=(2,))
+    archive.record_completions(db_path, [1, 2, 5], DAY)
+    writes = []
+    monkeypatch.setattr(
+        todo_manager, "_write_todos", lambda todos: writes.append(todos)
+    )
+    moved = archive.archive_done(
+        todo_manager, db_path, before=date(2030, 1, 1)
+    )
+    assert moved == tm.DBResponse([], Code.SUCCESS)
+    assert writes == []
+    assert archive.read_completions(db_path) == {2: "2030-01-10"}
+
+
+def test_forget_completions(tmp_path):
+    db_path = tmp_path / "todo.json"
+    archive.record_completions(db_path, [1, 2], DAY)
+    archive.record_completions(db_path, [3], date(2030, 1, 1))
+    archive.forget_completions(db_path, [2, 7])
+    assert archive.read_completions(db_path) == {1: str(DAY), 3: "2030-01-01"}
+    assert archive.completed_path(db_path).read_text().startswith("3 ")
+    archive.forget_completions(db_path)
+    assert archive.read_completions(db_path) == {}
+
+
+def test_paths_are_per_database(tmp_path):
+    json_path, bin_path = tmp_path / "todo.json", tmp_path / "todo.bin"
+    archive.record_completions(json_path, [1], DAY)
+    assert archive.read_completions(bin_path) == {}
+    assert archive.archive_path(json_path) != archive.archive_path(bin_path)
+    assert archive.completed_path(json_path).name.startswith(".")
+
+
+def test_archive_nothing_done(todo_manager):
+    db_path = todo_manager._db_path
+    add_todos(todo_manager, 2)
+    assert archive.archive_done(todo_manager, db_path) == tm.DBResponse(
+        [], Code.SUCCESS
+    )
+    assert list(archive.iter_archived(db_path)) == []
+
+
+def test_archive_read_error(todo_manager):
+    todo_manager._db_path.write_text("[{]")
+    assert archive.archive_done(
+        todo_manager, todo_manager._db_path
+    ) == tm.DBResponse([], Code.JSON_ERROR)
+
+
+def test_archive_write_error_keeps_todos(todo_manager):
+    db_path = todo_manager._db_path
+    todos = add_todos(todo_manager, 2, done=(1,))
+    archive.archive_path(db_path).mkdir()
+    assert archive.archive_done(todo_manager, db_path) == tm.DBResponse(
+        [], Code.DB_WRITE_ERROR
+    )
+    assert todo_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_archive_sqlite(sqlite_manager):
+    db_path = sqlite_manager._db_path
+    todos = add_todos(sqlite_manager, 3, done=(2,))
+    moved, code = archive.archive_done(sqlite_manager, db_path)
+    assert (moved, code) == ([todos[1]], Code.SUCCESS)
+    assert sqlite_manager.read_todos() == tm.DBResponse(
+        [todos[0], todos[2]], Code.SUCCESS
+    )
+
+
+def test_iter_archived_skips_torn_lines(tmp_path):
+    db_path = tmp_path / "todo.json"
+    todo = {"ID": 1, "Description": "a", "Priority": 1, "Due": None}
+    archive.archive_path(db_path, "none").write_bytes(
+        json.dumps(todo).encode() + b'\n{"ID": 2, "Descr'
+    )
+    assert list(archive.iter_archived(db_path)) == [{**todo, "Done": False}]
+
+
+def test_iter_archived_truncated_gzip(todo_manager):
+    db_path = todo_manager._db_path
+    add_todos(todo_manager, 1, done=(1,))
+    archive.archive_done(todo_manager, db_path)
+    path = archive.archive_path(db_path)
+    path.write_bytes(path.read_bytes()[:-4])
+    list(archive.iter_archived(db_path))
+
+
+def test_with_archived_skips_duplicates(todo_manager):
+    db_path = todo_manager._db_path
+    todos = add_todos(todo_manager, 2, done=(1,))
+    archive.archive_done(todo_manager, db_path)
+    archive.archive_path(db_path, "none").write_bytes(
+        b'{"ID": 2, "Description": "stale"}\n'
+    )
+    merged = archive.with_archived(todo_manager.iter_todos(), db_path)
+    assert list(merged) == [todos[1], todos[0]]
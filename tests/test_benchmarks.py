@@ -0,0 +1,41 @@
+"""Tests for the benchmark dataset generator and baseline comparison."""
+
+from datetime import datetime
+
+from benchmarks.codec import time_codecs
+from benchmarks.dataset import build_database, synthetic_todos
+from benchmarks.run import compare
+from todocli.return_codes import Code
+from todocli.todo_manager import DT_FORMAT
+
+
+def test_synthetic_todos_are_valid_and_repeatable():
+    todos = list(synthetic_todos(500, seed=1))
+    assert todos == list(synthetic_todos(500, seed=1))
+    assert [todo["ID"] for todo in todos] == list(range(1, 501))
+    for todo in todos:
+        assert todo["Description"]
+        assert todo["Priority"] in (1, 2, 3)
+        if todo["Due"] is not None:
+            datetime.strptime(todo["Due"], DT_FORMAT)
+    assert any(todo["Done"] for todo in todos)
+    assert any(todo["Due"] is None for todo in todos)
+
+
+def test_build_database(tmp_path):
+    manager = build_database(tmp_path / "todo.json", 50)
+    todos, code = manager.read_todos()
+    assert code == Code.SUCCESS
+    assert todos == list(synthetic_todos(50))
+
+
+def test_compare():
+    baseline = {"1000": {"add": 1.0, "clear": 1.0}}
+    results = {"1000": {"add": 1.2, "clear": 1.3, "new": 5.0}}
+    assert compare(results, baseline, 0.25) == [("1000", "clear", 1.0, 1.3)]
+
+
+def test_time_codecs():
+    results = time_codecs(20, 1)
+    assert {"json_pretty", "json_compact"} <= set(results)
+    assert results["json_compact"]["bytes"] < results["json_pretty"]["bytes"]
@@ -0,0 +1,109 @@
+"""Tests for `BinaryTodoManager` class."""
+
+import io
+import struct
+
+import pytest
+
+from todocli import binary_manager as bm
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.return_codes import Code
+
+from .helper import add_todos, generate_todos
+
+
+def test_binary_manager_creation(binary_manager):
+    assert isinstance(binary_manager, tm.TodoManager)
+    assert binary_manager._db_path.read_bytes() == bm.MAGIC
+    assert binary_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_add_writes_record(binary_manager):
+    binary_manager.add("café", 3, "2030-01-02")
+    data = binary_manager._db_path.read_bytes()
+    description = "café".encode()
+    assert (
+        data
+        == bm.MAGIC
+        + bm.RECORD.pack(len(description), 1, 3, 0, 741079)
+        + description
+    )
+
+
+def test_round_trip(binary_manager):
+    todos = add_todos(binary_manager, 5)
+    todos += add_todos(binary_manager, 2, include_due_date=False)
+    for todo_id, todo in enumerate(todos, start=1):
+        todo["ID"] = todo_id
+    done = binary_manager.set_done(2)
+    todos[1]["Done"] = True
+    assert done == CurrentTodo(todos[1], Code.SUCCESS)
+    assert binary_manager.remove(1) == CurrentTodo(todos.pop(0), Code.SUCCESS)
+    assert binary_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+    assert list(binary_manager.iter_todos()) == todos
+
+
+def test_ids_are_stable(binary_manager):
+    add_todos(binary_manager, 3)
+    binary_manager.remove(3)
+    assert list(binary_manager.iter_todos(include_removed=True))[-1] == 3
+    assert binary_manager.add("task", 1).todo["ID"] == 4
+
+
+def test_iter_entries_reads_in_chunks(binary_manager, monkeypatch):
+    monkeypatch.setattr(bm, "READ_CHUNK", 7)
+    todos = add_todos(binary_manager, 20)
+    assert list(binary_manager.iter_todos()) == todos
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"[]", bm.MAGIC + b"\x01", bm.MAGIC + bm.RECORD.pack(9, 1, 1, 0, 0)],
+)
+def test_invalid_file(binary_manager, data):
+    binary_manager._db_path.write_bytes(data)
+    assert binary_manager.read_todos() == tm.DBResponse([], Code.JSON_ERROR)
+    with pytest.raises(ValueError):
+        list(bm.iter_entries(io.BytesIO(data)))
+
+
+def test_missing_file(tmp_path):
+    binary_manager = bm.BinaryTodoManager(tmp_path / "todo.bin")
+    assert binary_manager.read_todos() == tm.DBResponse([], Code.DB_READ_ERROR)
+
+
+def test_priority_out_of_range(binary_manager):
+    assert binary_manager.add("task", 256) == CurrentTodo(
+        {}, Code.DB_WRITE_ERROR
+    )
+    assert binary_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+    with pytest.raises(struct.error):
+        list(
+            bm.iter_records(
+                [
+                    {
+                        "ID": 1,
+                        "Description": "task",
+                        "Priority": 256,
+                        "Due": None,
+                        "Done": False,
+                    }
+                ]
+            )
+        )
+
+
+def test_copy_from_json(todo_manager, binary_manager):
+    todos = []
+    for todo in generate_todos(3):
+        todos.append(todo_manager.add(*todo[:3]).todo)
+    todo_manager.remove(3)
+    assert todo_manager.copy_to(binary_manager) == Code.SUCCESS
+    assert binary_manager.read_todos() == tm.DBResponse(
+        todos[:2], Code.SUCCESS
+    )
+    assert binary_manager.copy_to(todo_manager) == Code.SUCCESS
+    assert todo_manager.read_todos(include_removed=True) == tm.DBResponse(
+        todos[:2] + [3], Code.SUCCESS
+    )
@@ -0,0 +1,125 @@
+"""Tests for the marshal cache of the parsed database."""
+
+import json
+import marshal
+import os
+from unittest.mock import patch
+
+from todocli import cache
+from todocli import todo_manager as tm
+from todocli.return_codes import Code
+from todocli.todo import Todo
+
+
+def _write_json(path, todos):
+    path.write_text(json.dumps(todos))
+
+
+def test_warm_read_skips_json(todo_manager):
+    todo = todo_manager.add("task", 1).todo
+    with patch("todocli.todo_manager.codec.loads") as mock_load:
+        assert todo_manager.read_todos() == tm.DBResponse([todo], Code.SUCCESS)
+        assert not mock_load.called
+
+
+def test_iter_todos_streams_past_cache(todo_manager):
+    todo = todo_manager.add("task", 1).todo
+    todo_manager.read_todos()
+    with patch("todocli.todo_manager.cache.load") as mock_load:
+        assert list(todo_manager.iter_todos()) == [todo]
+        assert not mock_load.called
+
+
+def test_select_page_uses_current_cache(todo_manager):
+    todos = [todo_manager.add(f"task {i}", 3 - i).todo for i in range(3)]
+    fresh = tm.TodoManager(todo_manager._db_path)
+    with patch.object(tm.TodoManager, "iter_todos") as mock_iter:
+        page = fresh.select_todos(["Priority"], limit=1)
+        assert page == tm.DBResponse([todos[2]], Code.SUCCESS)
+        assert not mock_iter.called
+    cache.cache_path(todo_manager._db_path).unlink()
+    fresh = tm.TodoManager(todo_manager._db_path)
+    with patch.object(
+        tm.TodoManager, "iter_todos", return_value=iter(todos)
+    ) as mock_iter:
+        assert fresh.select_todos(["Priority"], limit=1).todo_list == [
+            todos[2]
+        ]
+        assert mock_iter.called
+
+
+def test_cold_read_fills_cache(todo_manager, mock_json_file):
+    todos = [
+        {
+            "ID": 1,
+            "Description": "a",
+            "Priority": 1,
+            "Due": None,
+            "Done": False,
+        }
+    ]
+    _write_json(mock_json_file, todos)
+    assert not cache.cache_path(mock_json_file).exists()
+    assert todo_manager.read_todos().todo_list == todos
+    signature = cache.file_signature(mock_json_file)
+    assert cache.load(mock_json_file, signature) == todos
+
+
+def test_external_edit_invalidates(todo_manager, mock_json_file):
+    todo_manager.add("task", 1)
+    todos = [
+        {"ID": 7, "Description": "b", "Priority": 2, "Due": None, "Done": True}
+    ]
+    _write_json(mock_json_file, todos)
+    assert todo_manager.read_todos().todo_list == todos
+
+
+def test_touch_invalidates(todo_manager, mock_json_file):
+    todo_manager.add("task", 1)
+    stat = mock_json_file.stat()
+    os.utime(mock_json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with patch("todocli.todo_manager.codec.loads", return_value=[]) as load:
+        assert todo_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+        assert load.called
+
+
+def test_corrupt_cache_is_ignored(todo_manager, mock_json_file):
+    todo = todo_manager.add("task", 1).todo
+    cache.cache_path(mock_json_file).write_bytes(b"not marshal")
+    assert todo_manager.read_todos() == tm.DBResponse([todo], Code.SUCCESS)
+
+
+def test_other_version_is_ignored(mock_json_file):
+    _write_json(mock_json_file, [])
+    signature = cache.file_signature(mock_json_file)
+    cache.store(mock_json_file, signature, [])
+    assert cache.load(mock_json_file, signature) == []
+    with patch("todocli.cache.CACHE_VERSION", cache.CACHE_VERSION + 1):
+        assert cache.load(mock_json_file, signature) is None
+
+
+def test_todos_cached_as_rows(mock_json_file):
+    entry = {"ID": 1, "Description": "a", "Priority": 1, "Due": "2030-01-10"}
+    todos = [Todo.from_dict(entry), 2, Todo.from_dict({**entry, "ID": 3})]
+    _write_json(mock_json_file, [])
+    signature = cache.file_signature(mock_json_file)
+    cache.store(mock_json_file, signature, todos)
+    with cache.cache_path(mock_json_file).open("rb") as cached:
+        header, rows = marshal.load(cached), marshal.load(cached)
+    assert header == (cache.CACHE_VERSION, signature)
+    assert rows == [todos[0].as_tuple(), 2, todos[2].as_tuple()]
+    loaded = cache.load(mock_json_file, signature)
+    assert loaded == todos
+    assert isinstance(loaded[0], Todo)
+    assert loaded[0].Due is loaded[2].Due
+
+
+def test_is_current(mock_json_file):
+    _write_json(mock_json_file, [])
+    signature = cache.file_signature(mock_json_file)
+    assert not cache.is_current(mock_json_file, signature)
+    cache.store(mock_json_file, signature, [])
+    assert cache.is_current(mock_json_file, signature)
+    assert not cache.is_current(mock_json_file, (0, 0, 0))
+    cache.cache_path(mock_json_file).write_bytes(b"not marshal")
+    assert not cache.is_current(mock_json_file, signature)
@@ -1,5 +1,6 @@
 import configparser
 import json
+from datetime import date, timedelta
 from io import StringIO
 from unittest.mock import patch
 
@@ -8,9 +9,12 @@ from prettytable import PrettyTable
 from typer import Exit
 from typer.testing import CliRunner
 
-from todocli import __app_name__, __version__, cli, config
+from todocli import __app_name__, __version__, archive, cli, config
 from todocli import todo_manager as tm
+from todocli.journal import JournalTodoManager
 from todocli.return_codes import Code
+from todocli.sqlite_manager import SQLiteTodoManager
+from todocli.todo import Todo
 
 from .helper import generate_todos
 
@@ -63,6 +67,41 @@ def test_init(mock_json_file):
     assert cfg["General"]["database"] == str(mock_json_file)
 
 
+def test_init_format(tmp_path):
+    db_path = tmp_path / "todo.json"
+    result = runner.invoke(
+        cli.app, ["init", "--format", "compact"], input=f"{db_path}\n"
+    )
+    assert result.exit_code == 0
+    cli.get_todoer(use_daemon=False).add("task", 1)
+    assert "\n" not in db_path.read_text()
+
+
+def test_init_engine(tmp_path):
+    db_path = tmp_path / "todo.journal"
+    result = runner.invoke(
+        cli.app,
+        ["init"],
+        input=f"journal://{db_path}\n",
+    )
+    assert result.exit_code == 0
+    cfg = configparser.ConfigParser()
+    cfg.read(config.CONFIG_FILE_PATH)
+    assert cfg["General"]["database"] == str(db_path)
+    assert cfg["General"]["engine"] == "journal"
+    assert isinstance(cli.get_todoer(), JournalTodoManager)
+
+
+def test_init_unknown_engine(tmp_path):
+    result = runner.invoke(
+        cli.app,
+        ["init"],
+        input=f"nope://{tmp_path / 'todo.db'}\n",
+    )
+    assert result.exit_code == 1
+    assert Code.ENGINE_ERROR.value in result.stdout
+
+
 def test_init_invalid_filepath():
     result = runner.invoke(cli.app, ["init"], input="/\n")
     assert result.exit_code == 1
@@ -98,7 +137,7 @@ def test_add_todo(
         ],
     )
     read_todos, _ = todo_manager.read_todos()
-    assert read_todos == [return_todo]
+    assert read_todos == [dict(return_todo, ID=1)]
     assert result.exit_code == 0
 
 
@@ -160,7 +199,7 @@ def test_add_todo_priority_default(
     )
     return_todo["Priority"] = 2
     read_todos, _ = todo_manager.read_todos()
-    assert read_todos == [return_todo]
+    assert read_todos == [dict(return_todo, ID=1)]
     assert result.exit_code == 0
 
 
@@ -183,7 +222,7 @@ def test_add_todo_wo_due(
         ["add", todo_task, "--priority", todo_priority],
     )
     read_todos, _ = todo_manager.read_todos()
-    assert read_todos == [return_todo]
+    assert read_todos == [dict(return_todo, ID=1)]
     assert result.exit_code == 0
 
 
@@ -191,7 +230,7 @@ def test_add_todo_wo_due(
 def test_todo_saved_multiple(mock_get_todoer, todo_manager):
     expected_todos = []
     mock_get_todoer.return_value = todo_manager
-    for todo in generate_todos(10):
+    for todo_id, todo in enumerate(generate_todos(10), start=1):
         todo_task, todo_priority, todo_due_date_str, return_todo = todo
         runner.invoke(
             cli.app,
@@ -204,7 +243,7 @@ def test_todo_saved_multiple(mock_get_todoer, todo_manager):
                 todo_due_date_str,
             ],
         )
-        expected_todos.append(return_todo)
+        expected_todos.append(dict(return_todo, ID=todo_id))
     with todo_manager._db_path.open("r") as db:
         assert list(json.load(db)) == expected_todos
 
@@ -235,7 +274,7 @@ def test_add_todo_success_return(
         ],
     )
     read_todos, _ = todo_manager.read_todos()
-    assert read_todos == [return_todo]
+    assert read_todos == [dict(return_todo, ID=1)]
     assert result.exit_code == 0
     assert (
         f'to-do: "{todo_task}" was added with priority: {todo_priority}'
@@ -336,7 +375,7 @@ def test_set_done_todo(
     )
     read_todos, _ = todo_manager.read_todos()
     return_todo["Done"] = True
-    assert read_todos == [return_todo]
+    assert read_todos == [dict(return_todo, ID=1)]
     assert result.exit_code == 0
 
 
@@ -438,7 +477,9 @@ def test_set_done_todo_write_error_return(
     return_todo,
     todo_manager,
 ):
-    mock_read_todos.return_value = tm.DBResponse([return_todo], Code.SUCCESS)
+    mock_read_todos.return_value = tm.DBResponse(
+        [Todo.from_dict(return_todo, 1)], Code.SUCCESS
+    )
     mock_write_todos.return_value = tm.DBResponse([], Code.DB_WRITE_ERROR)
     mock_get_todoer.return_value = todo_manager
 
@@ -572,7 +613,9 @@ def test_remove_todo_write_error_return(
     return_todo,
     todo_manager,
 ):
-    mock_read_todos.return_value = tm.DBResponse([return_todo], Code.SUCCESS)
+    mock_read_todos.return_value = tm.DBResponse(
+        [Todo.from_dict(return_todo, 1)], Code.SUCCESS
+    )
     mock_write_todos.return_value = tm.DBResponse([], Code.DB_WRITE_ERROR)
     mock_get_todoer.return_value = todo_manager
 
@@ -732,27 +775,43 @@ def test_list_sucess_return(
     assert table.get_string() in result.stdout
 
 
+def _sorted_table(rows, key):
+    table = PrettyTable()
+    table.field_names = ["ID", "Description", "Priority", "Due", "Done"]
+    for row in sorted(rows, key=key):
+        table.add_row(row)
+    return table.get_string()
+
+
+def _due_last(row):
+    return (row[3] is None, row[3] or "")
+
+
 @patch("todocli.cli.get_todoer")
 @pytest.mark.parametrize(
-    "sort",
-    ["Description", "Priority", "Due", "Done"],
+    "sort,key",
+    [
+        ("Description", lambda row: row[1]),
+        ("Priority", lambda row: row[2]),
+        ("Due", _due_last),
+        ("Done", lambda row: row[4]),
+        ("Priority,Due", lambda row: (row[2], _due_last(row))),
+    ],
 )
-def test_list_sortby(mock_get_todoer, todo_manager, sort):
+def test_list_sortby(mock_get_todoer, todo_manager, sort, key):
     mock_get_todoer.return_value = todo_manager
-    table = PrettyTable()
-    table.field_names = ["ID", "Description", "Priority", "Due", "Done"]
+    rows = []
     for id, todo in enumerate(generate_todos(10), start=1):
         todo_task, todo_priority, todo_due_date_str, return_todo = todo
         todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-        table.add_row([id, todo_task, todo_priority, todo_due_date_str, False])
+        rows.append([id, todo_task, todo_priority, todo_due_date_str, False])
+    todo_manager.set_done(4)
+    rows[3][4] = True
     result = runner.invoke(
         cli.app,
         ["list", "--sort-by", sort],
     )
-    assert (
-        table.get_string(sortby=sort, sort_key=lambda x: str(x))
-        in result.stdout
-    )
+    assert _sorted_table(rows, key) in result.stdout
 
 
 @patch("todocli.cli.get_todoer")
@@ -846,19 +905,466 @@ def test_add_todo_w_invalid_due(
 @patch("todocli.cli.get_todoer")
 def test_list_sortby_due(mock_get_todoer, todo_manager):
     mock_get_todoer.return_value = todo_manager
-    table = PrettyTable()
-    table.field_names = ["ID", "Description", "Priority", "Due", "Done"]
+    rows = []
     for id, todo in enumerate(generate_todos(10), start=1):
         todo_task, todo_priority, todo_due_date_str, return_todo = todo
         if id % 2 == 0:
             todo_due_date_str = None
         todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-        table.add_row([id, todo_task, todo_priority, todo_due_date_str, False])
+        rows.append([id, todo_task, todo_priority, todo_due_date_str, False])
     result = runner.invoke(
         cli.app,
         ["list", "--sort-by", "Due"],
     )
+    assert _sorted_table(rows, _due_last) in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_list_sortby_invalid_field_in_list(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    result = runner.invoke(cli.app, ["list", "--sort-by", "Priority,Size"])
+    assert result.exit_code == 1
+    assert "'Size' is invalid" in result.stdout
+
+
+def test_init_sqlite(tmp_path):
+    db_path = tmp_path / "todo.db"
+    result = runner.invoke(cli.app, ["init"], input=f"sqlite://{db_path}\n")
+    assert result.exit_code == 0
+    todoer = cli.get_todoer()
+    assert isinstance(todoer, SQLiteTodoManager)
+    assert todoer.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+@patch("todocli.cli.get_todoer")
+def test_import_ndjson_stdin(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    rows = []
+    expected_todos = []
+    for todo_id, todo in enumerate(generate_todos(5), start=1):
+        todo_task, todo_priority, todo_due_date_str, return_todo = todo
+        rows.append(json.dumps(return_todo))
+        expected_todos.append(dict(return_todo, ID=todo_id))
+    result = runner.invoke(
+        cli.app, ["import", "--chunk-size", "2"], input="\n".join(rows)
+    )
+    assert result.exit_code == 0
+    assert "Imported 5 to-dos in" in result.stdout
+    assert "rows/s" in result.stdout
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == expected_todos
+
+
+@patch("todocli.cli.get_todoer")
+def test_import_csv_file(mock_get_todoer, todo_manager, tmp_path):
+    mock_get_todoer.return_value = todo_manager
+    source = tmp_path / "todos.csv"
+    source.write_text("Description,Priority,Due\nreport,1,2030-01-02\n")
+    result = runner.invoke(cli.app, ["import", str(source)])
+    assert result.exit_code == 0
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == [
+        {
+            "ID": 1,
+            "Description": "report",
+            "Priority": 1,
+            "Due": "2030-01-02",
+            "Done": False,
+        }
+    ]
+
+
+@patch("todocli.cli.get_todoer")
+def test_import_unpadded_due(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    rows = ['{"Description": "a", "Due": "2030-1-5"}', '{"Description": "b"}']
+    result = runner.invoke(cli.app, ["import"], input="\n".join(rows))
+    assert result.exit_code == 0
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos[0]["Due"] == "2030-01-05"
+    result = runner.invoke(cli.app, ["list", "--sort-by", "Due"])
+    assert result.exit_code == 0
+    assert "2030-01-05" in result.stdout
+    result = runner.invoke(cli.app, ["list", "--sort-by", "Due", "--top", "1"])
+    assert result.exit_code == 0
+    assert "2030-01-05" in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_import_invalid_row(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    rows = ['{"Description": "a"}', '{"Description": "b"}', '{"Priority": 1}']
+    result = runner.invoke(
+        cli.app, ["import", "--chunk-size", "2"], input="\n".join(rows)
+    )
+    assert result.exit_code == 1
+    assert (
+        "Importing to-dos failed at row 3: missing Description after 2"
+        in result.stdout
+    )
+    read_todos, _ = todo_manager.read_todos()
+    assert len(read_todos) == 2
+
+
+@patch("todocli.cli.get_todoer")
+def test_import_invalid_format(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    result = runner.invoke(cli.app, ["import", "--format", "xml"], input="")
+    assert result.exit_code == 1
+    assert "'xml' is invalid try:csv,ndjson" in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+@patch("todocli.todo_manager.TodoManager._write_todos")
+def test_import_write_error(mock_write_todos, mock_get_todoer, todo_manager):
+    mock_write_todos.return_value = tm.DBResponse([], Code.DB_WRITE_ERROR)
+    mock_get_todoer.return_value = todo_manager
+    result = runner.invoke(cli.app, ["import"], input='{"Description": "a"}')
+    assert result.exit_code == 1
     assert (
-        table.get_string(sortby="Due", sort_key=lambda x: str(x))
+        f'Importing to-dos failed with "{Code.DB_WRITE_ERROR.value}"'
         in result.stdout
     )
+
+
+@patch("todocli.cli.get_todoer")
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "csv"])
+def test_export(mock_get_todoer, todo_manager, fmt):
+    mock_get_todoer.return_value = todo_manager
+    for todo in generate_todos(3):
+        todo_task, todo_priority, todo_due_date_str, return_todo = todo
+        todo_manager.add(todo_task, todo_priority, todo_due_date_str)
+    todo_manager.remove(2)
+    result = runner.invoke(cli.app, ["export", "--format", fmt])
+    assert result.exit_code == 0
+    if fmt == "json":
+        exported = [todo["ID"] for todo in json.loads(result.stdout)]
+    elif fmt == "ndjson":
+        exported = [
+            json.loads(line)["ID"] for line in result.stdout.splitlines()
+        ]
+    else:
+        exported = [
+            int(line.split(",")[0]) for line in result.stdout.splitlines()[1:]
+        ]
+    assert exported == [1, 3]
+
+
+@patch("todocli.cli.get_todoer")
+def test_export_to_file(mock_get_todoer, todo_manager, tmp_path):
+    mock_get_todoer.return_value = todo_manager
+    todo_manager.add("task", 1)
+    output = tmp_path / "todos.ndjson"
+    result = runner.invoke(cli.app, ["export", "-o", str(output)])
+    assert result.exit_code == 0
+    assert json.loads(output.read_text())["Description"] == "task"
+
+
+@patch("todocli.cli.get_todoer")
+def test_export_invalid_format(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    result = runner.invoke(cli.app, ["export", "--format", "xml"])
+    assert result.exit_code == 1
+    assert "'xml' is invalid try:json,ndjson,csv" in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_export_invalid_json(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todo_manager._db_path.write_text("[{]")
+    result = runner.invoke(cli.app, ["export"])
+    assert result.exit_code == 1
+    assert (
+        f'Exporting to-dos failed with "{Code.JSON_ERROR.value}"'
+        in result.stdout
+    )
+
+
+def _list_table(todos):
+    table = PrettyTable()
+    table.field_names = ["ID", "Description", "Priority", "Due", "Done"]
+    for todo in todos:
+        table.add_row([todo[field] for field in table.field_names])
+    return table.get_string()
+
+
+@patch("todocli.cli.get_todoer")
+def test_list_limit_offset(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todos = [todo_manager.add(f"task {i}", 2).todo for i in range(5)]
+    result = runner.invoke(cli.app, ["list", "--limit", "2", "--offset", "1"])
+    assert result.exit_code == 0
+    assert _list_table(todos[1:3]) in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_list_top(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todos = [
+        todo_manager.add(f"task {i}", priority).todo
+        for i, priority in enumerate([3, 1, 2, 1])
+    ]
+    result = runner.invoke(cli.app, ["list", "--top", "2"])
+    assert result.exit_code == 0
+    assert _list_table([todos[1], todos[3]]) in result.stdout
+    result = runner.invoke(
+        cli.app, ["list", "--top", "1", "--sort-by", "Description"]
+    )
+    assert _list_table(todos[:1]) in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_list_offset_past_end(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todo_manager.add("task", 2)
+    result = runner.invoke(cli.app, ["list", "--offset", "1"])
+    assert result.exit_code == 1
+    assert "There are no tasks after the first 1" in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_list_page_invalid_json(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todo_manager._db_path.write_text("[{]")
+    result = runner.invoke(cli.app, ["list", "--limit", "1"])
+    assert result.exit_code == 1
+    assert (
+        f'Listing to-do failed with "{Code.JSON_ERROR.value}"' in result.stdout
+    )
+
+
+def test_db_convert(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    toder = cli.get_todoer(use_daemon=False)
+    todos = [toder.add(f"task {i}", 2, "2030-01-01").todo for i in range(3)]
+    toder.remove(3)
+    result = runner.invoke(cli.app, ["db", "convert", "--to", "binary"])
+    assert result.exit_code == 0
+    assert f'The to-do database is "{tmp_path / "todo.bin"}"' in result.stdout
+    assert config.get_db_engine() == "binary"
+    toder = cli.get_todoer(use_daemon=False)
+    assert toder.read_todos() == tm.DBResponse(todos[:2], Code.SUCCESS)
+    assert toder.add("task", 1).todo["ID"] == 4
+    result = runner.invoke(
+        cli.app, ["db", "convert", "--to", "json", "-o", str(db_path)]
+    )
+    assert result.exit_code == 0
+    assert config.get_db_engine() == "json"
+    assert len(json.loads(db_path.read_text())) == 4
+
+
+def test_db_convert_invalid(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    result = runner.invoke(cli.app, ["db", "convert", "--to", "csv"])
+    assert result.exit_code == 1
+    result = runner.invoke(cli.app, ["db", "convert", "--to", "json"])
+    assert result.exit_code == 1
+    assert f'Cannot convert "{db_path}" to json' in result.stdout
+
+
+def test_archive_and_list_archived(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    for i in range(3):
+        runner.invoke(cli.app, ["add", f"task {i}"])
+    runner.invoke(cli.app, ["complete", "2"])
+    result = runner.invoke(cli.app, ["archive", "--older-than", "1"])
+    assert "Archived 0 to-dos" in result.stdout
+    result = runner.invoke(cli.app, ["archive"])
+    assert result.exit_code == 0
+    assert f'Archived 1 to-dos to "{tmp_path / ".todo.json.archive.gz"}"' in (
+        result.stdout
+    )
+    result = runner.invoke(cli.app, ["list"])
+    assert "task 1" not in result.stdout
+    result = runner.invoke(
+        cli.app, ["list", "--include-archived", "--sort-by", "ID"]
+    )
+    todos = cli.get_todoer(use_daemon=False).read_todos().todo_list
+    todos.insert(1, {**todos[0], "ID": 2, "Description": "task 1"})
+    todos[1]["Done"] = True
+    assert _list_table(todos) in result.stdout
+
+
+def test_unknown_engine(tmp_path):
+    runner.invoke(cli.app, ["init"], input=f"{tmp_path / 'todo.json'}\n")
+    with config.CONFIG_FILE_PATH.open("a") as file:
+        file.write("engine = sqlit\n")
+    result = runner.invoke(cli.app, ["list"])
+    assert result.exit_code == 1
+    assert Code.ENGINE_ERROR.value in result.stdout
+
+
+def test_config_parsed_once(tmp_path):
+    runner.invoke(cli.app, ["init"], input=f"{tmp_path / 'todo.json'}\n")
+    with patch.object(
+        config.configparser.ConfigParser,
+        "read",
+        autospec=True,
+        side_effect=config.configparser.ConfigParser.read,
+    ) as mock_read:
+        result = runner.invoke(cli.app, ["add", "task"])
+    assert result.exit_code == 0
+    assert mock_read.call_count <= 1
+
+
+def test_auto_archive(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    with config.CONFIG_FILE_PATH.open("a") as file:
+        file.write("archive_after_days = 0\narchive_compression = none\n")
+    runner.invoke(cli.app, ["add", "task"])
+    result = runner.invoke(cli.app, ["complete", "1"])
+    assert result.exit_code == 0
+    assert (tmp_path / ".todo.json.archive").exists()
+    assert cli.get_todoer(use_daemon=False).read_todos().todo_list == []
+
+
+def test_remove_forgets_completion(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    for description in ("a", "b", "c"):
+        runner.invoke(cli.app, ["add", description])
+    runner.invoke(cli.app, ["complete", "--where", "priority = 2"])
+    assert runner.invoke(cli.app, ["remove", "1"]).exit_code == 0
+    assert archive.read_completions(db_path).keys() == {2, 3}
+    runner.invoke(cli.app, ["remove", "--where", "id = 2"])
+    assert archive.read_completions(db_path).keys() == {3}
+    runner.invoke(cli.app, ["clear"])
+    assert archive.read_completions(db_path) == {}
+
+
+def test_complete_where_keeps_completion_days(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    for description in ("a", "b"):
+        runner.invoke(cli.app, ["add", description])
+    runner.invoke(cli.app, ["complete", "--where", "id = 1"])
+    archive.record_completions(db_path, [1], date(2030, 1, 1))
+    result = runner.invoke(cli.app, ["complete", "--where", "priority = 2"])
+    assert "Completed 1 to-dos" in result.stdout
+    assert archive.read_completions(db_path) == {
+        1: "2030-01-01",
+        2: str(date.today()),
+    }
+
+
+def test_invalid_archive_setting(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    with config.CONFIG_FILE_PATH.open("a") as file:
+        file.write("archive_compression = zip\n")
+    result = runner.invoke(cli.app, ["archive"])
+    assert result.exit_code == 1
+    assert Code.ARCHIVE_ERROR.value in result.stdout
+
+
+def test_where(tmp_path):
+    db_path = tmp_path / "todo.json"
+    runner.invoke(cli.app, ["init"], input=f"{db_path}\n")
+    for priority in (1, 2, 3):
+        runner.invoke(
+            cli.app, ["add", f"task {priority}", "--priority", str(priority)]
+        )
+    result = runner.invoke(cli.app, ["complete", "--where", "priority < 3"])
+    assert result.exit_code == 0
+    assert "Completed 2 to-dos" in result.stdout
+    assert archive.read_completions(db_path).keys() == {1, 2}
+    result = runner.invoke(cli.app, ["list", "--where", "not done"])
+    todos = cli.get_todoer(use_daemon=False).read_todos().todo_list
+    assert _list_table(todos[2:]) in result.stdout
+    result = runner.invoke(cli.app, ["remove", "--where", "done"])
+    assert result.exit_code == 0
+    assert "Removed 2 to-dos" in result.stdout
+    result = runner.invoke(cli.app, ["list", "--where", "done"])
+    assert result.exit_code == 1
+    assert "There are no tasks matching --where" in result.stdout
+
+
+@pytest.mark.parametrize("command", ["list", "complete", "remove"])
+def test_where_invalid(tmp_path, command):
+    runner.invoke(cli.app, ["init"], input=f"{tmp_path / 'todo.json'}\n")
+    result = runner.invoke(cli.app, [command, "--where", "priority <"])
+    assert result.exit_code == 1
+    assert 'Invalid --where "priority <"' in result.stdout
+
+
+@pytest.mark.parametrize(
+    "args", [[], ["1", "--where", "done"], ["--where", "done", "--match", "x"]]
+)
+def test_complete_one_of(args):
+    result = runner.invoke(cli.app, ["complete", *args])
+    assert result.exit_code == 1
+    assert "Pass one of a to-do ID, --where or --match" in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_search(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    for description in ("Call the bank", "Write report", "The report"):
+        todo_manager.add(description, 2)
+    result = runner.invoke(cli.app, ["search", "the report"])
+    assert result.exit_code == 0
+    todos = todo_manager.read_todos().todo_list
+    assert _list_table(todos[2:]) in result.stdout
+    result = runner.invoke(cli.app, ["search", "invoice"])
+    assert result.exit_code == 1
+    assert 'There are no tasks matching "invoice"' in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_match(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    for description in ("Deploy prod", "Deploy staging", "Buy milk"):
+        todo_manager.add(description, 2)
+    result = runner.invoke(cli.app, ["complete", "--match", "deply prod"])
+    assert result.exit_code == 0
+    assert 'to-do: "Deploy prod" was completed' in result.stdout
+    result = runner.invoke(cli.app, ["remove", "--match", "by mlk"])
+    assert result.exit_code == 0
+    assert 'to-do: "Buy milk" was removed' in result.stdout
+    result = runner.invoke(cli.app, ["remove", "--match", "invoice"])
+    assert result.exit_code == 1
+    assert 'No to-do matches "invoice"' in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_match_ambiguous(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    todo_manager.add("Buy milk", 2)
+    todo_manager.add("Buy milk", 1)
+    result = runner.invoke(cli.app, ["complete", "--match", "buy milk"])
+    assert result.exit_code == 1
+    assert '"buy milk" matches to-dos 1 and 2 equally' in result.stdout
+
+
+@patch("todocli.cli.get_todoer")
+def test_stats(mock_get_todoer, todo_manager):
+    mock_get_todoer.return_value = todo_manager
+    today = date.today()
+    for days, priority in ((-3, 1), (0, 1), (6, 2), (7, 2), (None, 3)):
+        due = None if days is None else today + timedelta(days=days)
+        todo_manager.add("task", priority, due and due.strftime("%Y-%m-%d"))
+    todo_manager.set_done(2)
+    result = runner.invoke(cli.app, ["stats", "--oneline"])
+    assert result.exit_code == 0
+    assert result.stdout == "4 open, 1 done, 1 overdue, 1 due this week\n"
+    table = PrettyTable()
+    table.field_names = ["Priority", "Open", "Done"]
+    table.add_rows([[1, 1, 1], [2, 2, 0], [3, 1, 0]])
+    result = runner.invoke(cli.app, ["stats"])
+    assert result.exit_code == 0
+    assert result.stdout.startswith(table.get_string())
+
+
+@patch("todocli.cli.get_todoer")
+def test_stats_failed(mock_get_todoer):
+    mock_get_todoer.return_value.read_stats.return_value = (
+        None,
+        Code.DB_READ_ERROR,
+    )
+    result = runner.invoke(cli.app, ["stats"])
+    assert result.exit_code == 1
+    assert "Counting to-dos failed" in result.stdout
@@ -0,0 +1,54 @@
+"""Tests for the JSON codec layer."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from todocli import codec
+
+TODOS = [
+    {"ID": 1, "Description": "café", "Priority": 1, "Due": None},
+    2,
+    {"ID": 3, "Description": "b", "Priority": 3, "Due": "2030-01-01"},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield request.param
+        return
+    with patch("todocli.codec._orjson", False):
+        yield request.param
+
+
+@pytest.mark.parametrize("fmt", codec.FORMATS)
+def test_round_trip(backend, fmt):
+    assert codec.loads(codec.dumps(TODOS, fmt)) == TODOS
+    assert json.loads(codec.dumps(TODOS, fmt)) == TODOS
+
+
+def test_compact_is_smaller(backend):
+    compact = codec.dumps(TODOS, "compact")
+    assert b" " not in compact.replace(b'"Due"', b"")
+    assert b"\n" not in compact
+    assert len(compact) < len(codec.dumps(TODOS, "pretty"))
+
+
+def test_stdlib_pretty_keeps_four_space_indent():
+    with patch("todocli.codec._orjson", False):
+        assert codec.dumps(TODOS) == json.dumps(TODOS, indent=4).encode()
+
+
+def test_invalid_json(backend):
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b"[{]")
+
+
+@pytest.mark.parametrize("fmt", codec.FORMATS)
+@pytest.mark.parametrize("todos", [[], TODOS])
+def test_iter_array_matches_dumps(backend, fmt, todos):
+    chunks = codec.iter_array(iter(todos), fmt)
+    assert b"".join(chunks) == codec.dumps(todos, fmt)
@@ -3,7 +3,10 @@ import json
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from todocli import config
+from todocli.archive import ArchivePolicy
 from todocli.return_codes import Code
 
 
@@ -108,3 +111,123 @@ def test_init_database_wo_init():
 def test_get_db_path_wo_init(tmp_path):
     config.CONFIG_FILE_PATH = tmp_path / "config.ini"
     assert config.get_db_path() == Code.CONFIG_READ_ERROR
+
+
+def test_parse_db_url():
+    assert config.parse_db_url("todo.json") == ("json", Path("todo.json"))
+    assert config.parse_db_url("journal://todo.journal") == (
+        "journal",
+        Path("todo.journal"),
+    )
+    assert config.parse_db_url("journal:///tmp/todo.journal") == (
+        "journal",
+        Path("/tmp/todo.journal"),
+    )
+
+
+def test_init_app_engine(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    db_path = tmp_path / "todo.journal"
+    assert config.init_app(db_path, "journal") == Code.SUCCESS
+    assert config.get_db_engine() == "journal"
+    assert config.get_db_path() == db_path
+
+
+def test_init_app_unknown_engine(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    assert config.init_app(tmp_path / "todo.db", "nope") == Code.ENGINE_ERROR
+
+
+def test_default_engine(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    assert config.init_app(tmp_path / "todo.json") == Code.SUCCESS
+    assert config.get_db_engine() == "json"
+
+
+def test_durability_setting(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    db_path = tmp_path / "todo.json"
+    assert config.init_app(db_path, durability="always") == Code.SUCCESS
+    durability = config.get_durability()
+    assert durability.mode == "always"
+    assert durability.commits == config.BATCH_COMMITS
+
+
+def test_default_durability(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    assert config.init_app(tmp_path / "todo.json") == Code.SUCCESS
+    cfg = configparser.ConfigParser()
+    cfg.read(config.CONFIG_FILE_PATH)
+    assert "durability" not in cfg["General"]
+    assert config.get_durability().mode == "batch"
+
+
+def test_unknown_durability(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    db_path = tmp_path / "todo.json"
+    assert (
+        config.init_app(db_path, durability="never") == Code.DURABILITY_ERROR
+    )
+    config.CONFIG_FILE_PATH.write_text(
+        "[General]\ndatabase = todo.json\ndurability = never\n"
+    )
+    assert config.get_durability() == Code.DURABILITY_ERROR
+
+
+def test_format_setting(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    db_path = tmp_path / "todo.json"
+    assert config.init_app(db_path) == Code.SUCCESS
+    assert config.get_format() == "pretty"
+    assert config.init_app(db_path, fmt="compact") == Code.SUCCESS
+    assert config.get_format() == "compact"
+    assert config.init_app(db_path, fmt="yaml") == Code.FORMAT_ERROR
+    config.CONFIG_FILE_PATH.write_text(
+        "[General]\ndatabase = todo.json\nformat = yaml\n"
+    )
+    assert config.get_format() == Code.FORMAT_ERROR
+
+
+def test_set_database(tmp_path):
+    config.CONFIG_DIR_PATH = tmp_path
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    db_path = tmp_path / "todo.json"
+    assert config.init_app(db_path, fmt="compact") == Code.SUCCESS
+    assert config.set_database(tmp_path / "todo.bin", "binary") == (
+        Code.SUCCESS
+    )
+    assert config.get_db_path() == tmp_path / "todo.bin"
+    assert config.get_db_engine() == "binary"
+    assert config.get_format() == "compact"
+    assert config.set_database(db_path) == Code.SUCCESS
+    assert config.get_db_engine() == "json"
+    config.CONFIG_FILE_PATH.write_text("")
+    assert config.set_database(db_path) == Code.CONFIG_READ_ERROR
+
+
+@pytest.mark.parametrize(
+    "settings,policy",
+    [
+        ("", ArchivePolicy("gzip", None)),
+        (
+            "archive_compression = lzma\narchive_after_days = 30\n",
+            ArchivePolicy("lzma", 30),
+        ),
+        ("archive_compression = zip\n", Code.ARCHIVE_ERROR),
+        ("archive_after_days = soon\n", Code.ARCHIVE_ERROR),
+        ("archive_after_days = -1\n", Code.ARCHIVE_ERROR),
+    ],
+)
+def test_archive_policy(tmp_path, settings, policy):
+    config.CONFIG_FILE_PATH = tmp_path / "config.ini"
+    config.CONFIG_FILE_PATH.write_text(
+        f"[General]\ndatabase = todo.json\n{settings}"
+    )
+    assert config.get_archive_policy() == policy
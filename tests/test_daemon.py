@@ -0,0 +1,129 @@
+"""Tests for the resident daemon and its client."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from todocli import cli, config, daemon, server
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.return_codes import Code
+
+from .helper import generate_todos
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def running_server(todo_manager):
+    daemon_server = server.make_server(todo_manager, todo_manager._db_path)
+    thread = threading.Thread(target=daemon_server.serve_forever, args=(0.01,))
+    thread.start()
+    yield daemon_server
+    daemon_server.shutdown()
+    thread.join()
+    daemon_server.server_close()
+
+
+@pytest.fixture
+def client(running_server, todo_manager):
+    client = daemon.connect(todo_manager._db_path)
+    yield client
+    client.close()
+
+
+def test_client_matches_manager(client, mock_json_file):
+    direct = tm.TodoManager(mock_json_file)
+    todos = []
+    for todo in generate_todos(5):
+        todo_task, todo_priority, todo_due_date_str, return_todo = todo
+        added = client.add(todo_task, todo_priority, todo_due_date_str)
+        todos.append(dict(return_todo, ID=len(todos) + 1))
+        assert added == CurrentTodo(todos[-1], Code.SUCCESS)
+    todos[1]["Done"] = True
+    assert client.set_done(2) == CurrentTodo(todos[1], Code.SUCCESS)
+    assert client.remove(1) == CurrentTodo(todos.pop(0), Code.SUCCESS)
+    assert client.remove(1) == CurrentTodo({}, Code.ID_ERROR)
+    assert client.read_todos() == direct.read_todos()
+    assert client.select_todos(["Priority"], 1, 2) == direct.select_todos(
+        ["Priority"], 1, 2
+    )
+    assert list(client.iter_todos()) == todos
+    assert client.query_todos(done=True) == direct.query_todos(done=True)
+    assert client.search_todos("task", 1) == direct.search_todos("task", 1)
+    assert client.match_todos("tsak") == direct.match_todos("tsak")
+    counted, code = client.read_stats()
+    assert code == Code.SUCCESS
+    assert counted.as_json() == direct.read_stats().stats.as_json()
+    assert client.remove_all() == CurrentTodo({}, Code.SUCCESS)
+    assert client.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_reads_are_resident(client):
+    client.add("task", 1)
+    with patch("todocli.todo_manager.codec.loads") as mock_load:
+        assert client.read_todos().return_code == Code.SUCCESS
+        assert not mock_load.called
+
+
+def test_sees_writes_from_other_processes(client, mock_json_file):
+    client.add("task", 1)
+    tm.TodoManager(mock_json_file).add("other task", 2)
+    todos, code = client.read_todos()
+    assert code == Code.SUCCESS
+    assert [todo["Description"] for todo in todos] == ["task", "other task"]
+
+
+def test_unknown_op(client):
+    assert client._call("_write_todos", []) == {"code": Code.DAEMON_ERROR.name}
+
+
+def test_error_reply_is_a_code(client, todo_manager):
+    with patch.object(todo_manager, "add", side_effect=ValueError("bad todo")):
+        assert client.add("task", 1) == CurrentTodo({}, Code.DAEMON_ERROR)
+    with patch.object(
+        todo_manager, "read_stats", side_effect=TypeError("bad counts")
+    ):
+        assert client.read_stats().code == Code.DAEMON_ERROR
+    assert client.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+@patch("todocli.cli.get_todoer")
+def test_cli_reports_daemon_error(mock_get_todoer, client, todo_manager):
+    mock_get_todoer.return_value = client
+    with patch.object(todo_manager, "remove", side_effect=KeyError(1)):
+        result = runner.invoke(cli.app, ["remove", "1"])
+    assert result.exit_code == 1
+    assert Code.DAEMON_ERROR.value in result.stdout
+
+
+def test_second_daemon_refused(running_server, todo_manager):
+    with pytest.raises(OSError):
+        server.make_server(todo_manager, todo_manager._db_path)
+
+
+def test_connect_without_daemon(mock_json_file):
+    assert daemon.connect(mock_json_file) is None
+    daemon.socket_path(mock_json_file).write_text("")
+    assert daemon.connect(mock_json_file) is None
+
+
+def test_socket_removed_on_close(todo_manager, mock_json_file):
+    daemon_server = server.make_server(todo_manager, mock_json_file)
+    assert daemon.socket_path(mock_json_file).exists()
+    daemon_server.server_close()
+    assert not daemon.socket_path(mock_json_file).exists()
+
+
+@patch("todocli.config.get_db_path")
+def test_get_todoer_uses_daemon(
+    mock_get_db_path, running_server, mock_json_file, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(config, "CONFIG_FILE_PATH", tmp_path / "config.ini")
+    mock_get_db_path.return_value = mock_json_file
+    todoer = cli.get_todoer()
+    assert isinstance(todoer, daemon.DaemonClient)
+    todoer.close()
+    assert isinstance(cli.get_todoer(use_daemon=False), tm.TodoManager)
@@ -0,0 +1,74 @@
+"""Tests for atomic writes and the fsync policy."""
+
+from unittest.mock import patch
+
+import pytest
+
+from todocli.durability import Durability, atomic_open
+
+
+def test_atomic_open_replaces_file(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("old")
+    with atomic_open(path, Durability("none")) as file:
+        file.write("new")
+        assert path.read_text() == "old"
+    assert path.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["todo.json"]
+
+
+def test_atomic_open_removes_tmp_on_error(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_open(path, Durability("none")) as file:
+            file.write("partial")
+            raise RuntimeError
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["todo.json"]
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Durability("sometimes")
+
+
+@pytest.mark.parametrize("mode,fsyncs", [("always", 2), ("none", 0)])
+def test_fsync_per_write(tmp_path, mode, fsyncs):
+    with patch("todocli.durability.os.fsync") as mock_fsync:
+        with atomic_open(tmp_path / "todo.json", Durability(mode)) as file:
+            file.write("[]")
+    assert mock_fsync.call_count == fsyncs
+
+
+def test_batch_fsyncs_every_n_commits(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("[]")
+    durability = Durability("batch", interval_ms=60_000, commits=3)
+    with patch("todocli.durability.os.fsync") as mock_fsync:
+        for _ in range(2):
+            durability.committed(path)
+        assert mock_fsync.call_count == 0
+        durability.committed(path)
+        assert mock_fsync.call_count == 2
+        durability.flush()
+        assert mock_fsync.call_count == 2
+
+
+def test_batch_fsyncs_after_interval(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("[]")
+    durability = Durability("batch", interval_ms=0, commits=100)
+    with patch("todocli.durability.os.fsync") as mock_fsync:
+        durability.committed(path)
+    assert mock_fsync.call_count == 2
+
+
+def test_batch_flushes_pending_write(tmp_path):
+    path = tmp_path / "todo.json"
+    path.write_text("[]")
+    durability = Durability("batch", interval_ms=60_000, commits=100)
+    with patch("todocli.durability.os.fsync") as mock_fsync:
+        durability.committed(path)
+        durability.flush()
+    assert mock_fsync.call_count == 2
@@ -0,0 +1,96 @@
+"""Tests for `FixedTodoManager` class."""
+
+import pytest
+
+from todocli import fixed_manager as fm
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.return_codes import Code
+
+from .helper import add_todos
+
+
+def test_fixed_manager_creation(fixed_manager):
+    assert isinstance(fixed_manager, tm.TodoManager)
+    assert fixed_manager._db_path.read_bytes() == fm.HEADER.pack(fm.MAGIC, 0)
+    assert fixed_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_round_trip(fixed_manager):
+    todos = add_todos(fixed_manager, 5)
+    todos += add_todos(fixed_manager, 2, include_due_date=False)
+    assert fixed_manager.remove(1) == CurrentTodo(todos.pop(0), Code.SUCCESS)
+    assert fixed_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+    assert list(fixed_manager.iter_todos(include_removed=True)) == [
+        1,
+        *todos,
+    ]
+
+
+def test_set_done_in_place(fixed_manager):
+    todos = add_todos(fixed_manager, 3)
+    before = fixed_manager._db_path.stat()
+    todos[1]["Done"] = True
+    assert fixed_manager.set_done(2) == CurrentTodo(todos[1], Code.SUCCESS)
+    after = fixed_manager._db_path.stat()
+    assert after.st_ino == before.st_ino
+    assert after.st_size == before.st_size
+    assert fixed_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+    assert not list(fixed_manager._db_path.parent.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("todo_id", [0, 2, 4])
+def test_set_done_unknown_id(fixed_manager, todo_id):
+    add_todos(fixed_manager, 3)
+    fixed_manager.remove(2)
+    assert fixed_manager.set_done(todo_id) == CurrentTodo({}, Code.ID_ERROR)
+
+
+def test_set_done_in_transaction(fixed_manager):
+    todos = add_todos(fixed_manager, 2)
+    with fixed_manager.transaction() as batch:
+        fixed_manager.set_done(1)
+        todos.append(fixed_manager.add("task", 1).todo)
+    assert batch.code == Code.SUCCESS
+    todos[0]["Done"] = True
+    assert fixed_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_set_done_refreshes_resident_copy(fixed_manager):
+    add_todos(fixed_manager, 2)
+    fixed_manager.resident = True
+    fixed_manager.read_todos()
+    fixed_manager.set_done(1)
+    todos, _ = fixed_manager.read_todos()
+    assert todos[0]["Done"]
+
+
+def test_iter_todos_in_blocks(fixed_manager, monkeypatch):
+    monkeypatch.setattr(fm, "BLOCK_RECORDS", 2)
+    todos = add_todos(fixed_manager, 7)
+    with fixed_manager.transaction():
+        for todo_id in (1, 2, 5):
+            fixed_manager.remove(todo_id)
+    live = [todo for todo in todos if todo["ID"] not in (1, 2, 5)]
+    assert list(fixed_manager.iter_todos()) == live
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"TODOBIN1",
+        fm.HEADER.pack(fm.MAGIC, 1),
+        fm.HEADER.pack(fm.MAGIC, 1) + fm.RECORD.pack(1, 1, 0, 0, 0, 9),
+    ],
+)
+def test_invalid_file(fixed_manager, data):
+    fixed_manager._db_path.write_bytes(data)
+    assert fixed_manager.read_todos() == tm.DBResponse([], Code.JSON_ERROR)
+    assert fixed_manager.set_done(1) == CurrentTodo({}, Code.JSON_ERROR)
+
+
+def test_missing_file(tmp_path):
+    fixed_manager = fm.FixedTodoManager(tmp_path / "todo.fixed")
+    assert fixed_manager.read_todos() == tm.DBResponse([], Code.DB_READ_ERROR)
+    assert fixed_manager.set_done(1) == CurrentTodo({}, Code.DB_WRITE_ERROR)
@@ -0,0 +1,127 @@
+"""Tests for the trigram index and typo-tolerant matching."""
+
+import pytest
+
+from todocli import fuzzy
+from todocli import todo_manager as tm
+from todocli.cache import file_signature
+from todocli.fuzzy import TrigramIndex
+from todocli.return_codes import Code
+
+DESCRIPTIONS = [
+    "Deploy prod release",
+    "Deploy staging",
+    "Buy milk",
+    "Book dentist",
+    "Review deploy plan",
+]
+
+
+def _todos():
+    return [
+        {
+            "ID": todo_id,
+            "Description": description,
+            "Priority": 1,
+            "Due": None,
+            "Done": False,
+        }
+        for todo_id, description in enumerate(DESCRIPTIONS, start=1)
+    ]
+
+
+def test_trigrams():
+    assert fuzzy.trigrams("Go, go!") == {"  g", " go", "go "}
+    assert fuzzy.trigrams("...") == set()
+
+
+@pytest.mark.parametrize(
+    "first, second, expected",
+    [
+        ("", "", 0),
+        ("deploy", "deploy", 0),
+        ("deply", "deploy", 1),
+        ("kitten", "sitting", 3),
+        ("", "abc", 3),
+    ],
+)
+def test_distance(first, second, expected):
+    assert fuzzy.distance(first, second) == expected
+    assert fuzzy.distance(second, first) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("deply prod", [1, 5]),
+        ("Deploy", [2, 5, 1]),
+        ("deploy staging", [2, 5]),
+        ("by mlk", [3]),
+        ("dentst", [4]),
+        ("invoice", []),
+        ("!", []),
+    ],
+)
+def test_closest(text, expected):
+    closest = fuzzy.closest(_todos(), text)
+    assert [todo["ID"] for todo in closest] == expected
+
+
+def test_lookup_shortlists_shared_trigrams(monkeypatch):
+    monkeypatch.setattr(fuzzy, "SHORTLIST", 2)
+    index = TrigramIndex.build(_todos())
+    assert index.lookup(fuzzy.trigrams("deply prod")) == [1, 5]
+    assert index.lookup(fuzzy.trigrams("xyz")) == []
+
+
+def test_store_load_and_restamp(tmp_path):
+    db_path = tmp_path / "todo.json"
+    db_path.write_text("[]")
+    signature = file_signature(db_path)
+    stored = TrigramIndex.build(_todos())
+    fuzzy.store(db_path, signature, stored)
+    loaded = fuzzy.load(db_path, signature)
+    assert loaded.all_postings() == stored.all_postings()
+    loaded.remove(_todos()[0])
+    assert loaded.lookup({" pr", "rod"}) == []
+    assert fuzzy.load(db_path, (0, 0, 0)) is None
+    fuzzy.restamp(db_path, signature, (1, 2, 3))
+    assert fuzzy.load(db_path, signature) is None
+    assert fuzzy.load(db_path, (1, 2, 3)).all_postings() == (
+        stored.all_postings()
+    )
+    fuzzy.trigram_path(db_path).write_bytes(b"junk")
+    assert fuzzy.load(db_path, (1, 2, 3)) is None
+
+
+@pytest.mark.parametrize(
+    "engine",
+    ["todo_manager", "journal_manager", "fixed_manager", "sqlite_manager"],
+)
+def test_match_todos(request, engine):
+    manager = request.getfixturevalue(engine)
+    todos = [manager.add(description, 1).todo for description in DESCRIPTIONS]
+    assert manager.match_todos("deply prod") == tm.DBResponse(
+        [todos[0], todos[4]], Code.SUCCESS
+    )
+    assert manager.match_todos("deploy", 2) == tm.DBResponse(
+        [todos[1], todos[4]], Code.SUCCESS
+    )
+    assert manager.match_todos("!") == tm.DBResponse([], Code.SUCCESS)
+
+
+@pytest.mark.parametrize("engine", ["todo_manager", "fixed_manager"])
+def test_writes_update_trigram_index(request, engine):
+    manager = request.getfixturevalue(engine)
+    for description in DESCRIPTIONS:
+        manager.add(description, 1)
+    manager.match_todos("deploy")
+    manager.add("Deploy docs", 1)
+    manager.remove(1)
+    manager.set_done(2)
+    db_path = manager._db_path
+    updated = fuzzy.load(db_path, file_signature(db_path))
+    assert updated is not None
+    assert updated.lookup(fuzzy.trigrams("deploy")) == [2, 4, 5, 6]
+    found = manager.match_todos("deply docs").todo_list
+    assert [todo["ID"] for todo in found] == [6]
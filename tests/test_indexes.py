@@ -0,0 +1,136 @@
+"""Tests for the secondary indexes and indexed queries."""
+
+import pytest
+
+from todocli import indexes
+from todocli import todo_manager as tm
+from todocli.cache import file_signature
+from todocli.indexes import Indexes
+from todocli.return_codes import Code
+
+from .helper import add_todos
+
+QUERIES = [
+    {},
+    {"priority": 1},
+    {"done": False},
+    {"done": True, "priority": 3},
+    {"due_from": "2030-01-03"},
+    {"due_to": "2030-01-03"},
+    {
+        "priority": 2,
+        "done": False,
+        "due_from": "2030-01-02",
+        "due_to": "2030-01-05",
+    },
+]
+
+
+def _todos(num):
+    return [
+        {
+            "ID": todo_id,
+            "Description": f"task {todo_id}",
+            "Priority": todo_id % 3 + 1,
+            "Due": None
+            if todo_id % 4 == 0
+            else f"2030-01-{todo_id % 7 + 1:02}",
+            "Done": todo_id % 5 == 0,
+        }
+        for todo_id in range(1, num + 1)
+    ]
+
+
+def _expected(todos, query):
+    return [todo["ID"] for todo in todos if indexes.matches(todo, **query)]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_match(query):
+    todos = _todos(60)
+    assert Indexes.build(todos).match(**query) == _expected(todos, query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_incremental_updates(query):
+    todos = _todos(60)
+    built = Indexes.build(todos[:30])
+    for todo in todos[30:]:
+        built.add(todo)
+    for todo in todos[::7]:
+        built.remove(todo)
+    for todo in todos[1::4]:
+        built.set_done(todo)
+        todo["Done"] = True
+    live = [todo for todo in todos if todo not in todos[::7]]
+    assert built.match(**query) == _expected(live, query)
+    assert built.match(**query) == Indexes.build(live).match(**query)
+
+
+def test_store_and_load(tmp_path):
+    db_path = tmp_path / "todo.json"
+    db_path.write_text("[]")
+    signature = file_signature(db_path)
+    stored = Indexes.build(_todos(20))
+    indexes.store(db_path, signature, stored)
+    loaded = indexes.load(db_path, signature)
+    assert loaded.match(done=True) == stored.match(done=True)
+    assert loaded.due == stored.due
+    assert indexes.load(db_path, (0, 0, 0)) is None
+    indexes.index_path(db_path).write_bytes(b"junk")
+    assert indexes.load(db_path, signature) is None
+
+
+@pytest.mark.parametrize("engine", ["todo_manager", "fixed_manager"])
+def test_query_todos(request, engine):
+    manager = request.getfixturevalue(engine)
+    todos = add_todos(manager, 20)
+    query = {"priority": todos[0]["Priority"], "done": False}
+    expected = [todo for todo in todos if indexes.matches(todo, **query)]
+    assert manager.query_todos(**query) == tm.DBResponse(
+        expected, Code.SUCCESS
+    )
+    assert indexes.load(manager._db_path, file_signature(manager._db_path))
+
+
+@pytest.mark.parametrize("engine", ["todo_manager", "fixed_manager"])
+def test_writes_update_indexes(request, engine):
+    manager = request.getfixturevalue(engine)
+    todos = add_todos(manager, 10)
+    manager.query_todos()
+    todos.append(manager.add("task", 1, "2030-01-01").todo)
+    todos[2] = manager.set_done(3).todo
+    manager.remove(5)
+    del todos[4]
+    db_path = manager._db_path
+    updated = indexes.load(db_path, file_signature(db_path))
+    assert updated is not None
+    for query in QUERIES:
+        assert updated.match(**query) == _expected(todos, query)
+
+
+def test_query_todos_stale_indexes(todo_manager):
+    todos = add_todos(todo_manager, 5)
+    todo_manager.query_todos()
+    with todo_manager.transaction():
+        todo_manager.set_done(1)
+    todos[0]["Done"] = True
+    assert todo_manager.query_todos(done=True) == tm.DBResponse(
+        todos[:1], Code.SUCCESS
+    )
+
+
+def test_query_todos_read_error(todo_manager):
+    todo_manager._db_path.write_text("[{]")
+    assert todo_manager.query_todos() == tm.DBResponse([], Code.JSON_ERROR)
+
+
+def test_query_todos_sqlite(sqlite_manager):
+    todos = add_todos(sqlite_manager, 20)
+    sqlite_manager.set_done(2)
+    todos[1]["Done"] = True
+    for query in QUERIES:
+        expected = [todo for todo in todos if indexes.matches(todo, **query)]
+        assert sqlite_manager.query_todos(**query) == tm.DBResponse(
+            expected, Code.SUCCESS
+        )
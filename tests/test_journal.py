@@ -0,0 +1,128 @@
+"""Tests for `JournalTodoManager` class."""
+
+import json
+
+import pytest
+
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.journal import JournalTodoManager
+from todocli.return_codes import Code
+
+from .helper import add_todos, generate_todos
+
+
+def _records(journal_manager):
+    with journal_manager._db_path.open("r") as journal:
+        return [json.loads(line) for line in journal]
+
+
+def test_journal_manager_creation(journal_manager):
+    assert isinstance(journal_manager, tm.TodoManager)
+    assert journal_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_add_appends_record(journal_manager):
+    todo_task, todo_priority, todo_due_date_str, return_todo = next(
+        generate_todos(1)
+    )
+    todo = journal_manager.add(todo_task, todo_priority, todo_due_date_str)
+    return_todo["ID"] = 1
+    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert _records(journal_manager) == [
+        {"op": "snapshot", "todos": []},
+        {"op": "add", "todo": return_todo},
+    ]
+
+
+def test_replay(journal_manager):
+    todos = add_todos(journal_manager, 5)
+    done = journal_manager.set_done(2)
+    todos[1]["Done"] = True
+    assert done == CurrentTodo(todos[1], Code.SUCCESS)
+    removed = journal_manager.remove(1)
+    assert removed == CurrentTodo(todos.pop(0), Code.SUCCESS)
+    assert journal_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_ids_are_stable(journal_manager):
+    todos = add_todos(journal_manager, 3)
+    journal_manager.remove(2)
+    journal_manager.remove(3)
+    assert journal_manager.set_done(3) == CurrentTodo({}, Code.ID_ERROR)
+    todo = journal_manager.add("task", 1)
+    assert todo.todo["ID"] == 4
+    assert journal_manager.read_todos() == tm.DBResponse(
+        [todos[0], todo.todo], Code.SUCCESS
+    )
+    journal_manager.remove_all()
+    assert journal_manager.add("task", 1).todo["ID"] == 5
+
+
+def test_invalid_id(journal_manager):
+    assert journal_manager.set_done(1) == CurrentTodo({}, Code.ID_ERROR)
+    assert journal_manager.remove(0) == CurrentTodo({}, Code.ID_ERROR)
+    assert len(_records(journal_manager)) == 1
+
+
+def test_remove_all(journal_manager):
+    add_todos(journal_manager, 3)
+    assert journal_manager.remove_all() == CurrentTodo({}, Code.SUCCESS)
+    assert journal_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+
+
+def test_snapshot_folds_journal(tmp_path):
+    db_file = tmp_path / "todo.journal"
+    JournalTodoManager.create(db_file)
+    journal_manager = JournalTodoManager(db_file, snapshot_every=512)
+    todos = add_todos(journal_manager, 20)
+    assert _records(journal_manager)[0]["op"] == "snapshot"
+    assert len(_records(journal_manager)) < 21
+    assert journal_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_torn_write_is_skipped(journal_manager):
+    todo_task, todo_priority, todo_due_date_str, return_todo = next(
+        generate_todos(1)
+    )
+    with journal_manager._db_path.open("a") as journal:
+        journal.write('{"op": "add", "todo": {"Desc')
+    journal_manager.add(todo_task, todo_priority, todo_due_date_str)
+    assert journal_manager.read_todos() == tm.DBResponse(
+        [dict(return_todo, ID=1)], Code.SUCCESS
+    )
+
+
+def test_read_missing_file(tmp_path):
+    journal_manager = JournalTodoManager(tmp_path / "missing.journal")
+    assert journal_manager.read_todos() == tm.DBResponse(
+        [], Code.DB_READ_ERROR
+    )
+
+
+def test_transaction(journal_manager):
+    todos = add_todos(journal_manager, 2)
+    with journal_manager.transaction() as batch:
+        todo = journal_manager.add("task", 1)
+        journal_manager.remove(1)
+    assert batch.code == Code.SUCCESS
+    assert _records(journal_manager)[0]["op"] == "snapshot"
+    assert journal_manager.read_todos() == tm.DBResponse(
+        [todos[1], todo.todo], Code.SUCCESS
+    )
+    with journal_manager.transaction() as batch:
+        journal_manager.remove_all()
+        journal_manager.remove(2)
+    assert batch.code == Code.ID_ERROR
+    assert len(journal_manager.read_todos().todo_list) == 2
+
+
+def test_iter_todos(journal_manager):
+    todos = add_todos(journal_manager, 3)
+    assert list(journal_manager.iter_todos()) == todos
+
+
+def test_iter_todos_missing_file(tmp_path):
+    journal_manager = JournalTodoManager(tmp_path / "missing.journal")
+    with pytest.raises(OSError):
+        list(journal_manager.iter_todos())
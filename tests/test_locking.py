@@ -0,0 +1,72 @@
+"""Tests for cross-process write locking."""
+
+import multiprocessing
+
+import pytest
+
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.journal import JournalTodoManager
+from todocli.locking import LockTimeout, file_lock, lock_path
+from todocli.return_codes import Code
+
+
+def test_lock_times_out(tmp_path):
+    path = tmp_path / "todo.json.lock"
+    with file_lock(path):
+        with pytest.raises(LockTimeout):
+            with file_lock(path, timeout=0.05):
+                pass
+    with file_lock(path, timeout=0.05):
+        pass
+
+
+def test_mutation_waits_for_lock(todo_manager):
+    todo_manager.lock_timeout = 0.05
+    with file_lock(lock_path(todo_manager._db_path)):
+        assert todo_manager.add("task", 1) == CurrentTodo({}, Code.LOCK_ERROR)
+        assert todo_manager.remove_all() == CurrentTodo({}, Code.LOCK_ERROR)
+        with todo_manager.transaction() as batch:
+            todo = todo_manager.add("task", 1)
+        assert todo == CurrentTodo({}, Code.LOCK_ERROR)
+        assert batch.code == Code.LOCK_ERROR
+        assert todo_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+    assert todo_manager.add("task", 1).code == Code.SUCCESS
+
+
+def test_journal_mutation_waits_for_lock(journal_manager):
+    journal_manager.lock_timeout = 0.05
+    with file_lock(lock_path(journal_manager._db_path)):
+        assert journal_manager.add("task", 1) == CurrentTodo(
+            {}, Code.LOCK_ERROR
+        )
+        assert journal_manager.snapshot() == Code.LOCK_ERROR
+
+
+def _add_many(manager_class, db_path, count):
+    manager = manager_class(db_path)
+    for number in range(count):
+        assert manager.add(f"task {number}", 1).code == Code.SUCCESS
+
+
+@pytest.mark.parametrize(
+    "manager_class,db_name",
+    [(tm.TodoManager, "todo.json"), (JournalTodoManager, "todo.journal")],
+)
+def test_parallel_writers_lose_nothing(tmp_path, manager_class, db_name):
+    db_path = tmp_path / db_name
+    manager_class.create(db_path)
+    writers = [
+        multiprocessing.Process(
+            target=_add_many, args=(manager_class, db_path, 25)
+        )
+        for _ in range(4)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert [writer.exitcode for writer in writers] == [0] * 4
+    todos, code = manager_class(db_path).read_todos()
+    assert code == Code.SUCCESS
+    assert sorted(todo["ID"] for todo in todos) == list(range(1, 101))
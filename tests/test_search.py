@@ -0,0 +1,159 @@
+"""Tests for the inverted index and full-text search."""
+
+import pytest
+
+from todocli import search
+from todocli import todo_manager as tm
+from todocli.cache import file_signature
+from todocli.return_codes import Code
+from todocli.search import SearchIndex
+
+DESCRIPTIONS = [
+    "Write the quarterly report",
+    "Quarterly report",
+    "Report the broken printer",
+    "File quarterly taxes",
+    "Read the report on quarterly sales figures",
+    "Café opening",
+]
+QUERIES = [
+    "quarterly report",
+    "REPORT",
+    "quarterly",
+    "the",
+    "printer report",
+    "missing",
+    "café",
+]
+
+
+def _todos():
+    return [
+        {
+            "ID": todo_id,
+            "Description": description,
+            "Priority": 1,
+            "Due": None,
+            "Done": False,
+        }
+        for todo_id, description in enumerate(DESCRIPTIONS, start=1)
+    ]
+
+
+def _expected(todos, query):
+    terms = set(search.tokenize(query))
+    return [todo["ID"] for todo in todos if search.matches(todo, terms)]
+
+
+def test_tokenize():
+    assert search.tokenize("Pay the Rent, then e-mail Bob_2!") == [
+        "pay",
+        "the",
+        "rent",
+        "then",
+        "e",
+        "mail",
+        "bob_2",
+    ]
+
+
+def test_rank():
+    todos = _todos()
+    ranked = search.rank([todos[4], todos[0], todos[1]], "quarterly report")
+    assert [todo["ID"] for todo in ranked] == [2, 1, 5]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_lookup(query):
+    todos = _todos()
+    terms = search.tokenize(query)
+    assert SearchIndex.build(todos).lookup(terms) == _expected(todos, query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_incremental_updates(query):
+    todos = _todos()
+    built = SearchIndex.build(todos[:2])
+    for todo in todos[2:]:
+        built.add(todo)
+    built.set_done(todos[0])
+    built.remove(todos[1])
+    built.remove(todos[1])
+    live = [todo for todo in todos if todo is not todos[1]]
+    terms = search.tokenize(query)
+    assert built.lookup(terms) == _expected(live, query)
+    assert built.all_postings() == SearchIndex.build(live).all_postings()
+
+
+def test_store_and_load(tmp_path):
+    db_path = tmp_path / "todo.json"
+    db_path.write_text("[]")
+    signature = file_signature(db_path)
+    stored = SearchIndex.build(_todos())
+    search.store(db_path, signature, stored)
+    loaded = search.load(db_path, signature)
+    assert loaded.all_postings() == stored.all_postings()
+    assert search.load(db_path, (0, 0, 0)) is None
+    search.search_path(db_path).write_bytes(b"junk")
+    assert search.load(db_path, signature) is None
+
+
+def _add_descriptions(manager):
+    return [manager.add(description, 2).todo for description in DESCRIPTIONS]
+
+
+@pytest.mark.parametrize(
+    "engine",
+    ["todo_manager", "journal_manager", "fixed_manager", "sqlite_manager"],
+)
+def test_search_todos(request, engine):
+    manager = request.getfixturevalue(engine)
+    todos = _add_descriptions(manager)
+    for query in QUERIES:
+        expected = search.rank(
+            [todo for todo in todos if todo["ID"] in _expected(todos, query)],
+            query,
+        )
+        assert manager.search_todos(query) == tm.DBResponse(
+            expected, Code.SUCCESS
+        )
+    assert manager.search_todos("report", 2) == tm.DBResponse(
+        search.rank(todos, "report")[:2], Code.SUCCESS
+    )
+    assert manager.search_todos("  !") == tm.DBResponse([], Code.SUCCESS)
+
+
+@pytest.mark.parametrize("engine", ["todo_manager", "fixed_manager"])
+def test_writes_update_search_index(request, engine):
+    manager = request.getfixturevalue(engine)
+    todos = _add_descriptions(manager)
+    manager.search_todos("report")
+    todos.append(manager.add("Monthly report", 1).todo)
+    manager.set_done(2)
+    manager.remove(1)
+    db_path = manager._db_path
+    updated = search.load(db_path, file_signature(db_path))
+    assert updated is not None
+    assert updated.lookup(["report"]) == [2, 3, 5, 7]
+    assert [todo["ID"] for todo in manager.search_todos("report")[0]] == [
+        2,
+        7,
+        3,
+        5,
+    ]
+
+
+def test_search_todos_stale_index(todo_manager):
+    _add_descriptions(todo_manager)
+    todo_manager.search_todos("report")
+    with todo_manager.transaction():
+        todo_manager.remove(2)
+    found = todo_manager.search_todos("quarterly report").todo_list
+    assert [todo["ID"] for todo in found] == [1, 5]
+
+
+def test_search_todos_read_error(todo_manager):
+    todo_manager._db_path.write_text("[{]")
+    assert todo_manager.search_todos("report") == tm.DBResponse(
+        [], Code.JSON_ERROR
+    )
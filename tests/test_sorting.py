@@ -0,0 +1,79 @@
+"""Tests for ordering and paging todos."""
+
+from itertools import count
+
+import pytest
+
+from todocli import sorting
+
+TODOS = [
+    {"ID": 1, "Description": "c", "Priority": 3, "Due": None, "Done": False},
+    {"ID": 2, "Description": "a", "Priority": 1, "Due": None, "Done": True},
+    {"ID": 3, "Description": "b", "Priority": 2, "Due": None, "Done": False},
+    {"ID": 4, "Description": "d", "Priority": 1, "Due": None, "Done": False},
+]
+
+
+def _ids(todos):
+    return [todo["ID"] for todo in todos]
+
+
+@pytest.mark.parametrize(
+    "offset,limit,ids",
+    [(0, None, [1, 2, 3, 4]), (1, 2, [2, 3]), (3, 5, [4]), (5, 1, [])],
+)
+def test_select_unsorted(offset, limit, ids):
+    assert _ids(sorting.select(iter(TODOS), [], offset, limit)) == ids
+
+
+@pytest.mark.parametrize(
+    "offset,limit,ids",
+    [(0, None, [2, 4, 3, 1]), (0, 2, [2, 4]), (1, 2, [4, 3])],
+)
+def test_select_sorted(offset, limit, ids):
+    todos = sorting.select(iter(TODOS), ["Priority"], offset, limit)
+    assert _ids(todos) == ids
+
+
+def test_select_stops_reading():
+    read = count()
+
+    def todos():
+        for todo in TODOS:
+            next(read)
+            yield todo
+
+    assert _ids(sorting.select(todos(), [], 0, 2)) == [1, 2]
+    assert next(read) == 2
+
+
+def test_select_top_matches_sort():
+    todos = [dict(todo, ID=i) for i, todo in enumerate(TODOS * 50)]
+    top = sorting.select(iter(todos), ["Description"], 0, 30)
+    assert top == sorted(todos, key=sorting.sort_key(["Description"]))[:30]
+
+
+def test_sort_keys_are_typed():
+    todos = [
+        {"ID": 10, "Priority": 2, "Due": "2030-01-02", "Done": True},
+        {"ID": 9, "Priority": 10, "Due": None, "Done": False},
+        {"ID": 2, "Priority": 2, "Due": "2029-12-31", "Done": False},
+    ]
+    assert _ids(sorting.select(todos, ["ID"])) == [2, 9, 10]
+    assert _ids(sorting.select(todos, ["Priority"])) == [10, 2, 9]
+    assert _ids(sorting.select(todos, ["Due"])) == [2, 10, 9]
+    assert _ids(sorting.select(todos, ["Done"])) == [9, 2, 10]
+    assert _ids(sorting.select(todos, ["Priority", "Due"])) == [2, 10, 9]
+
+
+@pytest.mark.parametrize(
+    "sort_by,fields",
+    [(None, []), ("Due", ["Due"]), ("Priority, Due", ["Priority", "Due"])],
+)
+def test_parse_sort_by(sort_by, fields):
+    assert sorting.parse_sort_by(sort_by) == fields
+
+
+def test_parse_sort_by_invalid():
+    with pytest.raises(ValueError, match="Size"):
+        sorting.parse_sort_by("Priority,Size")
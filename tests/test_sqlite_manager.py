@@ -0,0 +1,176 @@
+"""Tests for `SQLiteTodoManager` class."""
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from todocli import sorting
+from todocli import todo_manager as tm
+from todocli.current_todo import CurrentTodo
+from todocli.durability import Durability
+from todocli.return_codes import Code
+from todocli.sqlite_manager import SQLiteTodoManager
+
+from .helper import add_todos, generate_todos
+
+
+def test_create_indexes(sqlite_manager):
+    with closing(sqlite3.connect(str(sqlite_manager._db_path))) as db:
+        indexes = {
+            row[0]
+            for row in db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+    assert {"todos_priority", "todos_due", "todos_done"} <= indexes
+
+
+def test_create_invalid_path():
+    assert SQLiteTodoManager.create(tm.Path("/")) == Code.DB_INIT_ERROR
+
+
+@pytest.mark.parametrize(
+    "todo_task,todo_priority,todo_due_date_str,return_todo",
+    list(generate_todos(1)) + list(generate_todos(1, False)),
+)
+def test_add_todo(
+    todo_task, todo_priority, todo_due_date_str, return_todo, sqlite_manager
+):
+    todo = sqlite_manager.add(todo_task, todo_priority, todo_due_date_str)
+    return_todo["ID"] = 1
+    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert sqlite_manager.read_todos() == tm.DBResponse(
+        [return_todo], Code.SUCCESS
+    )
+
+
+def test_set_done(sqlite_manager):
+    todos = add_todos(sqlite_manager, 3)
+    todos[1]["Done"] = True
+    assert sqlite_manager.set_done(2) == CurrentTodo(todos[1], Code.SUCCESS)
+    assert sqlite_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_remove(sqlite_manager):
+    todos = add_todos(sqlite_manager, 3)
+    assert sqlite_manager.remove(1) == CurrentTodo(todos[0], Code.SUCCESS)
+    assert sqlite_manager.remove(3) == CurrentTodo(todos[2], Code.SUCCESS)
+    assert sqlite_manager.remove(3) == CurrentTodo({}, Code.ID_ERROR)
+    assert sqlite_manager.read_todos() == tm.DBResponse(
+        [todos[1]], Code.SUCCESS
+    )
+
+
+@pytest.mark.parametrize("todo_id", [-1, 0, 4])
+def test_invalid_id(sqlite_manager, todo_id):
+    add_todos(sqlite_manager, 3)
+    assert sqlite_manager.set_done(todo_id) == CurrentTodo({}, Code.ID_ERROR)
+    assert sqlite_manager.remove(todo_id) == CurrentTodo({}, Code.ID_ERROR)
+
+
+def test_remove_all(sqlite_manager):
+    add_todos(sqlite_manager, 3)
+    assert sqlite_manager.remove_all() == CurrentTodo({}, Code.SUCCESS)
+    assert sqlite_manager.read_todos() == tm.DBResponse([], Code.SUCCESS)
+    assert sqlite_manager.add("task", 1).todo["ID"] == 4
+
+
+def test_select_sorted(sqlite_manager):
+    todos = add_todos(sqlite_manager, 10)
+    todos_by_priority, code = sqlite_manager.select_todos(["Priority"])
+    assert code == Code.SUCCESS
+    assert todos_by_priority == sorted(todos, key=lambda t: t["Priority"])
+
+
+def test_select_matches_python_sort(sqlite_manager):
+    todos = add_todos(sqlite_manager, 20)
+    sqlite_manager.set_done(3)
+    todos[2]["Done"] = True
+    sqlite_manager.add("undated", 1)
+    todos.append(
+        {
+            "ID": 21,
+            "Description": "undated",
+            "Priority": 1,
+            "Due": None,
+            "Done": False,
+        }
+    )
+    for sort_by in (["Due"], ["Priority", "Due"], ["Done", "Description"]):
+        page = sqlite_manager.select_todos(sort_by, offset=2, limit=5)
+        assert page == tm.DBResponse(
+            sorting.select(todos, sort_by, 2, 5), Code.SUCCESS
+        )
+
+
+def test_select_invalid_sort(sqlite_manager):
+    with pytest.raises(ValueError):
+        sqlite_manager.select_todos(["ID; DROP TABLE todos"])
+
+
+def test_missing_database(tmp_path):
+    sqlite_manager = SQLiteTodoManager(tmp_path / "missing.db")
+    assert sqlite_manager.read_todos() == tm.DBResponse([], Code.DB_READ_ERROR)
+    assert sqlite_manager.add("task", 1) == CurrentTodo(
+        {}, Code.DB_WRITE_ERROR
+    )
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_corrupt_database(tmp_path):
+    db_file = tmp_path / "todo.db"
+    db_file.write_text("[{]")
+    sqlite_manager = SQLiteTodoManager(db_file)
+    assert sqlite_manager.read_todos() == tm.DBResponse([], Code.DB_READ_ERROR)
+
+
+def test_transaction(sqlite_manager):
+    todos = add_todos(sqlite_manager, 2)
+    with sqlite_manager.transaction() as batch:
+        todo = sqlite_manager.add("task", 1)
+        todos[0]["Done"] = True
+        sqlite_manager.set_done(1)
+        sqlite_manager.remove(2)
+    assert batch.code == Code.SUCCESS
+    assert sqlite_manager.read_todos() == tm.DBResponse(
+        [todos[0], todo.todo], Code.SUCCESS
+    )
+
+
+def test_transaction_rollback(sqlite_manager):
+    todos = add_todos(sqlite_manager, 2)
+    with sqlite_manager.transaction() as batch:
+        sqlite_manager.remove_all()
+        assert sqlite_manager.remove(7) == CurrentTodo({}, Code.ID_ERROR)
+        assert sqlite_manager.add("task", 1) == CurrentTodo({}, Code.ID_ERROR)
+    assert batch.code == Code.ID_ERROR
+    assert sqlite_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+
+
+def test_transaction_missing_database(tmp_path):
+    sqlite_manager = SQLiteTodoManager(tmp_path / "missing.db")
+    with sqlite_manager.transaction() as batch:
+        todo = sqlite_manager.add("task", 1)
+    assert todo == CurrentTodo({}, Code.DB_READ_ERROR)
+    assert batch.code == Code.DB_READ_ERROR
+
+
+def test_iter_todos(sqlite_manager):
+    todos = add_todos(sqlite_manager, 3)
+    assert list(sqlite_manager.iter_todos()) == todos
+
+
+def test_iter_todos_missing_database(tmp_path):
+    sqlite_manager = SQLiteTodoManager(tmp_path / "missing.db")
+    with pytest.raises(OSError):
+        list(sqlite_manager.iter_todos())
+
+
+@pytest.mark.parametrize("mode,level", [("always", 2), ("none", 0)])
+def test_durability_sets_synchronous(tmp_path, mode, level):
+    db_file = tmp_path / "todo.db"
+    SQLiteTodoManager.create(db_file)
+    sqlite_manager = SQLiteTodoManager(db_file, Durability(mode))
+    with closing(sqlite_manager._connect()) as db:
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == level
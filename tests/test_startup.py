@@ -0,0 +1,78 @@
+"""Startup: which modules importing the CLI loads before a command runs."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# The only todocli modules a bare start may import. Sidecars such as the
+# search indexes, the archive and the engines other than JSON are imported
+# by the commands that use them.
+EAGER = {
+    "todocli",
+    "todocli.archive_policy",
+    "todocli.cache",
+    "todocli.cli",
+    "todocli.codec",
+    "todocli.config",
+    "todocli.current_todo",
+    "todocli.daemon",
+    "todocli.durability",
+    "todocli.engines",
+    "todocli.locking",
+    "todocli.return_codes",
+    "todocli.sorting",
+    "todocli.todo",
+    "todocli.todo_manager",
+    "todocli.transfer",
+}
+DEFERRED = (
+    "prettytable",
+    "csv",
+    "socket",
+    "socketserver",
+    "sqlite3",
+    "todocli.archive",
+    "todocli.fuzzy",
+    "todocli.indexes",
+    "todocli.search",
+    "todocli.stats",
+)
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=Path(__file__).parents[1],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def _imported(module):
+    """Returns the names of every module loaded by importing ``module``."""
+    stdout = _python("-c", f"import sys, {module}; print(*sys.modules)").stdout
+    return set(stdout.split())
+
+
+def test_cli_imports_only_eager_modules():
+    own = {
+        name
+        for name in _imported("todocli.cli")
+        if name.partition(".")[0] == "todocli"
+    }
+    assert own <= EAGER, own - EAGER
+
+
+@pytest.mark.parametrize("module", DEFERRED)
+def test_heavy_modules_deferred(module):
+    assert module not in _imported("todocli.cli")
+
+
+def test_version_skips_cli():
+    result = _python("-X", "importtime", "-m", "todocli", "--version")
+    assert result.stdout.startswith("todocli v")
+    assert "typer" not in result.stderr
@@ -0,0 +1,130 @@
+"""Tests for the stored counts behind ``todocli stats``."""
+
+import pytest
+
+from todocli import stats
+from todocli.cache import file_signature
+from todocli.return_codes import Code
+from todocli.stats import Stats
+from todocli.todo import Todo
+
+TODOS = [
+    Todo(1, "Buy milk", 1, "2030-01-10"),
+    Todo(2, "Call mom", 1, "2030-01-01", True),
+    Todo(3, "Pay taxes", 2, "2030-01-10"),
+    Todo(5, "Walk", 3),
+]
+
+
+def _stats_of(manager):
+    todos, code = manager.read_todos()
+    assert code == Code.SUCCESS
+    return Stats.build(todos)
+
+
+def test_build_and_count():
+    counted = Stats.build(TODOS)
+    assert counted.counts == {
+        (1, False): 1,
+        (1, True): 1,
+        (2, False): 1,
+        (3, False): 1,
+    }
+    assert counted.open_due == {"2030-01-10": 2}
+    assert counted.count() == 4
+    assert counted.count(priority=1) == 2
+    assert counted.count(done=False) == 3
+    assert counted.count(1, done=True) == 1
+    assert counted.count(priority=9) == 0
+    assert counted.count_open_due() == 2
+    assert counted.count_open_due(due_to="2030-01-09") == 0
+    assert counted.count_open_due("2030-01-10", "2030-01-16") == 2
+
+
+def test_patches_match_a_rebuild():
+    counted = Stats.build(TODOS)
+    done = Todo(1, "Buy milk", 1, "2030-01-10", True)
+    counted.apply("set_done", done)
+    counted.apply("set_done", done)
+    counted.apply("remove", TODOS[1])
+    counted.apply("add", Todo(6, "Book dentist", 2, "2030-02-01"))
+    counted.apply("remove", TODOS[2])
+    expected = Stats.build(
+        [done, TODOS[3], Todo(6, "Book dentist", 2, "2030-02-01")]
+    )
+    assert counted.counts == expected.counts
+    assert counted.open_due == expected.open_due
+    assert counted.done == expected.done
+    counted.apply("remove_all", {})
+    assert (counted.counts, counted.open_due) == ({}, {})
+
+
+def test_json_round_trip():
+    counted = Stats.build(TODOS)
+    decoded = Stats.from_json(counted.as_json())
+    assert decoded.counts == counted.counts
+    assert decoded.open_due == counted.open_due
+
+
+def test_store_and_load(tmp_path):
+    db_path = tmp_path / "todo.json"
+    db_path.write_text("[]")
+    signature = file_signature(db_path)
+    stats.store(db_path, signature, Stats.build(TODOS))
+    loaded = stats.load(db_path, signature)
+    assert loaded.counts == Stats.build(TODOS).counts
+    assert loaded.done == Stats.build(TODOS).done
+    assert stats.load(db_path, (0, 0, 0)) is None
+    stats.stats_path(db_path).write_bytes(b"junk")
+    assert stats.load(db_path, signature) is None
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [
+        "todo_manager",
+        "binary_manager",
+        "fixed_manager",
+        "journal_manager",
+        "sqlite_manager",
+    ],
+)
+def test_read_stats(request, engine):
+    manager = request.getfixturevalue(engine)
+    assert manager.read_stats().stats.counts == {}
+    for todo in TODOS:
+        manager.add(todo.Description, todo.Priority, todo.Due)
+    manager.set_done(2)
+    response = manager.read_stats()
+    assert response.code == Code.SUCCESS
+    assert response.stats.counts == _stats_of(manager).counts
+    manager.set_done(2)
+    manager.set_done(1)
+    manager.remove(3)
+    manager.add("Walk", 2, "2030-01-02")
+    counted = manager.read_stats().stats
+    assert counted.counts == _stats_of(manager).counts
+    assert counted.open_due == {"2030-01-02": 1}
+    manager.remove_all()
+    assert manager.read_stats().stats.counts == {}
+
+
+@pytest.mark.parametrize(
+    "engine", ["todo_manager", "binary_manager", "fixed_manager"]
+)
+def test_writes_update_stored_stats(request, engine):
+    manager = request.getfixturevalue(engine)
+    for todo in TODOS:
+        manager.add(todo.Description, todo.Priority, todo.Due)
+    manager.read_stats()
+    manager.set_done(1)
+    manager.remove(2)
+    manager.add("Walk", 3, "2030-01-05")
+    db_path = manager._db_path
+    updated = stats.load(db_path, file_signature(db_path))
+    assert updated is not None
+    assert updated.counts == _stats_of(manager).counts
+    assert updated.open_due == {"2030-01-05": 1, "2030-01-10": 1}
+    manager.remove_all()
+    cleared = stats.load(db_path, file_signature(db_path))
+    assert cleared is not None and cleared.counts == {}
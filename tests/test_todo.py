@@ -0,0 +1,87 @@
+"""Tests for the in-memory todo record."""
+
+import gc
+import json
+import sys
+
+import pytest
+
+from todocli import codec
+from todocli.todo import Todo, from_json, gc_paused, to_json
+
+ENTRY = {
+    "ID": 3,
+    "Description": "Buy milk",
+    "Priority": 2,
+    "Due": "2030-01-10",
+    "Done": False,
+}
+
+
+def test_fields_by_name():
+    todo = Todo(1, "task", 2)
+    assert todo["Description"] == "task"
+    assert (todo["Due"], todo["Done"]) == (None, False)
+    todo["Done"] = True
+    assert todo.Done is True
+    with pytest.raises(AttributeError):
+        todo["Owner"] = "me"
+    assert not hasattr(todo, "__dict__")
+
+
+def test_compares_with_dicts():
+    todo = Todo.from_dict(ENTRY)
+    assert todo == ENTRY
+    assert ENTRY == todo
+    assert todo == Todo(**ENTRY)
+    assert todo != {**ENTRY, "Done": True}
+    assert todo != Todo(**{**ENTRY, "ID": 4})
+    assert dict(todo) == todo.as_dict() == ENTRY
+    assert repr(todo).startswith("Todo(ID=3, Description='Buy milk'")
+
+
+def test_from_dict_defaults_and_shares_due():
+    legacy = Todo.from_dict({"Description": "a", "Priority": 1}, 7)
+    assert legacy == Todo(7, "a", 1, None, False)
+    due = "".join(["2030-", "01-10"])
+    assert Todo.from_dict({**ENTRY, "Due": due}).Due is sys.intern(due)
+
+
+@pytest.mark.parametrize(
+    "entry", [{"ID": 1}, "todo", None, {"Description": "a"}]
+)
+def test_from_dict_invalid(entry):
+    with pytest.raises(ValueError):
+        Todo.from_dict(entry)
+
+
+def test_from_json_in_place():
+    entries = [dict(ENTRY, ID=None), 2, {"Description": "b", "Priority": 1}]
+    del entries[0]["ID"]
+    converted = from_json(entries)
+    assert converted is entries
+    assert entries[1] == 2
+    assert [entry["ID"] for entry in (entries[0], entries[2])] == [1, 3]
+    assert all(isinstance(entries[i], Todo) for i in (0, 2))
+
+
+def test_encoded_as_objects():
+    todo = Todo.from_dict(ENTRY)
+    assert json.loads(codec.dumps([todo, 4])) == [ENTRY, 4]
+    assert json.loads(codec.dumps(todo, "compact")) == ENTRY
+    assert json.dumps(todo, default=to_json) == json.dumps(ENTRY)
+    with pytest.raises(TypeError):
+        to_json(object())
+
+
+def test_gc_paused():
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+    gc.disable()
+    try:
+        with pytest.raises(RuntimeError), gc_paused():
+            raise RuntimeError
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
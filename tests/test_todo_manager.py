@@ -1,6 +1,7 @@
 """Tests for `TodoManager` class."""
 
 import json
+from io import StringIO
 from pathlib import Path
 from unittest.mock import patch
 
@@ -10,7 +11,7 @@ from todocli import todo_manager as tm
 from todocli.current_todo import CurrentTodo
 from todocli.return_codes import Code
 
-from .helper import generate_todos
+from .helper import add_todos, generate_todos
 
 
 def test_todo_manager_creation(todo_manager):
@@ -25,7 +26,7 @@ def test_add_todo(
     todo_task, todo_priority, todo_due_date_str, return_todo, todo_manager
 ):
     todo = todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert todo == CurrentTodo(dict(return_todo, ID=1), Code.SUCCESS)
 
 
 @pytest.mark.parametrize(
@@ -47,7 +48,7 @@ def test_add_todo_without_date(
     todo_task, todo_priority, todo_due_date_str, return_todo, todo_manager
 ):
     todo = todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert todo == CurrentTodo(dict(return_todo, ID=1), Code.SUCCESS)
 
 
 @pytest.mark.parametrize(
@@ -58,7 +59,7 @@ def test_add_multiple_todo(
     todo_task, todo_priority, todo_due_date_str, return_todo, todo_manager
 ):
     todo = todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert todo == CurrentTodo(dict(return_todo, ID=1), Code.SUCCESS)
 
 
 @pytest.mark.parametrize(
@@ -70,25 +71,25 @@ def test_todo_saved(
 ):
     todo_manager.add(todo_task, todo_priority, todo_due_date_str)
     with todo_manager._db_path.open("r") as db:
-        assert list(json.load(db)) == [return_todo]
+        assert list(json.load(db)) == [dict(return_todo, ID=1)]
 
 
 def test_todo_saved_multiple(todo_manager):
     expected_todos = []
-    for todo in generate_todos(10):
+    for todo_id, todo in enumerate(generate_todos(10), start=1):
         todo_task, todo_priority, todo_due_date_str, return_todo = todo
         todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-        expected_todos.append(return_todo)
+        expected_todos.append(dict(return_todo, ID=todo_id))
     with todo_manager._db_path.open("r") as db:
         assert list(json.load(db)) == expected_todos
 
 
 def test_list_todos(todo_manager):
     todos = []
-    for todo in generate_todos(10):
+    for todo_id, todo in enumerate(generate_todos(10), start=1):
         todo_task, todo_priority, todo_due_date_str, return_todo = todo
         todo_manager.add(todo_task, todo_priority, todo_due_date_str)
-        todos.append(return_todo)
+        todos.append(dict(return_todo, ID=todo_id))
     read_todos, _ = todo_manager.read_todos()
     assert len(read_todos) == 10
     assert read_todos == todos
@@ -174,7 +175,7 @@ def test_set_todo_done(
     todo_manager.add(todo_task, todo_priority, todo_due_date_str)
     todo = todo_manager.set_done(1)
     return_todo["Done"] = True
-    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert todo == CurrentTodo(dict(return_todo, ID=1), Code.SUCCESS)
 
 
 def test_set_todo_done_no_todo(todo_manager):
@@ -191,7 +192,7 @@ def test_set_remove_todo(
 ):
     todo_manager.add(todo_task, todo_priority, todo_due_date_str)
     todo = todo_manager.remove(1)
-    assert todo == CurrentTodo(return_todo, Code.SUCCESS)
+    assert todo == CurrentTodo(dict(return_todo, ID=1), Code.SUCCESS)
 
 
 def test_set_remove_todo_empty(todo_manager):
@@ -277,3 +278,168 @@ def test_set_done_write_invalid_file(
         mock_requests.return_value = tm.DBResponse([], Code.DB_WRITE_ERROR)
         todo = todo_manager.set_done(1)
         assert todo == CurrentTodo({}, Code.DB_WRITE_ERROR)
+
+
+def test_remove_keeps_ids(todo_manager):
+    todos = add_todos(todo_manager, 3)
+    assert todo_manager.remove(1) == CurrentTodo(todos[0], Code.SUCCESS)
+    todos[2]["Done"] = True
+    assert todo_manager.set_done(3) == CurrentTodo(todos[2], Code.SUCCESS)
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == todos[1:]
+
+
+def test_remove_leaves_tombstone(todo_manager):
+    todos = add_todos(todo_manager, 3)
+    todo_manager.remove(2)
+    with todo_manager._db_path.open("r") as db:
+        assert json.load(db) == [todos[0], 2, todos[2]]
+    assert todo_manager.remove(2) == CurrentTodo({}, Code.ID_ERROR)
+
+
+def test_ids_not_reused(todo_manager):
+    add_todos(todo_manager, 3)
+    todo_manager.remove(3)
+    todo_manager.remove(2)
+    assert todo_manager.add("task", 1).todo["ID"] == 4
+    todo_manager.remove_all()
+    assert todo_manager.add("task", 1).todo["ID"] == 5
+
+
+def test_tombstones_compacted(todo_manager):
+    todos = add_todos(todo_manager, 5)
+    for todo_id in (1, 2, 3, 5):
+        todo_manager.remove(todo_id)
+    with todo_manager._db_path.open("r") as db:
+        assert json.load(db) == [todos[3], 5]
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == [todos[3]]
+
+
+def test_legacy_todos_numbered_by_position(todo_manager):
+    todos = [return_todo for *_, return_todo in generate_todos(3)]
+    todo_manager._db_path.write_text(json.dumps(todos))
+    done = todo_manager.set_done(2)
+    assert done.todo["ID"] == 2
+    assert todo_manager.add("task", 1).todo["ID"] == 4
+
+
+def test_transaction_single_write(todo_manager):
+    with patch.object(
+        todo_manager, "_write_todos", wraps=todo_manager._write_todos
+    ) as mock_write:
+        with todo_manager.transaction() as batch:
+            todos = add_todos(todo_manager, 10)
+            todos[0]["Done"] = True
+            assert todo_manager.set_done(1) == CurrentTodo(
+                todos[0], Code.SUCCESS
+            )
+            assert todo_manager.remove(2).code == Code.SUCCESS
+        assert mock_write.call_count == 1
+    assert batch.code == Code.SUCCESS
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == todos[:1] + todos[2:]
+
+
+def test_transaction_rollback(todo_manager):
+    todos = add_todos(todo_manager, 2)
+    with todo_manager.transaction() as batch:
+        todo_manager.add("task", 1)
+        assert todo_manager.set_done(10) == CurrentTodo({}, Code.ID_ERROR)
+        assert todo_manager.remove(1) == CurrentTodo({}, Code.ID_ERROR)
+    assert batch.code == Code.ID_ERROR
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == todos
+
+
+def test_transaction_rollback_on_exception(todo_manager):
+    todos = add_todos(todo_manager, 2)
+    with pytest.raises(RuntimeError):
+        with todo_manager.transaction():
+            todo_manager.remove_all()
+            raise RuntimeError
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == todos
+    assert todo_manager._batch is None
+
+
+def test_transaction_remove_all(todo_manager):
+    add_todos(todo_manager, 2)
+    with todo_manager.transaction() as batch:
+        todo_manager.remove_all()
+        todo = todo_manager.add("task", 1)
+    assert batch.code == Code.SUCCESS
+    assert todo.todo["ID"] == 3
+    read_todos, _ = todo_manager.read_todos()
+    assert read_todos == [todo.todo]
+
+
+def test_transaction_read_error(todo_manager):
+    with patch("todocli.todo_manager.TodoManager.read_todos") as mock_read:
+        mock_read.return_value = tm.DBResponse([], Code.JSON_ERROR)
+        with todo_manager.transaction() as batch:
+            todo = todo_manager.add("task", 1)
+    assert todo == CurrentTodo({}, Code.JSON_ERROR)
+    assert batch.code == Code.JSON_ERROR
+
+
+def test_transaction_write_error(todo_manager):
+    with patch("todocli.todo_manager.TodoManager._write_todos") as mock_write:
+        mock_write.return_value = tm.DBResponse([], Code.DB_WRITE_ERROR)
+        with todo_manager.transaction() as batch:
+            todo_manager.add("task", 1)
+    assert batch.code == Code.DB_WRITE_ERROR
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["[]", ' [ 1, 22 ,333, {"a": [1, 2]}, "x]" ] ', "[\n    {}\n]\n"],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 64])
+def test_iter_json_array(text, chunk_size):
+    items = tm.iter_json_array(StringIO(text), chunk_size)
+    assert list(items) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1,", "[{]", "[1"])
+def test_iter_json_array_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(tm.iter_json_array(StringIO(text), 2))
+
+
+def test_iter_todos(todo_manager):
+    todos = add_todos(todo_manager, 5)
+    todo_manager.remove(2)
+    assert list(todo_manager.iter_todos()) == todos[:1] + todos[2:]
+
+
+def test_iter_todos_is_lazy(todo_manager):
+    add_todos(todo_manager, 3)
+    with patch("todocli.todo_manager.codec.loads") as mock_load:
+        todos = todo_manager.iter_todos()
+        assert next(todos)["ID"] == 1
+        assert not mock_load.called
+
+
+def test_iter_todos_invalid_file(todo_manager):
+    todo_manager._db_path = Path("/")
+    with pytest.raises(OSError):
+        list(todo_manager.iter_todos())
+
+
+def test_failed_write_keeps_database(todo_manager):
+    todos = add_todos(todo_manager, 2)
+    with patch("todocli.todo_manager.codec.dumps", side_effect=OSError):
+        assert todo_manager.add("task", 1) == CurrentTodo(
+            {}, Code.DB_WRITE_ERROR
+        )
+    assert todo_manager.read_todos() == tm.DBResponse(todos, Code.SUCCESS)
+    assert not list(todo_manager._db_path.parent.glob("*.tmp"))
+
+
+def test_compact_format(mock_json_file):
+    mock_json_file.write_text("[]")
+    todo_manager = tm.TodoManager(mock_json_file, fmt="compact")
+    todos = add_todos(todo_manager, 3)
+    assert "\n" not in mock_json_file.read_text()
+    assert json.loads(mock_json_file.read_text()) == todos
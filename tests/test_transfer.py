@@ -0,0 +1,116 @@
+"""Tests for the bulk import and export helpers."""
+
+import json
+from io import StringIO
+
+import pytest
+
+from todocli import transfer
+
+
+@pytest.mark.parametrize(
+    "file_name,fmt",
+    [("todos.csv", "csv"), ("TODOS.CSV", "csv"), ("todos.ndjson", "ndjson")],
+)
+def test_guess_format(file_name, fmt):
+    assert transfer.guess_format(file_name) == fmt
+
+
+def test_read_csv():
+    stream = StringIO(
+        "Description,Priority,Due\n"
+        "write report,1,2030-01-02\n"
+        "call bob,,\n"
+    )
+    assert list(transfer.read_new_todos(stream, "csv")) == [
+        ("write report", 1, "2030-01-02"),
+        ("call bob", 2, None),
+    ]
+
+
+def test_read_ndjson():
+    stream = StringIO(
+        '{"Description": "write report", "Priority": 3}\n'
+        "\n"
+        '{"Description": "call bob", "Due": "2030-01-02"}\n'
+    )
+    assert list(transfer.read_new_todos(stream, "ndjson")) == [
+        ("write report", 3, None),
+        ("call bob", 2, "2030-01-02"),
+    ]
+
+
+def test_read_is_lazy():
+    stream = StringIO('{"Description": "a"}\n{"Description": "b"}\n')
+    todos = transfer.read_new_todos(stream, "ndjson")
+    assert next(todos) == ("a", 2, None)
+    assert stream.read() == '{"Description": "b"}\n'
+
+
+@pytest.mark.parametrize(
+    "row,message",
+    [
+        ('{"Priority": 1}', "row 1: missing Description"),
+        ('{"Description": "a", "Priority": 4}', "row 1: Priority 4"),
+        ('{"Description": "a", "Priority": "x"}', "row 1: invalid Priority"),
+        ('{"Description": "a", "Due": "2020/11/02"}', "row 1: invalid Due"),
+        ('{"Description": "a", "Due": 5}', "row 1: invalid Due"),
+        ("[1, 2]", "row 1: expected an object"),
+        ("{", "row 1: invalid JSON"),
+    ],
+)
+def test_read_invalid_row(row, message):
+    with pytest.raises(ValueError, match=message):
+        list(transfer.read_new_todos(StringIO(row), "ndjson"))
+
+
+def test_chunked():
+    assert list(transfer.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(transfer.chunked([], 2)) == []
+
+
+TODOS = [
+    {
+        "ID": 1,
+        "Description": "write, report",
+        "Priority": 1,
+        "Due": "2030-01-02",
+        "Done": False,
+    },
+    {
+        "ID": 3,
+        "Description": "call bob",
+        "Priority": 2,
+        "Due": None,
+        "Done": True,
+    },
+]
+
+
+def test_write_ndjson():
+    stream = StringIO()
+    assert transfer.write_todos(iter(TODOS), stream, "ndjson") == 2
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == TODOS
+
+
+def test_write_json():
+    stream = StringIO()
+    assert transfer.write_todos(iter(TODOS), stream, "json") == 2
+    assert json.loads(stream.getvalue()) == TODOS
+
+
+def test_write_json_empty():
+    stream = StringIO()
+    assert transfer.write_todos(iter([]), stream, "json") == 0
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_write_csv_round_trips():
+    stream = StringIO()
+    assert transfer.write_todos(iter(TODOS), stream, "csv") == 2
+    stream.seek(0)
+    assert list(transfer.read_new_todos(stream, "csv")) == [
+        ("write, report", 1, "2030-01-02"),
+        ("call bob", 2, None),
+    ]
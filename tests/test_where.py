@@ -0,0 +1,169 @@
+import pytest
+
+from todocli import where
+from todocli.return_codes import Code
+from todocli.todo_manager import DBResponse
+
+TODOS = [
+    {
+        "ID": 1,
+        "Description": "Buy milk",
+        "Priority": 1,
+        "Due": None,
+        "Done": False,
+    },
+    {
+        "ID": 2,
+        "Description": "Pay rent",
+        "Priority": 2,
+        "Due": "2026-10-31",
+        "Done": False,
+    },
+    {
+        "ID": 3,
+        "Description": "File taxes",
+        "Priority": 3,
+        "Due": "2026-11-01",
+        "Done": True,
+    },
+    {
+        "ID": 4,
+        "Description": "Call mum",
+        "Priority": 1,
+        "Due": "2026-12-24",
+        "Done": False,
+    },
+]
+
+
+def ids(text):
+    predicate = where.parse_where(text).predicate
+    return [todo["ID"] for todo in TODOS if predicate(todo)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("priority <= 2 and not done and due < 2026-11-01", [2]),
+        ("done", [3]),
+        ("NOT Done", [1, 2, 4]),
+        ("done = false and priority = 1", [1, 4]),
+        ("due >= 2026-11-01", [3, 4]),
+        ("due > 2026-11-01 or due = none", [1, 4]),
+        ("due != none and priority != 3", [2, 4]),
+        ('description ~ "MI" or description = "Pay rent"', [1, 2]),
+        ("not (priority = 1 or done) and id > 0", [2]),
+        ("priority = 1 and (due = none or due <= 2026-12-24)", [1, 4]),
+        ("id == 3", [3]),
+    ],
+)
+def test_parse_where(text, expected):
+    assert ids(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "priority",
+        "priority <",
+        "size = 2",
+        "priority = 2 and",
+        "(done",
+        "done)",
+        'priority = "high"',
+        "priority ~ 2",
+        "done = 1",
+        "description = none",
+        "due < 1",
+        "due = 2026-13-01",
+        "priority = 2 $",
+    ],
+)
+def test_parse_where_invalid(text):
+    with pytest.raises(ValueError):
+        where.parse_where(text)
+
+
+def test_parse_where_values_stay_data():
+    predicate = where.parse_where("description = '__import__(\"os\")'")
+    assert predicate.predicate({"Description": '__import__("os")'})
+
+
+@pytest.mark.parametrize(
+    "text, query",
+    [
+        ("priority <= 2", {}),
+        ("done or priority = 1", {}),
+        ("priority = 2 and not done", {"priority": 2, "done": False}),
+        ("done != false", {"done": True}),
+        ("not done = false", {"done": True}),
+        ("due < 2026-11-01", {"due_to": "2026-10-31"}),
+        ("due > 2026-12-31", {"due_from": "2027-01-01"}),
+        (
+            "due = 2026-11-01",
+            {"due_from": "2026-11-01", "due_to": "2026-11-01"},
+        ),
+        (
+            "due >= 2026-11-01 and due != none and not due < 2027-01-01",
+            {"due_from": "2026-11-01"},
+        ),
+    ],
+)
+def test_parse_where_query(text, query):
+    assert where.parse_where(text).query == query
+
+
+@pytest.fixture(params=["todo_manager", "journal_manager", "fixed_manager"])
+def manager(request):
+    manager = request.getfixturevalue(request.param)
+    for todo in TODOS:
+        manager.add(todo["Description"], todo["Priority"], todo["Due"])
+    manager.set_done(3)
+    return manager
+
+
+def test_matching_todos(manager):
+    compiled = where.parse_where("priority = 1 and due < 2027-01-01")
+    assert where.matching_todos(manager, compiled) == DBResponse(
+        [TODOS[3]], Code.SUCCESS
+    )
+    compiled = where.parse_where("priority < 3")
+    assert where.matching_todos(manager, compiled) == DBResponse(
+        [TODOS[0], TODOS[1], TODOS[3]], Code.SUCCESS
+    )
+
+
+def test_apply_where(manager):
+    compiled = where.parse_where("not done and due != none")
+    todos, error = where.apply_where(manager, compiled, "set_done")
+    assert error == Code.SUCCESS
+    assert [todo["ID"] for todo in todos] == [2, 4]
+    assert all(todo["Done"] for todo in todos)
+    todos, error = where.apply_where(manager, compiled, "remove")
+    assert (todos, error) == ([], Code.SUCCESS)
+    todos, error = where.apply_where(
+        manager, where.parse_where("done"), "remove"
+    )
+    assert [todo["ID"] for todo in todos] == [2, 3, 4]
+    assert manager.read_todos() == DBResponse([TODOS[0]], Code.SUCCESS)
+
+
+def test_not_done(manager):
+    compiled = where.not_done(where.parse_where("priority > 1"))
+    assert compiled.query == {"done": False}
+    assert where.matching_todos(manager, compiled) == DBResponse(
+        [TODOS[1]], Code.SUCCESS
+    )
+    compiled = where.not_done(where.parse_where("done"))
+    assert where.matching_todos(manager, compiled) == DBResponse(
+        [], Code.SUCCESS
+    )
+
+
+def test_apply_where_read_error(todo_manager):
+    todo_manager._db_path.write_text("[{]")
+    compiled = where.parse_where("done")
+    assert where.apply_where(todo_manager, compiled, "remove") == DBResponse(
+        [], Code.JSON_ERROR
+    )
@@ -1,7 +1,15 @@
-from todocli import __app_name__, cli
+import sys
+
+from todocli import __app_name__, __version__
 
 
 def main():
+    # Answer --version before importing the CLI, which pulls in typer.
+    if sys.argv[1:] in (["-v"], ["--version"]):
+        print(f"{__app_name__} v{__version__}")
+        return
+    from todocli import cli
+
     cli.app(prog_name=__app_name__)
 
 
@@ -0,0 +1,254 @@
+"""Cold storage for completed todos.
+
+``todocli archive`` moves done todos out of the database into an archive
+next to it, so that everyday reads and writes only handle open work. The
+archive holds one JSON todo per line and is only ever appended to, plain or
+compressed with gzip or lzma. Both formats read back appended parts as one
+stream. Archived todos keep their IDs, and the database keeps a tombstone
+for them, so an ID is never handed out twice.
+
+``complete`` records the day each todo was done in a ``.completed`` file,
+one ``ID YYYY-MM-DD`` line per todo, which the ``archive_after_days``
+policy reads. Todos done before completion days were recorded count as
+done long ago. Entries are dropped once their todo is removed or archived.
+"""
+from datetime import date
+from itertools import chain
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional
+
+from todocli import codec
+from todocli.archive_policy import (
+    COMPRESSIONS,
+    DEFAULT_COMPRESSION,
+    ArchivePolicy,
+)
+from todocli.durability import SIDECAR, Durability, atomic_open
+from todocli.return_codes import Code
+from todocli.todo import Todo
+from todocli.todo_manager import DBResponse
+
+
+def archive_path(
+    db_path: Path, compression: str = DEFAULT_COMPRESSION
+) -> Path:
+    suffix = COMPRESSIONS[compression]
+    return db_path.parent / f".{db_path.name}.archive{suffix}"
+
+
+def completed_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.completed"
+
+
+def _open(raw: IO[bytes], compression: str, mode: str) -> IO[bytes]:
+    """Wraps an open archive file, importing its compression on demand."""
+    if compression == "gzip":
+        import gzip
+
+        # zlib's default level; gzip's 9 is several times slower for
+        # little gain on JSON lines.
+        return gzip.GzipFile(  # type: ignore
+            fileobj=raw, mode=mode, compresslevel=6
+        )
+    if compression == "lzma":
+        import lzma
+
+        return lzma.LZMAFile(raw, mode)  # type: ignore
+    return raw
+
+
+def record_completions(
+    db_path: Path, todo_ids: Iterable[int], day: date
+) -> None:
+    """Notes that ``todo_ids`` were done on ``day``, ignoring failures."""
+    lines = "".join(f"{todo_id} {day.isoformat()}\n" for todo_id in todo_ids)
+    try:
+        with completed_path(db_path).open("a") as completed:
+            completed.write(lines)
+    except OSError:
+        pass
+
+
+def read_completions(db_path: Path) -> Dict[int, str]:
+    """Maps todo IDs to the day they were done, as ``YYYY-MM-DD``."""
+    completions = {}
+    try:
+        with completed_path(db_path).open("r") as completed:
+            for line in completed:
+                todo_id, _, day = line.strip().partition(" ")
+                if todo_id.isdigit() and day:
+                    completions[int(todo_id)] = day
+    except OSError:
+        pass
+    return completions
+
+
+def _write_completions(db_path: Path, completions: Dict[int, str]) -> None:
+    """Rewrites the completions file, earliest day first."""
+    by_day = sorted(completions.items(), key=lambda entry: entry[1])
+    lines = [f"{todo_id} {day}\n" for todo_id, day in by_day]
+    try:
+        # Kept like the other sidecars: losing a completion day only makes
+        # a todo eligible sooner.
+        with atomic_open(completed_path(db_path), SIDECAR) as completed:
+            completed.writelines(lines)
+    except OSError:
+        pass
+
+
+def _prune_completions(
+    db_path: Path, completions: Dict[int, str], done_ids: Iterable[int]
+) -> None:
+    """Drops the entries of todos no longer live and done, if there are
+    any."""
+    kept = {
+        todo_id: completions[todo_id]
+        for todo_id in done_ids
+        if todo_id in completions
+    }
+    if len(kept) != len(completions):
+        _write_completions(db_path, kept)
+
+
+def forget_completions(
+    db_path: Path, todo_ids: Optional[Iterable[int]] = None
+) -> None:
+    """Drops the entries of removed ``todo_ids``, or of every todo."""
+    completions = read_completions(db_path)
+    if todo_ids is None:
+        todo_ids = completions
+    gone = completions.keys() & set(todo_ids)
+    if gone:
+        _write_completions(
+            db_path,
+            {i: day for i, day in completions.items() if i not in gone},
+        )
+
+
+def archive_due(manager, db_path: Path, cutoff: date) -> bool:
+    """Returns whether a live done todo was completed on or before
+    ``cutoff``.
+
+    The database is only read once a recorded completion is that old.
+    Entries of todos since removed, or no longer done, do not count and
+    are dropped.
+    """
+    completions = read_completions(db_path)
+    old_ids = {
+        todo_id
+        for todo_id, day in completions.items()
+        if day <= cutoff.isoformat()
+    }
+    if not old_ids:
+        return False
+    todos, read_error = manager.query_todos(done=True)
+    if read_error != Code.SUCCESS:
+        return False
+    done_ids = [todo["ID"] for todo in todos]
+    _prune_completions(db_path, completions, done_ids)
+    return not old_ids.isdisjoint(done_ids)
+
+
+def _append(
+    path: Path, compression: str, todos: List[dict], durability: Durability
+) -> Code:
+    try:
+        with path.open("ab") as raw:
+            archive = _open(raw, compression, "ab")
+            # One write, since compressors are slow to call per line.
+            archive.write(
+                b"".join(
+                    codec.dumps(todo, "compact") + b"\n" for todo in todos
+                )
+            )
+            if archive is not raw:
+                # Writes the compressed trailer, leaving raw open.
+                archive.close()
+            durability.sync_file(raw)
+    except OSError:
+        return Code.DB_WRITE_ERROR
+    durability.committed(path, renamed=False)
+    return Code.SUCCESS
+
+
+def archive_done(
+    manager,
+    db_path: Path,
+    policy: ArchivePolicy = ArchivePolicy(),
+    before: Optional[date] = None,
+) -> DBResponse:
+    """Moves done todos into the archive and returns them.
+
+    With ``before``, only todos done on or before that day move. The todos
+    are appended to the archive before they are removed from the
+    database, in one transaction, so if either step fails the database is
+    unchanged. When nothing moves the database is not written, and the
+    completion days of todos that are no longer live and done are
+    dropped either way.
+    """
+    completions = read_completions(db_path)
+    cutoff = before.isoformat() if before else None
+    moved: List[dict] = []
+    with manager.transaction() as batch:
+        todos, read_error = manager.read_todos()
+        if read_error != Code.SUCCESS:
+            batch.code = read_error
+        for todo in todos if batch.code == Code.SUCCESS else ():
+            done_on = completions.get(todo["ID"], "")
+            if todo["Done"] and (cutoff is None or done_on <= cutoff):
+                moved.append(manager.remove(todo["ID"]).todo)
+        if moved and batch.code == Code.SUCCESS:
+            batch.code = _append(
+                archive_path(db_path, policy.compression),
+                policy.compression,
+                moved,
+                manager.durability,
+            )
+    if batch.code != Code.SUCCESS:
+        return DBResponse([], batch.code)
+    moved_ids = {todo["ID"] for todo in moved}
+    done_ids = [
+        todo["ID"]
+        for todo in todos
+        if todo["Done"] and todo["ID"] not in moved_ids
+    ]
+    _prune_completions(db_path, completions, done_ids)
+    return DBResponse(moved, Code.SUCCESS)
+
+
+def iter_archived(db_path: Path) -> Iterator[Todo]:
+    """Yields archived todos one line at a time, from every archive.
+
+    A line torn by a crash mid-append is skipped, and so is the rest of a
+    compressed archive cut short.
+    """
+    for compression in COMPRESSIONS:
+        path = archive_path(db_path, compression)
+        if not path.exists():
+            continue
+        with path.open("rb") as raw, _open(raw, compression, "rb") as archive:
+            try:
+                for line in archive:
+                    try:
+                        yield Todo.from_dict(codec.loads(line))
+                    except ValueError:
+                        continue
+            except EOFError:
+                continue
+
+
+def with_archived(todos: Iterable[dict], db_path: Path) -> Iterator[dict]:
+    """Yields ``todos`` followed by the archived todos not among them.
+
+    A todo can be in both after a crash between archiving and removing it.
+    """
+    ids = set()
+
+    def note(todo: dict) -> dict:
+        ids.add(todo["ID"])
+        return todo
+
+    archived = (
+        todo for todo in iter_archived(db_path) if todo["ID"] not in ids
+    )
+    return chain(map(note, todos), archived)
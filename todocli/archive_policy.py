@@ -0,0 +1,14 @@
+"""The settings of ``todocli archive``, read by the config file.
+
+Kept apart from ``archive`` so that reading the config, which every
+command does, does not import the archive and the engines behind it.
+"""
+from typing import NamedTuple, Optional
+
+COMPRESSIONS = {"none": "", "gzip": ".gz", "lzma": ".xz"}
+DEFAULT_COMPRESSION = "gzip"
+
+
+class ArchivePolicy(NamedTuple):
+    compression: str = DEFAULT_COMPRESSION
+    after_days: Optional[int] = None
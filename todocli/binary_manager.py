@@ -0,0 +1,161 @@
+"""Binary storage for the to-do database.
+
+The file starts with ``MAGIC`` and holds one record per entry. A record is
+a fixed ``RECORD`` header, the length of the description, the ID, the
+priority as a byte, a flags byte and the due date as a day ordinal, followed
+by the UTF-8 description. Removed IDs are kept as records with the
+``REMOVED`` flag, so IDs are never handed out twice. Nothing has to be
+parsed as text and a record can be read without looking ahead, so the file
+is both smaller than JSON and quicker to decode.
+"""
+import struct
+from datetime import date
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from todocli.durability import Durability, atomic_open
+from todocli.return_codes import Code
+from todocli.sorting import date_ordinal
+from todocli.todo import Todo, gc_paused
+from todocli.todo_manager import DBResponse, TodoManager, resident_read
+
+MAGIC = b"TODOBIN1"
+# Description length, ID, Priority, flags and Due ordinal, 0 if undated.
+RECORD = struct.Struct("<IIBBI")
+DONE = 0x01
+REMOVED = 0x02
+READ_CHUNK = 256 * 1024
+CHUNK_RECORDS = 4096
+# struct.error is a todo that does not fit in a record, e.g. a priority above
+# 255.
+WRITE_ERRORS = (OSError, struct.error)
+
+
+def iter_records(entries: Iterable[Any]) -> Iterator[bytes]:
+    """Encodes todos, and the IDs of removed todos, a chunk at a time."""
+    pack = RECORD.pack
+    # Todos share few due dates, so each is only parsed once.
+    ordinals: dict = {None: 0}
+    chunk = []
+    for entry in entries:
+        if isinstance(entry, int):
+            chunk.append(pack(0, entry, 0, REMOVED, 0))
+        else:
+            due = entry["Due"]
+            if due not in ordinals:
+                ordinals[due] = date_ordinal(due)
+            description = entry["Description"].encode()
+            flags = DONE if entry["Done"] else 0
+            chunk.append(
+                pack(
+                    len(description),
+                    entry["ID"],
+                    entry["Priority"],
+                    flags,
+                    ordinals[due],
+                )
+            )
+            chunk.append(description)
+        if len(chunk) >= CHUNK_RECORDS:
+            yield b"".join(chunk)
+            chunk = []
+    yield b"".join(chunk)
+
+
+def iter_entries(db: IO[bytes]) -> Iterator[Any]:
+    """Yields the todos, and removed IDs, of a binary database file.
+
+    The file is read ``READ_CHUNK`` bytes at a time. Raises ``ValueError``
+    if it is not a binary database or ends in the middle of a record.
+    """
+    if db.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a binary to-do database")
+    unpack_from = RECORD.unpack_from
+    size = RECORD.size
+    due_dates: dict = {0: None}
+    data = b""
+    pos = 0
+    while True:
+        chunk = db.read(READ_CHUNK)
+        if not chunk:
+            if pos < len(data):
+                raise ValueError("truncated record")
+            return
+        data = data[pos:] + chunk
+        pos = 0
+        end = len(data)
+        while pos + size <= end:
+            length, todo_id, priority, flags, due = unpack_from(data, pos)
+            if pos + size + length > end:
+                break
+            pos += size
+            if flags & REMOVED:
+                yield todo_id
+                continue
+            if due not in due_dates:
+                due_dates[due] = date.fromordinal(due).isoformat()
+            yield Todo(
+                todo_id,
+                data[pos : pos + length].decode(),  # noqa: E203
+                priority,
+                due_dates[due],
+                bool(flags & DONE),
+            )
+            pos += length
+
+
+class BinaryTodoManager(TodoManager):
+    def __init__(
+        self, db_path: Path, durability: Optional[Durability] = None
+    ) -> None:
+        super().__init__(db_path, durability)
+
+    @staticmethod
+    def create(db_path: Path) -> Code:
+        """Creates an empty database."""
+        try:
+            db_path.write_bytes(MAGIC)
+            return Code.SUCCESS
+        except OSError:
+            return Code.DB_INIT_ERROR
+
+    def write_entries(self, entries: Iterable[Any]) -> Code:
+        """Replaces the database with ``entries``, encoded as they arrive."""
+        try:
+            with atomic_open(self._db_path, self.durability, "wb") as db:
+                db.write(MAGIC)
+                for chunk in iter_records(entries):
+                    db.write(chunk)
+        except WRITE_ERRORS:
+            return Code.DB_WRITE_ERROR
+        return Code.SUCCESS
+
+    def _write_todos(self, todos: list) -> DBResponse:
+        """Writes todos to a temporary file renamed over the database."""
+        write_error = self.write_entries(todos)
+        if write_error != Code.SUCCESS:
+            return DBResponse([], write_error)
+        return DBResponse(todos, Code.SUCCESS)
+
+    @resident_read
+    def read_todos(self, include_removed: bool = False) -> DBResponse:
+        """Reads todos."""
+        try:
+            with gc_paused():
+                todos = list(self.iter_todos(include_removed))
+        except OSError:
+            return DBResponse([], Code.DB_READ_ERROR)
+        except ValueError:
+            return DBResponse([], Code.JSON_ERROR)
+        return DBResponse(todos, Code.SUCCESS)
+
+    def iter_todos(self, include_removed: bool = False) -> Iterator[Any]:
+        """Yields todos one record at a time.
+
+        Raises ``OSError`` if the database cannot be read and
+        ``ValueError`` if it is not a valid binary database.
+        """
+        with self._db_path.open("rb") as db:
+            for entry in iter_entries(db):
+                if include_removed or isinstance(entry, Todo):
+                    yield entry
@@ -0,0 +1,91 @@
+"""A marshal copy of the parsed JSON database, kept next to it.
+
+Decoding marshal is much faster than decoding JSON, so a warm read skips
+the JSON decoder entirely. Todos are cached as tuples of their fields,
+which marshal decodes quicker than dicts, and the due dates they share are
+only stored once. The cache starts with a header recording the inode,
+mtime and size of the database it was made from, which can be checked
+without loading the todos, and is ignored once the database no longer
+matches, e.g. after another program edited it. Failing to read or write
+the cache is never an error; the database is simply decoded again.
+"""
+import marshal
+import os
+from pathlib import Path
+from typing import IO, Optional, Tuple
+
+from todocli.durability import SIDECAR, atomic_open
+from todocli.todo import Todo, gc_paused
+
+CACHE_VERSION = 3
+Signature = Tuple[int, int, int]
+
+
+def stat_signature(stat: os.stat_result) -> Signature:
+    """Identifies a version of a file by its inode, mtime and size."""
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def file_signature(path: Path) -> Signature:
+    return stat_signature(path.stat())
+
+
+def cache_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.cache"
+
+
+def _header_matches(cache: IO[bytes], signature: Signature) -> bool:
+    version, cached_signature = marshal.load(cache)
+    return version == CACHE_VERSION and tuple(cached_signature) == signature
+
+
+def is_current(db_path: Path, signature: Signature) -> bool:
+    """Returns whether the cache was made from ``signature``, reading
+    only its header."""
+    try:
+        with cache_path(db_path).open("rb") as cache:
+            return _header_matches(cache, signature)
+    except (OSError, EOFError, ValueError, TypeError):
+        return False
+
+
+def load(db_path: Path, signature: Signature) -> Optional[list]:
+    """Returns the cached todos if they were made from ``signature``."""
+    try:
+        with cache_path(db_path).open("rb") as cache:
+            if not _header_matches(cache, signature):
+                return None
+            data = cache.read()
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    try:
+        with gc_paused():
+            rows = marshal.loads(data)
+            # Each row is dropped as its todo replaces it.
+            for offset, row in enumerate(rows):
+                if row.__class__ is tuple:
+                    rows[offset] = Todo(*row)
+    except (EOFError, ValueError, TypeError):
+        return None
+    return rows
+
+
+def refresh(db_path: Path, todos: list) -> None:
+    """Caches ``todos`` as the contents just written to the database."""
+    try:
+        store(db_path, file_signature(db_path), todos)
+    except OSError:
+        pass
+
+
+def store(db_path: Path, signature: Signature, todos: list) -> None:
+    """Caches ``todos`` as the contents of the database at ``signature``."""
+    rows = [
+        todo.as_tuple() if isinstance(todo, Todo) else todo for todo in todos
+    ]
+    try:
+        with atomic_open(cache_path(db_path), SIDECAR, "wb") as cache:
+            cache.write(marshal.dumps((CACHE_VERSION, signature)))
+            cache.write(marshal.dumps(rows))
+    except (OSError, ValueError):
+        pass
@@ -1,17 +1,26 @@
-"""This module provides the To-Do CLI."""
-from datetime import datetime
+"""This module provides the To-Do CLI.
+
+Modules only some commands need, such as PrettyTable for ``list``, are
+imported inside those commands so that every invocation does not pay for
+them. ``tests/test_startup.py`` lists the modules a start may import.
+"""
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
-from prettytable import PrettyTable
 
-from todocli import __app_name__, __version__, config
+from todocli import __app_name__, __version__, config, daemon
+from todocli.engines import DEFAULT_ENGINE, open_manager
 from todocli.return_codes import Code
-from todocli.todo_manager import TodoManager
+from todocli.sorting import FIELDS, parse_sort_by, select
+from todocli.todo_manager import DT_FORMAT, DBResponse, TodoManager
+from todocli.transfer import EXPORT_FORMATS, IMPORT_FORMATS
 
-DT_FORMAT = "%Y-%m-%d"
 app = typer.Typer()
+db_app = typer.Typer(help="Manages the to-do database file.")
+app.add_typer(db_app, name="db")
+CONVERT_ENGINES = {"json": ".json", "binary": ".bin", "fixed": ".fixed"}
 
 
 def _version_callback(value: bool) -> None:
@@ -22,15 +31,27 @@ def _version_callback(value: bool) -> None:
 
 @app.command()
 def init(
-    db_path: Path = typer.Option(
-        config.DEFAULT_DB_FILE_PATH,
+    db_path: str = typer.Option(
+        str(config.DEFAULT_DB_FILE_PATH),
         "--db-path",
         "-db",
         prompt="to-do database location?",
+        help="Database file, optionally prefixed with an engine "
+        "such as journal://todo.journal or sqlite://todo.db",
+    ),
+    durability: str = typer.Option(
+        config.DEFAULT_MODE,
+        help="When writes are fsynced: always, batch or none.",
+    ),
+    fmt: str = typer.Option(
+        config.DEFAULT_FORMAT,
+        "--format",
+        help="Layout of a JSON database: pretty or compact.",
     ),
 ) -> None:
     """Initialize the to-do database."""
-    app_init_error = config.init_app(db_path)
+    engine, path = config.parse_db_url(db_path)
+    app_init_error = config.init_app(path, engine, durability, fmt)
     if app_init_error != Code.SUCCESS:
         typer.secho(
             f'Creating config file failed with "{app_init_error.value}"',
@@ -44,7 +65,8 @@ def init(
         )
 
 
-def get_todoer():
+def get_todoer(use_daemon: bool = True):
+    """Returns a client for a running daemon, or opens the database."""
     db_path = config.get_db_path()
     if db_path == Code.CONFIG_READ_ERROR:
         typer.secho(
@@ -58,7 +80,47 @@ def get_todoer():
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
-    return TodoManager(db_path)
+    if use_daemon:
+        client = daemon.connect(db_path)
+        if client is not None:
+            return client
+    engine = config.get_db_engine()
+    settings = {"durability": config.get_durability()}
+    if engine == DEFAULT_ENGINE:
+        settings["fmt"] = config.get_format()
+    for setting in [engine, *settings.values()]:
+        if isinstance(setting, Code):
+            typer.secho(
+                f'Invalid config file: "{setting.value}"',
+                fg=typer.colors.RED,
+            )
+            raise typer.Exit(1)
+    return open_manager(db_path, engine, **settings)
+
+
+def get_archive_policy():
+    """Returns the archive policy, exiting on an invalid config file."""
+    policy = config.get_archive_policy()
+    if isinstance(policy, Code):
+        typer.secho(
+            f'Invalid config file: "{policy.value}"', fg=typer.colors.RED
+        )
+        raise typer.Exit(1)
+    return policy
+
+
+def auto_archive() -> None:
+    """Archives todos done ``archive_after_days`` ago, if that is set."""
+    from todocli import archive
+
+    policy = get_archive_policy()
+    if policy.after_days is None:
+        return
+    db_path = config.get_db_path()
+    cutoff = date.today() - timedelta(days=policy.after_days)
+    toder = get_todoer(use_daemon=False)
+    if archive.archive_due(toder, db_path, cutoff):
+        archive.archive_done(toder, db_path, policy, cutoff)
 
 
 @app.command()
@@ -82,29 +144,234 @@ def add(
         f"""with priority: {priority}""",
         fg=typer.colors.GREEN,
     )
+    auto_archive()
 
 
-@app.command(name="complete")
-def set_done(todo_id: int = typer.Argument(...)) -> None:
-    """Set a todo as done in the to-do database using its ID."""
-    toder = get_todoer()
-    todo, error = toder.set_done(todo_id)
-    if error != Code.SUCCESS:
+@app.command(name="import")
+def import_todos(
+    source: typer.FileText = typer.Argument(
+        "-", help="CSV or NDJSON file to read, - for stdin."
+    ),
+    fmt: str = typer.Option(
+        None,
+        "--format",
+        help=f"One of {', '.join(IMPORT_FORMATS)}, guessed from the file "
+        "name.",
+    ),
+    chunk_size: int = typer.Option(
+        1000, min=1, help="Number of todos committed per write."
+    ),
+) -> None:
+    """Adds todos in bulk from a CSV or NDJSON file."""
+    import time
+
+    from todocli.transfer import chunked, guess_format, read_new_todos
+
+    fmt = fmt or guess_format(getattr(source, "name", "-"))
+    if fmt not in IMPORT_FORMATS:
         typer.secho(
-            f'Completing to-do failed with "{error.value}"',
+            f"'{fmt}' is invalid try:{','.join(IMPORT_FORMATS)} ",
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
+    toder = get_todoer(use_daemon=False)
+    imported = 0
+    start = time.perf_counter()
+    try:
+        for chunk in chunked(read_new_todos(source, fmt), chunk_size):
+            with toder.transaction() as batch:
+                for description, priority, due in chunk:
+                    toder.add(description, priority, due)
+            if batch.code != Code.SUCCESS:
+                typer.secho(
+                    f'Importing to-dos failed with "{batch.code.value}" '
+                    f"after {imported} to-dos",
+                    fg=typer.colors.RED,
+                )
+                raise typer.Exit(1)
+            imported += len(chunk)
+    except ValueError as error:
+        typer.secho(
+            f"Importing to-dos failed at {error} after {imported} to-dos",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    elapsed = time.perf_counter() - start
+    rate = imported / elapsed if elapsed else 0
     typer.secho(
-        f"""to-do: "{todo['Description']}" was completed """,
+        f"Imported {imported} to-dos in {elapsed:.2f}s ({rate:.0f} rows/s)",
         fg=typer.colors.GREEN,
     )
 
 
 @app.command()
-def remove(todo_id: int = typer.Argument(...)) -> None:
+def export(
+    fmt: str = typer.Option(
+        "ndjson", "--format", help=f"One of {', '.join(EXPORT_FORMATS)}."
+    ),
+    output: typer.FileTextWrite = typer.Option(
+        "-", "--output", "-o", help="File to write, - for stdout."
+    ),
+) -> None:
+    """Streams every todo out as JSON, NDJSON or CSV."""
+    from todocli.transfer import write_todos
+
+    if fmt not in EXPORT_FORMATS:
+        typer.secho(
+            f"'{fmt}' is invalid try:{','.join(EXPORT_FORMATS)} ",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(1)
+    toder = get_todoer(use_daemon=False)
+    try:
+        write_todos(toder.iter_todos(), output, fmt)
+    except OSError:
+        error = Code.DB_READ_ERROR
+    except ValueError:
+        error = Code.JSON_ERROR
+    else:
+        return
+    typer.secho(
+        f'Exporting to-dos failed with "{error.value}"',
+        fg=typer.colors.RED,
+        err=True,
+    )
+    raise typer.Exit(1)
+
+
+WHERE_HELP = (
+    'A filter such as "priority <= 2 and not done and due < 2026-11-01".'
+)
+
+
+def parse_where_or_exit(where: str):
+    """Compiles a ``--where`` expression, exiting if it is invalid."""
+    from todocli.where import parse_where
+
+    try:
+        return parse_where(where)
+    except ValueError as error:
+        typer.secho(f'Invalid --where "{where}": {error}', fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+
+def apply_where_or_exit(compiled, op: str, action: str) -> list:
+    """Runs ``op`` on every todo matching ``compiled`` in one transaction."""
+    from todocli.where import apply_where
+
+    todos, error = apply_where(get_todoer(use_daemon=False), compiled, op)
+    if error != Code.SUCCESS:
+        typer.secho(
+            f'{action} to-dos failed with "{error.value}"',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    return todos
+
+
+MATCH_HELP = "A description to find the todo by, typos and all."
+
+
+def _check_one_of(*picks) -> None:
+    if sum(pick is not None for pick in picks) != 1:
+        typer.secho(
+            "Pass one of a to-do ID, --where or --match", fg=typer.colors.RED
+        )
+        raise typer.Exit(1)
+
+
+def match_id_or_exit(toder, text: str) -> int:
+    """Returns the ID of the todo closest to ``text``.
+
+    Exits when no todo is close enough or two are equally close.
+    """
+    from todocli.fuzzy import score
+
+    todos, error = toder.match_todos(text, 2)
+    if error != Code.SUCCESS:
+        typer.secho(
+            f'Matching to-dos failed with "{error.value}"',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    if not todos:
+        typer.secho(f'No to-do matches "{text}"', fg=typer.colors.RED)
+        raise typer.Exit(1)
+    if len(todos) == 2 and score(todos[0], text) == score(todos[1], text):
+        typer.secho(
+            f'"{text}" matches to-dos {todos[0]["ID"]} and '
+            f'{todos[1]["ID"]} equally, pass an ID instead',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    return todos[0]["ID"]
+
+
+@app.command(name="complete")
+def set_done(
+    todo_id: int = typer.Argument(None, metavar="TODO_ID"),
+    where: str = typer.Option(
+        None, help=f"Complete every todo matching it. {WHERE_HELP}"
+    ),
+    match: str = typer.Option(None, help=MATCH_HELP),
+) -> None:
+    """Set a todo as done in the to-do database using its ID."""
+    from todocli import archive
+
+    _check_one_of(todo_id, where, match)
+    if where is not None:
+        from todocli.where import not_done
+
+        # Todos already done keep the day they were first completed.
+        compiled = not_done(parse_where_or_exit(where))
+        todos = apply_where_or_exit(compiled, "set_done", "Completing")
+        typer.secho(f"Completed {len(todos)} to-dos", fg=typer.colors.GREEN)
+    else:
+        toder = get_todoer()
+        if match is not None:
+            todo_id = match_id_or_exit(toder, match)
+        todo, error = toder.set_done(todo_id)
+        if error != Code.SUCCESS:
+            typer.secho(
+                f'Completing to-do failed with "{error.value}"',
+                fg=typer.colors.RED,
+            )
+            raise typer.Exit(1)
+        typer.secho(
+            f"""to-do: "{todo['Description']}" was completed """,
+            fg=typer.colors.GREEN,
+        )
+        todos = [todo]
+    archive.record_completions(
+        config.get_db_path(), [todo["ID"] for todo in todos], date.today()
+    )
+    auto_archive()
+
+
+@app.command()
+def remove(
+    todo_id: int = typer.Argument(None, metavar="TODO_ID"),
+    where: str = typer.Option(
+        None, help=f"Remove every todo matching it. {WHERE_HELP}"
+    ),
+    match: str = typer.Option(None, help=MATCH_HELP),
+) -> None:
     """Removes a todo from the to-do database using its ID."""
+    from todocli import archive
+
+    _check_one_of(todo_id, where, match)
+    if where is not None:
+        compiled = parse_where_or_exit(where)
+        todos = apply_where_or_exit(compiled, "remove", "Removing")
+        archive.forget_completions(
+            config.get_db_path(), [todo["ID"] for todo in todos]
+        )
+        typer.secho(f"Removed {len(todos)} to-dos", fg=typer.colors.GREEN)
+        return
     toder = get_todoer()
+    if match is not None:
+        todo_id = match_id_or_exit(toder, match)
     todo, error = toder.remove(todo_id)
     if error != Code.SUCCESS:
         typer.secho(
@@ -112,15 +379,51 @@ def remove(todo_id: int = typer.Argument(...)) -> None:
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
+    archive.forget_completions(config.get_db_path(), [todo["ID"]])
     typer.secho(
         f"""to-do: "{todo['Description']}" was removed """,
         fg=typer.colors.GREEN,
     )
 
 
+@app.command(name="archive")
+def archive_todos(
+    older_than: int = typer.Option(
+        None,
+        min=0,
+        help="Only archive todos completed at least this many days ago.",
+    ),
+) -> None:
+    """Moves completed todos out of the to-do database into its archive.
+
+    Archived todos are still shown by list --include-archived.
+    """
+    from todocli import archive
+
+    policy = get_archive_policy()
+    toder = get_todoer(use_daemon=False)
+    db_path = config.get_db_path()
+    before = None
+    if older_than is not None:
+        before = date.today() - timedelta(days=older_than)
+    todos, error = archive.archive_done(toder, db_path, policy, before)
+    if error != Code.SUCCESS:
+        typer.secho(
+            f'Archiving to-dos failed with "{error.value}"',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    path = archive.archive_path(db_path, policy.compression)
+    typer.secho(
+        f'Archived {len(todos)} to-dos to "{path}"', fg=typer.colors.GREEN
+    )
+
+
 @app.command()
 def clear() -> None:
     """Clears all todos from the to-do database using its ID."""
+    from todocli import archive
+
     toder = get_todoer()
     todo, error = toder.remove_all()
     if error != Code.SUCCESS:
@@ -129,46 +432,257 @@ def clear() -> None:
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
+    archive.forget_completions(config.get_db_path())
     typer.secho(
         """Cleared all todos""",
         fg=typer.colors.GREEN,
     )
 
 
+def _select_filtered(
+    toder, where, include_archived, fields, offset, limit
+) -> DBResponse:
+    """Selects a page of the todos matching ``where``, if it is given.
+
+    With ``include_archived`` the archived todos follow the open ones.
+    """
+    from todocli import archive
+    from todocli.where import matching_todos
+
+    try:
+        if where is not None and not include_archived:
+            todos, error = matching_todos(toder, where)
+            if error != Code.SUCCESS:
+                return DBResponse([], error)
+        else:
+            todos = toder.iter_todos()
+            if include_archived:
+                todos = archive.with_archived(todos, config.get_db_path())
+            if where is not None:
+                todos = filter(where.predicate, todos)
+        return DBResponse(select(todos, fields, offset, limit), Code.SUCCESS)
+    except OSError:
+        return DBResponse([], Code.DB_READ_ERROR)
+    except ValueError:
+        return DBResponse([], Code.JSON_ERROR)
+
+
 @app.command()
-def list(sort_by: str = typer.Option(None)) -> None:
-    """Clears a todo from the to-do database using its ID."""
+def list(
+    sort_by: str = typer.Option(
+        None, help="Comma separated fields to sort by, e.g. Priority,Due."
+    ),
+    limit: int = typer.Option(
+        None, min=1, help="Show at most this many todos."
+    ),
+    offset: int = typer.Option(0, min=0, help="Skip this many todos."),
+    top: int = typer.Option(
+        None,
+        min=1,
+        help="Show the first N todos by --sort-by, Priority by default.",
+    ),
+    include_archived: bool = typer.Option(
+        False, help="Also list archived todos, after the open ones."
+    ),
+    where: str = typer.Option(None, help=f"Only list matches. {WHERE_HELP}"),
+) -> None:
+    """Lists the todos in the to-do database."""
+    try:
+        fields = parse_sort_by(sort_by)
+    except ValueError as error:
+        typer.secho(
+            f"'{error}' is invalid try:{','.join(FIELDS)} ",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    if top is not None:
+        limit = top
+        fields = fields or ["Priority"]
+    compiled = None if where is None else parse_where_or_exit(where)
     toder = get_todoer()
-    todos, error = toder.read_todos()
+    if compiled is not None or include_archived:
+        todos, error = _select_filtered(
+            toder, compiled, include_archived, fields, offset, limit
+        )
+    else:
+        todos, error = toder.select_todos(fields, offset, limit)
     if error != Code.SUCCESS:
         typer.secho(
             f'Listing to-do failed with "{ error.value}"',
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
+    if len(todos) == 0:
+        if offset:
+            message = f"There are no tasks after the first {offset}"
+        elif where is not None:
+            message = "There are no tasks matching --where"
+        else:
+            message = "There are no tasks in the to-do list yet"
+        typer.secho(message, fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    print_table(todos)
+
+
+def print_table(todos: List[dict]) -> None:
+    from prettytable import PrettyTable
+
+    table = PrettyTable()
+    table.field_names = FIELDS
+    for todo in todos:
+        table.add_row([todo[field] for field in FIELDS])
+    typer.secho(
+        table.get_string(),
+        fg=typer.colors.BLUE,
+    )
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(...),
+    limit: int = typer.Option(
+        None, min=1, help="Show at most this many todos."
+    ),
+) -> None:
+    """Finds the todos whose descriptions hold every word of the query.
+
+    The best matches come first: the query as a phrase, then the
+    descriptions the query words make up most of.
+    """
+    toder = get_todoer()
+    todos, error = toder.search_todos(query, limit)
+    if error != Code.SUCCESS:
+        typer.secho(
+            f'Searching to-dos failed with "{error.value}"',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
     if len(todos) == 0:
         typer.secho(
-            "There are no tasks in the to-do list yet", fg=typer.colors.RED
+            f'There are no tasks matching "{query}"', fg=typer.colors.RED
         )
         raise typer.Exit(1)
+    print_table(todos)
+
+
+@app.command()
+def stats(
+    oneline: bool = typer.Option(
+        False, help="Print the totals on one line, e.g. for a status bar."
+    ),
+) -> None:
+    """Counts the todos by priority and state, and the open ones that are
+    overdue or due this week, from today to six days ahead."""
+    toder = get_todoer()
+    counts, error = toder.read_stats()
+    if error != Code.SUCCESS:
+        typer.secho(
+            f'Counting to-dos failed with "{error.value}"',
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    today = date.today()
+    yesterday = (today - timedelta(days=1)).strftime(DT_FORMAT)
+    week_end = (today + timedelta(days=6)).strftime(DT_FORMAT)
+    overdue = counts.count_open_due(due_to=yesterday)
+    this_week = counts.count_open_due(today.strftime(DT_FORMAT), week_end)
+    totals = (
+        f"{counts.count(done=False)} open, {counts.count(done=True)} done, "
+        f"{overdue} overdue, {this_week} due this week"
+    )
+    if oneline:
+        typer.echo(totals)
+        return
+    from prettytable import PrettyTable
 
     table = PrettyTable()
-    table.field_names = ["ID", "Description", "Priority", "Due", "Done"]
-    if sort_by and sort_by not in table.field_names:
+    table.field_names = ["Priority", "Open", "Done"]
+    for priority in sorted({priority for priority, _ in counts.counts}):
+        table.add_row(
+            [
+                priority,
+                counts.count(priority, done=False),
+                counts.count(priority, done=True),
+            ]
+        )
+    typer.secho(table.get_string(), fg=typer.colors.BLUE)
+    typer.echo(totals)
+
+
+@db_app.command()
+def convert(
+    to: str = typer.Option(
+        ..., "--to", help=f"One of {', '.join(CONVERT_ENGINES)}."
+    ),
+    output: str = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="New database file, the current one with the engine's "
+        "extension by default.",
+    ),
+) -> None:
+    """Converts the to-do database to another engine and switches to it.
+
+    Todos are streamed from one file to the other. The old database is
+    left in place.
+    """
+    if to not in CONVERT_ENGINES:
+        typer.secho(
+            f"'{to}' is invalid try:{','.join(CONVERT_ENGINES)} ",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    toder = get_todoer(use_daemon=False)
+    db_path = config.get_db_path()
+    new_path = (
+        Path(output) if output else db_path.with_suffix(CONVERT_ENGINES[to])
+    )
+    if not isinstance(toder, TodoManager) or new_path == db_path:
+        typer.secho(f'Cannot convert "{db_path}" to {to}', fg=typer.colors.RED)
+        raise typer.Exit(1)
+    options = {}
+    if to == DEFAULT_ENGINE and config.get_format() in config.FORMATS:
+        options["fmt"] = config.get_format()
+    target = open_manager(new_path, to, toder.durability, **options)
+    error = toder.copy_to(target)
+    if error == Code.SUCCESS:
+        error = config.set_database(new_path, to)
+    if error != Code.SUCCESS:
         typer.secho(
-            f"'{sort_by}' is invalid try:{','.join(table.field_names)} ",
+            f'Converting to-do database failed with "{error.value}"',
             fg=typer.colors.RED,
         )
         raise typer.Exit(1)
-    for id, todo in enumerate(todos, start=1):
-        desc, priority, due, done = todo.values()
-        table.add_row([id, desc, priority, due, done])
-    table.sortby = sort_by
-    table.sort_key = lambda x: str(x)
+    typer.secho(f'The to-do database is "{new_path}"', fg=typer.colors.GREEN)
+
+
+@app.command()
+def serve() -> None:
+    """Serves the to-do database from memory on a local socket.
+
+    Other todocli commands forward to it while it runs.
+    """
+    import signal
+    import sys
+
+    from todocli import server
+
+    toder = get_todoer(use_daemon=False)
+    db_path = config.get_db_path()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     typer.secho(
-        table.get_string(),
-        fg=typer.colors.BLUE,
+        f'Serving "{db_path}" on "{daemon.socket_path(db_path)}"',
+        fg=typer.colors.GREEN,
     )
+    try:
+        server.serve(toder, db_path)
+    except OSError as error:
+        typer.secho(f"Serving failed: {error}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
 
 
 @app.callback()
@@ -0,0 +1,79 @@
+"""JSON encoding for the file engines, using orjson when it is installed.
+
+``pretty`` output is indented for people who read or edit the database by
+hand, ``compact`` output has no whitespace at all, which makes files about
+half the size and quicker to write. orjson can only indent by two spaces,
+so pretty files it writes are indented by two spaces rather than four.
+
+orjson is imported on first use rather than on import, because reads
+served from the cache never decode JSON and startup time matters.
+"""
+import json
+from typing import Any, Iterable, Iterator, Union
+
+from todocli.todo import to_json
+
+FORMATS = ("pretty", "compact")
+DEFAULT_FORMAT = "pretty"
+
+# None until the first call, then the orjson module or False.
+_orjson: Any = None
+
+
+def _accelerated():
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson
+        except ImportError:
+            orjson = False
+        _orjson = orjson
+    return _orjson
+
+
+def dumps(obj: Any, fmt: str = DEFAULT_FORMAT) -> bytes:
+    """Encodes ``obj`` in the ``pretty`` or ``compact`` format.
+
+    Todos in ``obj`` are encoded as objects.
+    """
+    orjson = _accelerated()
+    if orjson:
+        return orjson.dumps(
+            obj,
+            default=to_json,
+            option=orjson.OPT_INDENT_2 if fmt == "pretty" else 0,
+        )
+    if fmt == "pretty":
+        return json.dumps(obj, indent=4, default=to_json).encode()
+    return json.dumps(obj, separators=(",", ":"), default=to_json).encode()
+
+
+def iter_array(
+    items: Iterable[Any], fmt: str = DEFAULT_FORMAT
+) -> Iterator[bytes]:
+    """Encodes a JSON array a chunk at a time, in the layout of ``dumps``.
+
+    Only one item is encoded at a time, so ``items`` can be streamed.
+    """
+    indent = b""
+    if fmt == "pretty":
+        indent = b"\n  " if _accelerated() else b"\n    "
+    separator = b"["
+    for item in items:
+        yield separator + indent + dumps(item, fmt).replace(b"\n", indent)
+        separator = b","
+    if separator == b"[":
+        yield b"[]"
+    else:
+        yield b"\n]" if indent else b"]"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decodes JSON, raising ``json.JSONDecodeError`` if it is invalid.
+
+    orjson's decode error is a subclass of ``json.JSONDecodeError``.
+    """
+    orjson = _accelerated()
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
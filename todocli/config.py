@@ -1,12 +1,48 @@
 import configparser
 from pathlib import Path
-from typing import Union
+from typing import Any, Optional, Tuple, Union
 
+from todocli.archive_policy import (
+    COMPRESSIONS,
+    DEFAULT_COMPRESSION,
+    ArchivePolicy,
+)
+from todocli.cache import file_signature
+from todocli.codec import DEFAULT_FORMAT, FORMATS
+from todocli.durability import (
+    BATCH_COMMITS,
+    BATCH_INTERVAL_MS,
+    DEFAULT_MODE,
+    MODES,
+    Durability,
+)
+from todocli.engines import DEFAULT_ENGINE, ENGINES, get_engine
 from todocli.return_codes import Code
 
 CONFIG_DIR_PATH = Path.cwd()
 CONFIG_FILE_PATH = CONFIG_DIR_PATH / "config.ini"
 DEFAULT_DB_FILE_PATH = CONFIG_DIR_PATH / "todo.json"
+# The config file last parsed, keyed on its path and signature.
+_parsed: Optional[Tuple[Any, configparser.ConfigParser]] = None
+
+
+def _read_config() -> configparser.ConfigParser:
+    """Returns the parsed config file, parsing it again only once it
+    changes, so that one command reading several settings parses it once.
+
+    The parser is shared, so callers must not change it.
+    """
+    global _parsed
+    try:
+        key = (CONFIG_FILE_PATH, file_signature(CONFIG_FILE_PATH))
+    except OSError:
+        key = None
+    if key is not None and _parsed is not None and _parsed[0] == key:
+        return _parsed[1]
+    cfg = configparser.ConfigParser()
+    cfg.read(CONFIG_FILE_PATH)
+    _parsed = None if key is None else (key, cfg)
+    return cfg
 
 
 def _make_config_file():
@@ -18,7 +54,12 @@ def _make_config_file():
     return Code.SUCCESS
 
 
-def _init_config_file(db_path: Path):
+def _init_config_file(
+    db_path: Path,
+    engine: str = DEFAULT_ENGINE,
+    durability: str = DEFAULT_MODE,
+    fmt: str = DEFAULT_FORMAT,
+):
     config_parser = configparser.ConfigParser()
     try:
         db_path.parent.mkdir(exist_ok=True)
@@ -26,6 +67,12 @@ def _init_config_file(db_path: Path):
     except OSError:
         return Code.OS_ERROR
     config_parser["General"] = {"database": str(db_path)}
+    if engine != DEFAULT_ENGINE:
+        config_parser["General"]["engine"] = engine
+    if durability != DEFAULT_MODE:
+        config_parser["General"]["durability"] = durability
+    if fmt != DEFAULT_FORMAT:
+        config_parser["General"]["format"] = fmt
     try:
         with CONFIG_FILE_PATH.open("w") as file:
             config_parser.write(file)
@@ -34,32 +81,120 @@ def _init_config_file(db_path: Path):
     return Code.SUCCESS
 
 
-def init_database(db_path: Path) -> Code:
+def parse_db_url(db_url: str) -> Tuple[str, Path]:
+    """Split an ``engine://path`` database location into its parts.
+
+    Plain paths use the default JSON engine.
+    """
+    engine, sep, path = db_url.partition("://")
+    if not sep:
+        return DEFAULT_ENGINE, Path(db_url)
+    return engine, Path(path)
+
+
+def init_database(db_path: Path, engine: str = DEFAULT_ENGINE) -> Code:
     """Create the to-do database."""
-    try:
-        db_path.write_text("[]")
-        return Code.SUCCESS
-    except OSError:
-        return Code.DB_INIT_ERROR
+    return get_engine(engine).create(db_path)
 
 
-def init_app(db_path: Path):
+def init_app(
+    db_path: Path,
+    engine: str = DEFAULT_ENGINE,
+    durability: str = DEFAULT_MODE,
+    fmt: str = DEFAULT_FORMAT,
+):
+    if engine not in ENGINES:
+        return Code.ENGINE_ERROR
+    if durability not in MODES:
+        return Code.DURABILITY_ERROR
+    if fmt not in FORMATS:
+        return Code.FORMAT_ERROR
     made_config_files = _make_config_file()
     if made_config_files is not Code.SUCCESS:
         return made_config_files
-    init_config = _init_config_file(db_path)
+    init_config = _init_config_file(db_path, engine, durability, fmt)
     if init_config is not Code.SUCCESS:
         return init_config
-    init_db = init_database(db_path)
+    init_db = init_database(db_path, engine)
     if init_db is not Code.SUCCESS:
         return init_db
     return Code.SUCCESS
 
 
-def get_db_path() -> Union[Path, Code]:
+def set_database(db_path: Path, engine: str = DEFAULT_ENGINE) -> Code:
+    """Points the config file at another database, keeping its settings."""
     cfg = configparser.ConfigParser()
     cfg.read(CONFIG_FILE_PATH)
+    if not cfg.has_section("General"):
+        return Code.CONFIG_READ_ERROR
+    cfg["General"]["database"] = str(db_path)
+    if engine != DEFAULT_ENGINE:
+        cfg["General"]["engine"] = engine
+    else:
+        cfg.remove_option("General", "engine")
+    try:
+        with CONFIG_FILE_PATH.open("w") as file:
+            cfg.write(file)
+    except OSError:
+        return Code.OS_ERROR
+    return Code.SUCCESS
+
+
+def get_db_path() -> Union[Path, Code]:
+    cfg = _read_config()
     try:
         return Path(cfg["General"]["database"])
     except KeyError:
         return Code.CONFIG_READ_ERROR
+
+
+def get_db_engine() -> Union[str, Code]:
+    cfg = _read_config()
+    engine = cfg.get("General", "engine", fallback=DEFAULT_ENGINE)
+    return engine if engine in ENGINES else Code.ENGINE_ERROR
+
+
+def get_durability() -> Union[Durability, Code]:
+    """Reads the durability policy and its batch limits.
+
+    ``durability`` is one of always, batch or none, and ``fsync_interval_ms``
+    and ``fsync_commits`` bound how long a batch may stay unsynced.
+    """
+    cfg = _read_config()
+    try:
+        return Durability(
+            cfg.get("General", "durability", fallback=DEFAULT_MODE),
+            cfg.getint(
+                "General", "fsync_interval_ms", fallback=BATCH_INTERVAL_MS
+            ),
+            cfg.getint("General", "fsync_commits", fallback=BATCH_COMMITS),
+        )
+    except ValueError:
+        return Code.DURABILITY_ERROR
+
+
+def get_format() -> Union[str, Code]:
+    """Reads how the JSON engine lays out the database, pretty or compact."""
+    cfg = _read_config()
+    fmt = cfg.get("General", "format", fallback=DEFAULT_FORMAT)
+    return fmt if fmt in FORMATS else Code.FORMAT_ERROR
+
+
+def get_archive_policy() -> Union[ArchivePolicy, Code]:
+    """Reads how completed todos are archived.
+
+    ``archive_compression`` is one of none, gzip or lzma, and
+    ``archive_after_days``, when set, archives todos done that many days
+    ago whenever a todo is added or completed.
+    """
+    cfg = _read_config()
+    compression = cfg.get(
+        "General", "archive_compression", fallback=DEFAULT_COMPRESSION
+    )
+    try:
+        after_days = cfg.getint("General", "archive_after_days", fallback=None)
+    except ValueError:
+        return Code.ARCHIVE_ERROR
+    if compression not in COMPRESSIONS or (after_days or 0) < 0:
+        return Code.ARCHIVE_ERROR
+    return ArchivePolicy(compression, after_days)
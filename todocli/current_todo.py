@@ -1,8 +1,10 @@
-from typing import Any, Dict, NamedTuple
+from typing import Any, Dict, NamedTuple, Union
 
 from todocli.return_codes import Code
+from todocli.todo import Todo
 
 
 class CurrentTodo(NamedTuple):
-    todo: Dict[str, Any]
+    # An empty dict when there is no todo to return, e.g. on failure.
+    todo: Union[Todo, Dict[str, Any]]
     code: Code
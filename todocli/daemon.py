@@ -0,0 +1,177 @@
+"""The client the CLI forwards commands to when a daemon is running.
+
+``todocli serve`` (see ``todocli.server``) keeps one manager, and the todos
+it last read, in memory and answers requests on a Unix socket next to the
+database. The protocol
+is one JSON object per line in each direction: a request names a manager
+method and its arguments, ``{"op": "add", "args": ["task", 1, null]}``,
+and the reply carries the result and the name of its return code,
+``{"todo": {...}, "code": "SUCCESS"}``, ``{"todos": [...], "code": ...}`` or
+``{"stats": {...}, "code": ...}``. A request the daemon cannot run is
+answered with ``{"error": ...}``, which the client returns as
+``Code.DAEMON_ERROR``.
+"""
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional, Sequence
+
+from todocli.current_todo import CurrentTodo
+from todocli.return_codes import Code
+from todocli.todo import Todo, to_json
+from todocli.todo_manager import DBResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    import socket
+
+    from todocli.stats import StatsResponse
+
+OPS = (
+    "add",
+    "set_done",
+    "remove",
+    "remove_all",
+    "read_todos",
+    "select_todos",
+    "query_todos",
+    "search_todos",
+    "match_todos",
+    "read_stats",
+)
+CONNECT_TIMEOUT = 0.5
+
+
+def socket_path(db_path: Path) -> Path:
+    return db_path.parent / f"{db_path.name}.sock"
+
+
+def encode(message: dict) -> bytes:
+    message_json = json.dumps(message, separators=(",", ":"), default=to_json)
+    return (message_json + "\n").encode()
+
+
+def connect(db_path: Path) -> Optional["DaemonClient"]:
+    """Returns a client for the daemon serving ``db_path``, if one answers."""
+    path = socket_path(db_path)
+    if not path.exists():
+        return None
+    # Only imported once a daemon may be running, to keep startup fast.
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):  # pragma: no cover
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return DaemonClient(sock)
+
+
+class DaemonClient:
+    """Forwards manager calls to a daemon, one request per call."""
+
+    def __init__(self, sock: "socket.socket") -> None:
+        self._sock = sock
+        self._file = sock.makefile("rb")
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def _call(self, op: str, *args) -> dict:
+        try:
+            self._sock.sendall(encode({"op": op, "args": args}))
+            reply = json.loads(self._file.readline())
+        except (OSError, ValueError):
+            return {"code": Code.OS_ERROR.name}
+        if "error" in reply:
+            return {"code": Code.DAEMON_ERROR.name}
+        return reply
+
+    def _todo(self, op: str, *args) -> CurrentTodo:
+        reply = self._call(op, *args)
+        todo = reply.get("todo")
+        return CurrentTodo(
+            Todo.from_dict(todo) if todo else {}, Code[reply["code"]]
+        )
+
+    def _todos(self, op: str, *args) -> DBResponse:
+        reply = self._call(op, *args)
+        todos = [Todo.from_dict(todo) for todo in reply.get("todos", [])]
+        return DBResponse(todos, Code[reply["code"]])
+
+    def add(
+        self, description: str, priority: int, due: str = None
+    ) -> CurrentTodo:
+        """Add todo."""
+        return self._todo("add", description, priority, due)
+
+    def set_done(self, todo_id: int) -> CurrentTodo:
+        """Set a to-do as done."""
+        return self._todo("set_done", todo_id)
+
+    def remove(self, todo_id: int) -> CurrentTodo:
+        """Removes todo."""
+        return self._todo("remove", todo_id)
+
+    def remove_all(self) -> CurrentTodo:
+        """Removes all todos."""
+        return self._todo("remove_all")
+
+    def read_todos(self) -> DBResponse:
+        """Reads todos."""
+        return self._todos("read_todos")
+
+    def select_todos(
+        self,
+        sort_by: Sequence[str] = (),
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> DBResponse:
+        """Reads one sorted page of todos."""
+        return self._todos("select_todos", list(sort_by), offset, limit)
+
+    def query_todos(
+        self,
+        priority: Optional[int] = None,
+        done: Optional[bool] = None,
+        due_from: Optional[str] = None,
+        due_to: Optional[str] = None,
+    ) -> DBResponse:
+        """Reads the todos meeting every condition that is not None."""
+        return self._todos("query_todos", priority, done, due_from, due_to)
+
+    def search_todos(
+        self, query: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions hold every word of ``query``."""
+        return self._todos("search_todos", query, limit)
+
+    def match_todos(
+        self, text: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions approximately match ``text``."""
+        return self._todos("match_todos", text, limit)
+
+    def read_stats(self) -> "StatsResponse":
+        """Reads the counts of the todos."""
+        from todocli.stats import Stats, StatsResponse
+
+        reply = self._call("read_stats")
+        stats = reply.get("stats")
+        return StatsResponse(
+            Stats.from_json(stats) if stats else Stats(), Code[reply["code"]]
+        )
+
+    def iter_todos(self) -> Iterator[Todo]:
+        """Yields todos read by the daemon.
+
+        Raises ``OSError`` if the daemon cannot read the database.
+        """
+        todos, read_error = self.read_todos()
+        if read_error != Code.SUCCESS:
+            raise OSError(read_error.value)
+        yield from todos
@@ -0,0 +1,119 @@
+"""Atomic writes and the policy deciding when they are flushed to disk.
+
+``always`` fsyncs every write and the directory holding the renamed file,
+``batch`` fsyncs once every ``commits`` writes or ``interval_ms``
+milliseconds, whichever comes first, and at exit, and ``none`` leaves
+flushing to the operating system.
+"""
+import atexit
+import os
+import time
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+MODES = ("always", "batch", "none")
+DEFAULT_MODE = "batch"
+BATCH_INTERVAL_MS = 1000
+BATCH_COMMITS = 32
+
+
+def fsync_dir(path: Path) -> None:
+    """Flushes a directory entry, e.g. after renaming a file into it."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        # Directories cannot be opened on every platform.
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_path(path: Path) -> None:
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Durability:
+    def __init__(
+        self,
+        mode: str = DEFAULT_MODE,
+        interval_ms: int = BATCH_INTERVAL_MS,
+        commits: int = BATCH_COMMITS,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown durability {mode!r}")
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.commits = commits
+        self._pending: Optional[Path] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._at_exit = False
+
+    def sync_file(self, file: IO) -> None:
+        """Flushes an open file before it is renamed or closed."""
+        if self.mode == "always":
+            file.flush()
+            os.fsync(file.fileno())
+
+    def committed(self, path: Path, renamed: bool = True) -> None:
+        """Records a completed write to ``path``."""
+        if self.mode == "always":
+            if renamed:
+                fsync_dir(path.parent)
+            return
+        if self.mode == "none":
+            return
+        self._pending = path
+        self._unsynced += 1
+        elapsed_ms = (time.monotonic() - self._last_sync) * 1000
+        if self._unsynced >= self.commits or elapsed_ms >= self.interval_ms:
+            self.flush()
+        elif not self._at_exit:
+            atexit.register(self.flush)
+            self._at_exit = True
+
+    def flush(self) -> None:
+        """Fsyncs the last batched write, if any."""
+        path, self._pending = self._pending, None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        if path is None:
+            return
+        with suppress(FileNotFoundError):
+            fsync_path(path)
+            fsync_dir(path.parent)
+
+
+# Files kept next to the database, such as its cache, indexes and counts,
+# are never fsynced: losing one only costs rebuilding it from the database.
+SIDECAR = Durability("none")
+
+
+@contextmanager
+def atomic_open(
+    path: Path, durability: Durability, mode: str = "w"
+) -> Iterator[IO]:
+    """Opens a temporary file that replaces ``path`` once the block exits.
+
+    Readers see either the old or the new contents, never a partial write.
+    If the block raises the temporary file is removed and ``path`` is left
+    untouched.
+    """
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    try:
+        with tmp_path.open(mode) as file:
+            yield file
+            durability.sync_file(file)
+        os.replace(str(tmp_path), str(path))
+    except BaseException:
+        with suppress(OSError):
+            tmp_path.unlink()
+        raise
+    durability.committed(path)
@@ -0,0 +1,35 @@
+"""Storage engines that can back the to-do database."""
+from importlib import import_module
+from pathlib import Path
+from typing import Optional
+
+from todocli.durability import Durability
+
+DEFAULT_ENGINE = "json"
+ENGINES = {
+    "json": "todocli.todo_manager:TodoManager",
+    "journal": "todocli.journal:JournalTodoManager",
+    "sqlite": "todocli.sqlite_manager:SQLiteTodoManager",
+    "binary": "todocli.binary_manager:BinaryTodoManager",
+    "fixed": "todocli.fixed_manager:FixedTodoManager",
+}
+
+
+def get_engine(name: str):
+    """Import and return the manager class registered for an engine."""
+    module_name, _, class_name = ENGINES[name].partition(":")
+    return getattr(import_module(module_name), class_name)
+
+
+def open_manager(
+    db_path: Path,
+    engine: str = DEFAULT_ENGINE,
+    durability: Optional[Durability] = None,
+    **options,
+):
+    """Create the manager that reads and writes ``db_path``.
+
+    ``options`` are passed on to engines that take them, such as ``fmt``
+    for the JSON engine.
+    """
+    return get_engine(engine)(db_path, durability, **options)
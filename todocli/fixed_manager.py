@@ -0,0 +1,252 @@
+"""Fixed-width record storage for the to-do database.
+
+The file starts with a ``HEADER`` holding ``MAGIC`` and the number of
+records. Then come the records, each a fixed ``RECORD`` of the ID, the
+priority, a flags byte, the due date as a day ordinal and the offset and
+length of the description in the string heap that ends the file. Because
+every record has the same size and IDs only increase, a todo is found by
+binary search and ``set_done`` flips its flags byte in place through a
+memory map instead of rewriting the file. Every other write rewrites the
+file and renames it into place, as the other engines do.
+"""
+import mmap
+import os
+import struct
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional
+
+from todocli.binary_manager import WRITE_ERRORS, BinaryTodoManager
+from todocli.current_todo import CurrentTodo
+from todocli.durability import atomic_open
+from todocli.return_codes import Code
+from todocli.sorting import date_ordinal
+from todocli.todo import Todo
+from todocli.todo_manager import exclusive
+
+MAGIC = b"TODOFIX1"
+HEADER = struct.Struct("<8sI")
+# ID, Priority, flags, Due ordinal (0 if undated), heap offset and length.
+RECORD = struct.Struct("<IBBIII")
+FLAGS_AT = 5
+DONE = 0x01
+REMOVED = 0x02
+BLOCK_RECORDS = 4096
+
+
+def record_count(mapping: mmap.mmap) -> int:
+    """Returns the number of records, checking that they fit the file.
+
+    Raises ``ValueError`` if it is not a fixed-width database.
+    """
+    if len(mapping) < HEADER.size:
+        raise ValueError("not a fixed-width to-do database")
+    magic, count = HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC or HEADER.size + count * RECORD.size > len(mapping):
+        raise ValueError("not a fixed-width to-do database")
+    return count
+
+
+def find_record(mapping: mmap.mmap, todo_id: int) -> Optional[int]:
+    """Returns the position of the record for ``todo_id``, if there is one.
+
+    Records are stored in ID order, so this is a binary search that only
+    touches the pages it probes.
+    """
+    low, high = 0, record_count(mapping)
+    while low < high:
+        middle = (low + high) // 2
+        position = HEADER.size + middle * RECORD.size
+        (record_id,) = struct.unpack_from("<I", mapping, position)
+        if record_id == todo_id:
+            return position
+        if record_id < todo_id:
+            low = middle + 1
+        else:
+            high = middle
+    return None
+
+
+def decode_record(
+    mapping: mmap.mmap, position: int, heap: int, due_dates: dict
+) -> Any:
+    """Decodes the record at ``position`` into a todo or a removed ID.
+
+    ``heap`` is where the string heap starts and ``due_dates`` caches the
+    due date of each ordinal already seen.
+    """
+    todo_id, priority, flags, due, start, length = RECORD.unpack_from(
+        mapping, position
+    )
+    if flags & REMOVED:
+        return todo_id
+    start += heap
+    if start + length > len(mapping):
+        raise ValueError("description outside the string heap")
+    if due not in due_dates:
+        due_dates[due] = date.fromordinal(due).isoformat() if due else None
+    return Todo(
+        todo_id,
+        mapping[start : start + length].decode(),  # noqa: E203
+        priority,
+        due_dates[due],
+        bool(flags & DONE),
+    )
+
+
+def iter_mapping(mapping: mmap.mmap) -> Iterator[Any]:
+    """Decodes the todos, and removed IDs, of a mapped database lazily.
+
+    Records are copied out of the mapping ``BLOCK_RECORDS`` at a time,
+    together with the stretch of the heap their descriptions span, since
+    many small reads from a mapping are slower than a few larger ones.
+    """
+    heap = HEADER.size + record_count(mapping) * RECORD.size
+    due_dates: dict = {0: None}
+    block_size = BLOCK_RECORDS * RECORD.size
+    for block_start in range(HEADER.size, heap, block_size):
+        block_end = min(heap, block_start + block_size)
+        records = [*RECORD.iter_unpack(mapping[block_start:block_end])]
+        live = [record for record in records if not record[2] & REMOVED]
+        if live:
+            heap_start = heap + live[0][4]
+            heap_end = heap + live[-1][4] + live[-1][5]
+            if heap_end > len(mapping):
+                raise ValueError("description outside the string heap")
+            descriptions = mapping[heap_start:heap_end]
+            heap_start -= heap
+        for todo_id, priority, flags, due, start, length in records:
+            if flags & REMOVED:
+                yield todo_id
+                continue
+            if due not in due_dates:
+                due_dates[due] = date.fromordinal(due).isoformat()
+            start -= heap_start
+            yield Todo(
+                todo_id,
+                descriptions[start : start + length].decode(),  # noqa: E203
+                priority,
+                due_dates[due],
+                bool(flags & DONE),
+            )
+
+
+class FixedTodoManager(BinaryTodoManager):
+    @staticmethod
+    def create(db_path: Path) -> Code:
+        """Creates an empty database."""
+        try:
+            db_path.write_bytes(HEADER.pack(MAGIC, 0))
+            return Code.SUCCESS
+        except OSError:
+            return Code.DB_INIT_ERROR
+
+    def write_entries(self, entries: Iterable[Any]) -> Code:
+        """Replaces the database with ``entries``.
+
+        Records are written as they arrive and the descriptions are kept
+        until the end, where they form the string heap.
+        """
+        pack = RECORD.pack
+        ordinals: dict = {None: 0}
+        heap = []
+        heap_size = 0
+        count = 0
+        try:
+            with atomic_open(self._db_path, self.durability, "wb") as db:
+                db.write(HEADER.pack(MAGIC, 0))
+                for entry in entries:
+                    count += 1
+                    if isinstance(entry, int):
+                        db.write(pack(entry, 0, REMOVED, 0, 0, 0))
+                        continue
+                    due = entry["Due"]
+                    if due not in ordinals:
+                        ordinals[due] = date_ordinal(due)
+                    description = entry["Description"].encode()
+                    flags = DONE if entry["Done"] else 0
+                    db.write(
+                        pack(
+                            entry["ID"],
+                            entry["Priority"],
+                            flags,
+                            ordinals[due],
+                            heap_size,
+                            len(description),
+                        )
+                    )
+                    heap.append(description)
+                    heap_size += len(description)
+                db.write(b"".join(heap))
+                db.seek(0)
+                db.write(HEADER.pack(MAGIC, count))
+        except WRITE_ERRORS:
+            return Code.DB_WRITE_ERROR
+        return Code.SUCCESS
+
+    def iter_todos(self, include_removed: bool = False) -> Iterator[Any]:
+        """Yields todos decoded one record at a time from a memory map.
+
+        Raises ``OSError`` if the database cannot be read and
+        ``ValueError`` if it is not a valid fixed-width database.
+        """
+        with self._db_path.open("rb") as db, mmap.mmap(
+            db.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapping:
+            for entry in iter_mapping(mapping):
+                if include_removed or isinstance(entry, Todo):
+                    yield entry
+
+    def _flip_done(self, todo_id: int) -> CurrentTodo:
+        with self._db_path.open("r+b") as db:
+            with mmap.mmap(db.fileno(), 0) as mapping:
+                position = find_record(mapping, todo_id)
+                if position is None or mapping[position + FLAGS_AT] & REMOVED:
+                    return CurrentTodo({}, Code.ID_ERROR)
+                mapping[position + FLAGS_AT] |= DONE
+                heap = HEADER.size + record_count(mapping) * RECORD.size
+                todo = decode_record(mapping, position, heap, {})
+            self.durability.sync_file(db)
+        # A write through a mapping only updates the mtime when the page
+        # was clean, so it is set explicitly for readers keyed on it.
+        os.utime(self._db_path)
+        return CurrentTodo(todo, Code.SUCCESS)
+
+    @exclusive
+    def set_done(self, todo_id: int) -> CurrentTodo:
+        """Set a to-do as done, in place."""
+        if self._batch is not None:
+            return super().set_done(todo_id)
+        sidecars = self._load_sidecars("set_done")
+        try:
+            current_todo = self._flip_done(todo_id)
+        except OSError:
+            return CurrentTodo({}, Code.DB_WRITE_ERROR)
+        except ValueError:
+            return CurrentTodo({}, Code.JSON_ERROR)
+        if current_todo.code == Code.SUCCESS:
+            self.durability.committed(self._db_path, renamed=False)
+            self._remember(None)
+            self._update_sidecars(sidecars, "set_done", current_todo)
+        return current_todo
+
+    def _fetch_todos(self, todo_ids: List[int]) -> Optional[List[Todo]]:
+        """Decodes only the records of ``todo_ids`` from a memory map."""
+        todos = []
+        try:
+            with self._db_path.open("rb") as db, mmap.mmap(
+                db.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapping:
+                heap = HEADER.size + record_count(mapping) * RECORD.size
+                due_dates: dict = {}
+                for todo_id in todo_ids:
+                    position = find_record(mapping, todo_id)
+                    if position is None:
+                        return None
+                    todo = decode_record(mapping, position, heap, due_dates)
+                    if not isinstance(todo, Todo):
+                        return None
+                    todos.append(todo)
+        except (OSError, ValueError):
+            return None
+        return todos
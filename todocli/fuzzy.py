@@ -0,0 +1,140 @@
+"""Typo-tolerant lookup of todos by description.
+
+``complete --match "deply prod"`` finds the todo meant without its ID. A
+trigram index, stored next to the database like the search index, maps
+every three-character run of the padded words of a description to the
+todos using it. A lookup counts the trigrams each todo shares with the
+text and only the ``SHORTLIST`` todos sharing the most are scored by edit
+distance.
+
+A todo is scored word by word: each word of the text costs its edit
+distance to the closest word of the description, and the todo is a match
+if the total is at most half the letters in the text.
+"""
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from todocli.cache import Signature
+from todocli.search import (
+    SearchIndex,
+    load_postings,
+    restamp_postings,
+    store_postings,
+    tokenize,
+    unpack,
+)
+
+TRIGRAM_VERSION = 1
+SHORTLIST = 50
+# Completing a todo leaves its description as it was.
+UNCHANGED_BY = ("set_done",)
+
+
+def trigram_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.trigrams"
+
+
+def trigrams(text: str) -> Set[str]:
+    """Returns the trigrams of the words of ``text``, padded as in
+    ``"  w "`` so that their starts weigh more than their ends."""
+    return {
+        padded[i : i + 3]  # noqa: E203
+        for padded in (f"  {word} " for word in tokenize(text))
+        for i in range(len(padded) - 2)
+    }
+
+
+def distance(first: str, second: str) -> int:
+    """Returns the Levenshtein distance between two strings."""
+    if len(first) < len(second):
+        first, second = second, first
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, start=1):
+        current = [i]
+        for j, other in enumerate(second, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char != other),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def score(todo: dict, text: str) -> Tuple[int, int]:
+    """Returns how far ``todo`` is from ``text``, lower being closer.
+
+    The first part sums each word's distance to its closest word in the
+    description and the second, which breaks ties, compares the whole
+    descriptions.
+    """
+    words = tokenize(todo["Description"]) or [""]
+    total = sum(
+        min(distance(word, other) for other in words)
+        for word in tokenize(text)
+    )
+    return total, distance(" ".join(tokenize(text)), " ".join(words))
+
+
+def closest(todos: Iterable[dict], text: str) -> List[dict]:
+    """Returns the todos matching ``text``, closest first."""
+    if not tokenize(text):
+        return []
+    allowed = sum(len(word) for word in tokenize(text)) // 2
+    scored = [(score(todo, text), todo) for todo in todos]
+    return [
+        todo
+        for todo_score, todo in sorted(scored, key=lambda pair: pair[0])
+        if todo_score[0] <= allowed
+    ]
+
+
+class TrigramIndex(SearchIndex):
+    """Maps each trigram to the packed, sorted IDs of the todos using it."""
+
+    terms = staticmethod(trigrams)
+
+    def lookup(self, terms: Iterable[str]) -> List[int]:
+        """Returns the IDs of the ``SHORTLIST`` todos sharing the most of
+        ``terms``, in order.
+
+        Lists are counted rarest first. Once a list is much longer than
+        the candidates found so far, it is only probed for them, since
+        a todo missing every rarer trigram is unlikely to make the
+        shortlist.
+        """
+        lists = sorted(
+            filter(None, (self.get(term) for term in terms)),
+            key=len,
+        )
+        shared: Counter = Counter()
+        for packed in lists:
+            ids = unpack(packed)
+            if shared and len(shared) * 32 < len(ids):
+                for todo_id in [*shared]:
+                    position = bisect_left(ids, todo_id)
+                    if position < len(ids) and ids[position] == todo_id:
+                        shared[todo_id] += 1
+            else:
+                shared.update(ids)
+        return sorted(todo_id for todo_id, _ in shared.most_common(SHORTLIST))
+
+
+def load(db_path: Path, signature: Signature) -> Optional[TrigramIndex]:
+    """Returns the stored index if it describes ``signature``."""
+    stored = load_postings(trigram_path(db_path), TRIGRAM_VERSION, signature)
+    return None if stored is None else TrigramIndex(stored=stored)
+
+
+def store(db_path: Path, signature: Signature, index: TrigramIndex) -> None:
+    """Stores ``index`` as describing the database at ``signature``."""
+    path = trigram_path(db_path)
+    store_postings(path, TRIGRAM_VERSION, signature, index.all_postings())
+
+
+def restamp(db_path: Path, old: Signature, new: Signature) -> None:
+    restamp_postings(trigram_path(db_path), TRIGRAM_VERSION, old, new)
@@ -0,0 +1,213 @@
+"""Secondary indexes on Priority, Due and Done, kept next to the database.
+
+The indexes are stored with the signature of the database they describe,
+like the cache, and are ignored once the database no longer matches.
+Writes made through ``add``, ``set_done``, ``remove`` and ``remove_all``
+patch the stored indexes in place of rebuilding them; any other write
+leaves them stale and the next query rebuilds them from the todos it reads
+anyway.
+"""
+import marshal
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from todocli.cache import Signature
+from todocli.durability import SIDECAR, atomic_open
+from todocli.sorting import date_ordinal
+
+INDEX_VERSION = 1
+# Every write changes the indexes.
+UNCHANGED_BY: Tuple[str, ...] = ()
+
+
+def index_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.index"
+
+
+def is_marked(bitmap: bytearray, todo_id: int) -> bool:
+    """Returns whether bit ``todo_id`` of ``bitmap`` is set."""
+    byte = todo_id >> 3
+    return byte < len(bitmap) and bool(bitmap[byte] >> (todo_id & 7) & 1)
+
+
+def mark(bitmap: bytearray, todo_id: int, flag: bool) -> None:
+    """Sets or clears bit ``todo_id`` of ``bitmap``, growing it to fit."""
+    byte = todo_id >> 3
+    if byte >= len(bitmap):
+        bitmap.extend(bytes(byte + 1 - len(bitmap)))
+    if flag:
+        bitmap[byte] |= 1 << (todo_id & 7)
+    else:
+        bitmap[byte] &= ~(1 << (todo_id & 7)) & 0xFF
+
+
+def matches(
+    todo: dict,
+    priority: Optional[int] = None,
+    done: Optional[bool] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+) -> bool:
+    """Returns whether ``todo`` meets every condition that is not None.
+
+    Due bounds are inclusive ``%Y-%m-%d`` dates, which undated todos never
+    meet.
+    """
+    if priority is not None and todo["Priority"] != priority:
+        return False
+    if done is not None and todo["Done"] != done:
+        return False
+    if due_from is None and due_to is None:
+        return True
+    due = todo["Due"]
+    return bool(due) and (due_from or due) <= due <= (due_to or due)
+
+
+class Indexes:
+    """Secondary indexes over the live todos of a database.
+
+    ``due`` holds the due date ordinals of dated todos in order, with
+    their IDs at the same positions in ``due_ids``, so a date range is two
+    bisections. ``priorities`` maps each priority to the sorted IDs that
+    have it and ``done`` is a bitmap with bit ``ID`` set for every done
+    todo.
+    """
+
+    def __init__(
+        self,
+        due: Optional[List[int]] = None,
+        due_ids: Optional[List[int]] = None,
+        priorities: Optional[Dict[int, List[int]]] = None,
+        done: bytes = b"",
+    ) -> None:
+        self.due = due or []
+        self.due_ids = due_ids or []
+        self.priorities = priorities or {}
+        self.done = bytearray(done)
+
+    def is_done(self, todo_id: int) -> bool:
+        return is_marked(self.done, todo_id)
+
+    def _mark(self, todo_id: int, done: bool) -> None:
+        mark(self.done, todo_id, done)
+
+    @classmethod
+    def build(cls, todos: Iterable[dict]) -> "Indexes":
+        """Indexes live todos, which must come in ID order."""
+        indexes = cls()
+        dated = []
+        for todo in todos:
+            todo_id = todo["ID"]
+            indexes.priorities.setdefault(todo["Priority"], []).append(todo_id)
+            if todo["Done"]:
+                indexes._mark(todo_id, True)
+            if todo["Due"]:
+                dated.append((date_ordinal(todo["Due"]), todo_id))
+        dated.sort()
+        indexes.due = [ordinal for ordinal, _ in dated]
+        indexes.due_ids = [todo_id for _, todo_id in dated]
+        return indexes
+
+    def add(self, todo: dict) -> None:
+        todo_id = todo["ID"]
+        ids = self.priorities.setdefault(todo["Priority"], [])
+        ids.insert(bisect_left(ids, todo_id), todo_id)
+        if todo["Done"]:
+            self._mark(todo_id, True)
+        if todo["Due"]:
+            ordinal = date_ordinal(todo["Due"])
+            position = bisect_right(self.due, ordinal)
+            self.due.insert(position, ordinal)
+            self.due_ids.insert(position, todo_id)
+
+    def set_done(self, todo: dict) -> None:
+        self._mark(todo["ID"], True)
+
+    def remove(self, todo: dict) -> None:
+        todo_id = todo["ID"]
+        ids = self.priorities.get(todo["Priority"], [])
+        position = bisect_left(ids, todo_id)
+        if ids[position : position + 1] == [todo_id]:  # noqa: E203
+            del ids[position]
+        self._mark(todo_id, False)
+        if todo["Due"]:
+            ordinal = date_ordinal(todo["Due"])
+            low = bisect_left(self.due, ordinal)
+            high = bisect_right(self.due, ordinal)
+            for position in range(low, high):
+                if self.due_ids[position] == todo_id:
+                    del self.due[position]
+                    del self.due_ids[position]
+                    break
+
+    def remove_all(self, todo: dict) -> None:
+        self.due, self.due_ids, self.priorities = [], [], {}
+        self.done = bytearray()
+
+    def apply(self, op: str, todo: dict) -> None:
+        """Applies a successful ``add``, ``set_done``, ``remove`` or
+        ``remove_all``."""
+        getattr(self, op)(todo)
+
+    def match(
+        self,
+        priority: Optional[int] = None,
+        done: Optional[bool] = None,
+        due_from: Optional[str] = None,
+        due_to: Optional[str] = None,
+    ) -> List[int]:
+        """Returns the IDs of the todos meeting every condition, in order.
+
+        Takes the narrowest of the due range and the priority bucket and
+        only checks the remaining conditions against its IDs.
+        """
+        candidates: Iterable[int]
+        if due_from is not None or due_to is not None:
+            low = 0 if due_from is None else date_ordinal(due_from)
+            high = None if due_to is None else date_ordinal(due_to)
+            start = bisect_left(self.due, low)
+            end = (
+                len(self.due) if high is None else bisect_right(self.due, high)
+            )
+            candidates = sorted(self.due_ids[start:end])
+            if priority is not None:
+                bucket = set(self.priorities.get(priority, ()))
+                candidates = [i for i in candidates if i in bucket]
+        elif priority is not None:
+            candidates = self.priorities.get(priority, [])
+        else:
+            candidates = merge(*self.priorities.values())
+        if done is None:
+            return list(candidates)
+        return [i for i in candidates if self.is_done(i) == done]
+
+
+def load(db_path: Path, signature: Signature) -> Optional[Indexes]:
+    """Returns the stored indexes if they describe ``signature``."""
+    try:
+        data = index_path(db_path).read_bytes()
+        version, stored_signature, *fields = marshal.loads(data)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != INDEX_VERSION or tuple(stored_signature) != signature:
+        return None
+    return Indexes(*fields)
+
+
+def store(db_path: Path, signature: Signature, indexes: Indexes) -> None:
+    """Stores ``indexes`` as describing the database at ``signature``."""
+    data: Any = (
+        INDEX_VERSION,
+        signature,
+        indexes.due,
+        indexes.due_ids,
+        indexes.priorities,
+        indexes.done,
+    )
+    try:
+        with atomic_open(index_path(db_path), SIDECAR, "wb") as index:
+            index.write(marshal.dumps(data))
+    except (OSError, ValueError):
+        pass
@@ -0,0 +1,262 @@
+"""Append-only journal storage for the to-do database.
+
+The journal file holds one JSON record per line. A ``snapshot`` record
+carries the full list of todos and every record after it is a single
+mutation, so adding a todo appends one short line instead of rewriting the
+whole database. Once the journal grows past ``snapshot_every`` bytes it is
+folded into a fresh snapshot, written to a temporary file and renamed over
+the journal so readers never see a half written state. Transactions are
+applied in memory and committed as a single snapshot.
+"""
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from todocli import codec
+from todocli.current_todo import CurrentTodo
+from todocli.durability import Durability, atomic_open
+from todocli.return_codes import Code
+from todocli.todo import Todo, from_json, gc_paused
+from todocli.todo_manager import (
+    DBResponse,
+    TodoManager,
+    exclusive,
+    index_todos,
+    live_todos,
+    next_todo_id,
+    resident_read,
+)
+
+SNAPSHOT_EVERY = 1024 * 1024
+TAIL_WINDOW = 4096
+
+
+def _encode(record: dict) -> bytes:
+    return codec.dumps(record, "compact") + b"\n"
+
+
+def _next_id(record: Optional[dict]) -> int:
+    """Returns the next free ID recorded by the last journal record."""
+    if record is None:
+        return 1
+    if record["op"] == "snapshot":
+        return next_todo_id(record["todos"])
+    if record["op"] == "add":
+        return record["todo"]["ID"] + 1
+    return record["next"]
+
+
+def _replay(todos: list, index: dict, record: dict) -> Tuple[list, dict]:
+    """Applies a single journal record to ``todos`` and its ID index."""
+    op = record.get("op")
+    if op == "snapshot":
+        todos = from_json(record["todos"])
+        index = index_todos(todos)
+    elif op == "add":
+        todo = Todo.from_dict(record["todo"])
+        index[todo.ID] = len(todos)
+        todos.append(todo)
+    elif op == "done":
+        todos[index[record["id"]]]["Done"] = True
+    elif op == "remove":
+        todos[index.pop(record["id"])] = record["id"]
+    elif op == "clear":
+        last_id = record["next"] - 1
+        todos = [last_id] if last_id else []
+        index = {}
+    return todos, index
+
+
+class JournalTodoManager(TodoManager):
+    def __init__(
+        self,
+        db_path: Path,
+        durability: Optional[Durability] = None,
+        snapshot_every: int = SNAPSHOT_EVERY,
+    ) -> None:
+        super().__init__(db_path, durability)
+        self.snapshot_every = snapshot_every
+
+    @staticmethod
+    def create(db_path: Path) -> Code:
+        """Creates an empty journal."""
+        try:
+            db_path.write_bytes(_encode({"op": "snapshot", "todos": []}))
+            return Code.SUCCESS
+        except OSError:
+            return Code.DB_INIT_ERROR
+
+    def _append(self, record: dict) -> Code:
+        """Appends a record, folding the journal once it grows too big."""
+        try:
+            with self._db_path.open("a+b") as journal:
+                size = journal.tell()
+                if size:
+                    # A crash mid-append leaves a torn line without its
+                    # newline; terminate it so this record stays readable.
+                    journal.seek(size - 1)
+                    if journal.read(1) != b"\n":
+                        journal.write(b"\n")
+                journal.write(_encode(record))
+                size = journal.tell()
+                self.durability.sync_file(journal)
+        except OSError:
+            return Code.DB_WRITE_ERROR
+        self.durability.committed(self._db_path, renamed=False)
+        if size > self.snapshot_every:
+            return self.snapshot()
+        return Code.SUCCESS
+
+    def _tail(self) -> Optional[dict]:
+        """Decodes the last complete record without reading the journal.
+
+        Reads a growing window back from the end of the file until it
+        holds a whole line.
+        """
+        with self._db_path.open("rb") as journal:
+            end = journal.seek(0, os.SEEK_END)
+            window = TAIL_WINDOW
+            while True:
+                start = max(0, end - window)
+                journal.seek(start)
+                lines = journal.read(end - start).splitlines()
+                # The first line of a window is usually cut in half.
+                for line in reversed(lines[1:] if start else lines):
+                    try:
+                        return codec.loads(line)
+                    except ValueError:
+                        continue
+                if not start:
+                    return None
+                window *= 4
+
+    def _write_todos(self, todos: list) -> DBResponse:
+        """Writes todos as a single snapshot record."""
+        try:
+            with atomic_open(self._db_path, self.durability, "wb") as journal:
+                journal.write(_encode({"op": "snapshot", "todos": todos}))
+                journal.write(
+                    _encode({"op": "checkpoint", "next": next_todo_id(todos)})
+                )
+            return DBResponse(todos, Code.SUCCESS)
+        except OSError:
+            return DBResponse([], Code.DB_WRITE_ERROR)
+
+    def write_entries(self, entries: Iterable[Any]) -> Code:
+        """Replaces the journal with a snapshot of ``entries``.
+
+        A snapshot is a single record, so the entries are gathered first.
+        """
+        return self._write_todos(list(entries)).return_code
+
+    @resident_read
+    def read_todos(self, include_removed: bool = False) -> DBResponse:
+        """Reads todos by replaying the journal."""
+        todos: list = []
+        index: dict = {}
+        try:
+            with self._db_path.open("rb") as journal, gc_paused():
+                for line in journal:
+                    try:
+                        record = codec.loads(line)
+                    except ValueError:
+                        # Torn write from a crash, the mutation never
+                        # completed so it is skipped.
+                        continue
+                    try:
+                        todos, index = _replay(todos, index, record)
+                    except (KeyError, IndexError, TypeError, ValueError):
+                        return DBResponse([], Code.JSON_ERROR)
+        except OSError:
+            return DBResponse([], Code.DB_READ_ERROR)
+        if not include_removed:
+            todos = list(live_todos(todos))
+        return DBResponse(todos, Code.SUCCESS)
+
+    def iter_todos(self, include_removed: bool = False) -> Iterator[Any]:
+        """Yields todos once the journal has been replayed."""
+        todos, read_error = self.read_todos(include_removed)
+        if read_error == Code.DB_READ_ERROR:
+            raise OSError(read_error.value)
+        if read_error != Code.SUCCESS:
+            raise ValueError(read_error.value)
+        yield from todos
+
+    def snapshot(self) -> Code:
+        """Folds the journal into a single snapshot record."""
+        with self._locked() as lock_error:
+            if lock_error != Code.SUCCESS:
+                return lock_error
+            todos, read_error = self.read_todos(include_removed=True)
+            if read_error != Code.SUCCESS:
+                return read_error
+            self.todos = todos
+            self._index = index_todos(todos)
+            self._compact()
+            _, write_error = self._write_todos(self.todos)
+            self.todos = []
+            self._index = {}
+            return write_error
+
+    @exclusive
+    def add(
+        self, description: str, priority: int, due: str = None
+    ) -> CurrentTodo:
+        """Add todo."""
+        if self._batch is not None:
+            return super().add(description, priority, due)
+        try:
+            todo_id = _next_id(self._tail())
+        except OSError:
+            return CurrentTodo({}, Code.DB_READ_ERROR)
+        except (KeyError, TypeError):
+            return CurrentTodo({}, Code.JSON_ERROR)
+        todo = Todo(todo_id, description, priority, due)
+        write_error = self._append({"op": "add", "todo": todo})
+        if write_error != Code.SUCCESS:
+            return CurrentTodo({}, write_error)
+        return CurrentTodo(todo, Code.SUCCESS)
+
+    def _mutate(self, op: str, todo_id: int) -> CurrentTodo:
+        todos, read_error = self.read_todos(include_removed=True)
+        if read_error != Code.SUCCESS:
+            return CurrentTodo({}, read_error)
+        offset = index_todos(todos).get(todo_id)
+        if offset is None:
+            return CurrentTodo({}, Code.ID_ERROR)
+        record = {"op": op, "id": todo_id, "next": next_todo_id(todos)}
+        write_error = self._append(record)
+        if write_error != Code.SUCCESS:
+            return CurrentTodo({}, write_error)
+        return CurrentTodo(todos[offset], Code.SUCCESS)
+
+    @exclusive
+    def set_done(self, todo_id: int) -> CurrentTodo:
+        """Set a to-do as done."""
+        if self._batch is not None:
+            return super().set_done(todo_id)
+        current_todo = self._mutate("done", todo_id)
+        if current_todo.code == Code.SUCCESS:
+            current_todo.todo["Done"] = True
+        return current_todo
+
+    @exclusive
+    def remove(self, todo_id: int) -> CurrentTodo:
+        """Removes todo."""
+        if self._batch is not None:
+            return super().remove(todo_id)
+        return self._mutate("remove", todo_id)
+
+    @exclusive
+    def remove_all(self) -> CurrentTodo:
+        """Removes all todos."""
+        if self._batch is not None:
+            return super().remove_all()
+        try:
+            next_id = _next_id(self._tail())
+        except (OSError, KeyError, TypeError):
+            next_id = 1
+        write_error = self._append({"op": "clear", "next": next_id})
+        if write_error != Code.SUCCESS:
+            return CurrentTodo({}, write_error)
+        return CurrentTodo({}, Code.SUCCESS)
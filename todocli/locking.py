@@ -0,0 +1,62 @@
+"""Advisory locks that serialise writers across processes.
+
+The lock is taken on a ``<database>.lock`` file next to the database rather
+than on the database itself, because atomic writes replace the database
+file and a lock on the replaced file would no longer exclude anyone.
+Readers do not need the lock: every write is renamed into place, so they
+always see the last committed database.
+"""
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+LOCK_TIMEOUT = 10.0
+FIRST_BACKOFF = 0.001
+MAX_BACKOFF = 0.05
+
+
+class LockTimeout(Exception):
+    """Raised when a lock is still held by another process at the timeout."""
+
+
+def lock_path(db_path: Path) -> Path:
+    return db_path.parent / f"{db_path.name}.lock"
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+    """Holds an exclusive ``flock`` on ``path`` for the block.
+
+    Waiting writers poll with an exponential, jittered backoff so they do
+    not wake up in lock step. Raises ``LockTimeout`` after ``timeout``
+    seconds and ``OSError`` if the lock file cannot be opened. Platforms
+    without ``fcntl`` are not locked.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with path.open("a") as lock_file:
+        deadline = time.monotonic() + timeout
+        backoff = FIRST_BACKOFF
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise LockTimeout(str(path)) from None
+                # Only imported under contention, to keep startup fast.
+                import random
+
+                time.sleep(backoff * random.uniform(0.5, 1.5))
+                backoff = min(backoff * 2, MAX_BACKOFF)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
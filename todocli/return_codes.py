@@ -12,3 +12,9 @@ class Code(Enum):
     DB_WRITE_ERROR = "A database write ERORR:Failed to write from database"
     DB_READ_ERROR = "A database read ERORR:Failed to read from database"
     JSON_ERROR = "A JSON decode ERORR:Failed to decode json"
+    ENGINE_ERROR = "An ENGINE ERROR:Unknown database engine"
+    LOCK_ERROR = "A LOCK ERROR:Timed out waiting for the database lock"
+    DURABILITY_ERROR = "A DURABILITY ERROR:Unknown durability setting"
+    FORMAT_ERROR = "A FORMAT ERROR:Unknown database format"
+    ARCHIVE_ERROR = "An ARCHIVE ERROR:Invalid archive setting"
+    DAEMON_ERROR = "A DAEMON ERROR:The daemon could not run the request"
@@ -0,0 +1,261 @@
+"""Full-text search over descriptions, backed by an inverted index.
+
+A description is split into tokens, lowercased runs of letters and digits,
+and the index maps every token to the sorted IDs of the todos using it. A
+search returns the todos holding every token of the query, so it reads the
+shortest posting list first and only narrows it from there.
+
+The index is stored next to the database with its signature, like the
+secondary indexes, and patched by ``add`` and ``remove``. The signature
+leads the file in a fixed-size header, so that writes which leave the
+descriptions alone, ``set_done``, only restamp it. Posting lists are
+packed arrays of 32-bit IDs, stored one after another behind a directory
+of their offsets. Loading the index only reads the directory and maps the
+file, so a search reads just the lists of its terms.
+"""
+import marshal
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from todocli.cache import Signature
+from todocli.durability import SIDECAR, atomic_open
+
+SEARCH_VERSION = 2
+# The layout version, the database signature and the size of the directory
+# that follows, ahead of the postings.
+HEADER = struct.Struct("<IQqQ")
+DIRECTORY_SIZE = struct.Struct("<Q")
+# Completing a todo leaves its description as it was.
+UNCHANGED_BY = ("set_done",)
+_TOKEN = re.compile(r"\w+")
+
+
+def search_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.search"
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def unpack(packed: bytes = b"") -> array:
+    """Returns packed IDs as an array."""
+    ids = array("I")
+    ids.frombytes(packed)
+    return ids
+
+
+def _holds(ids: array, todo_id: int) -> bool:
+    position = bisect_left(ids, todo_id)
+    return position < len(ids) and ids[position] == todo_id
+
+
+def matches(todo: dict, terms: Set[str]) -> bool:
+    """Returns whether the description of ``todo`` holds every term."""
+    return terms.issubset(tokenize(todo["Description"]))
+
+
+def rank(todos: Iterable[dict], query: str) -> List[dict]:
+    """Orders search results best first, ties in ID order.
+
+    Descriptions holding the query as a phrase come first, then those in
+    which the query terms make up the largest share of the tokens.
+    """
+    terms = set(tokenize(query))
+    phrase = " ".join(tokenize(query))
+
+    def score(todo: dict) -> tuple:
+        tokens = tokenize(todo["Description"])
+        hits = sum(token in terms for token in tokens)
+        return (phrase in " ".join(tokens), hits / len(tokens))
+
+    return sorted(todos, key=score, reverse=True)
+
+
+class StoredPostings:
+    """The posting lists of a stored index, read from a memory map of it
+    as they are asked for."""
+
+    def __init__(
+        self,
+        mapping: mmap.mmap,
+        directory: Dict[str, Tuple[int, int]],
+        base: int,
+    ) -> None:
+        self.mapping = mapping
+        # Offsets and lengths of the lists, from ``base`` in the mapping.
+        self.directory = directory
+        self.base = base
+
+    def get(self, term: str) -> bytes:
+        offset, length = self.directory.get(term, (0, 0))
+        start = self.base + offset
+        return self.mapping[start : start + length]  # noqa: E203
+
+    def read_all(self) -> Dict[str, bytes]:
+        return {term: self.get(term) for term in self.directory}
+
+
+class SearchIndex:
+    """Maps each token to the packed, sorted IDs of the todos using it.
+
+    ``postings`` holds the lists built or changed in memory, empty once
+    their last ID is removed, over those still in ``stored``. Subclasses
+    index other terms of a description by overriding ``terms``.
+    """
+
+    def __init__(
+        self,
+        postings: Optional[Dict[str, bytes]] = None,
+        stored: Optional[StoredPostings] = None,
+    ) -> None:
+        self.postings = postings or {}
+        self.stored = stored
+
+    @staticmethod
+    def terms(description: str) -> Set[str]:
+        return set(tokenize(description))
+
+    @classmethod
+    def build(cls, todos: Iterable[dict]) -> "SearchIndex":
+        """Indexes live todos, which must come in ID order."""
+        postings: Dict[str, array] = {}
+        for todo in todos:
+            for token in cls.terms(todo["Description"]):
+                if token not in postings:
+                    postings[token] = array("I")
+                postings[token].append(todo["ID"])
+        return cls({token: ids.tobytes() for token, ids in postings.items()})
+
+    def get(self, term: str) -> bytes:
+        """Returns the packed IDs of the todos using ``term``."""
+        if term in self.postings or self.stored is None:
+            return self.postings.get(term, b"")
+        return self.stored.get(term)
+
+    def all_postings(self) -> Dict[str, bytes]:
+        """Returns every non-empty posting list."""
+        postings = self.stored.read_all() if self.stored else {}
+        postings.update(self.postings)
+        return {term: ids for term, ids in postings.items() if ids}
+
+    def add(self, todo: dict) -> None:
+        for token in self.terms(todo["Description"]):
+            ids = unpack(self.get(token))
+            ids.insert(bisect_left(ids, todo["ID"]), todo["ID"])
+            self.postings[token] = ids.tobytes()
+
+    def set_done(self, todo: dict) -> None:
+        # The description, and so the index, stays as it is.
+        pass
+
+    def remove(self, todo: dict) -> None:
+        for token in self.terms(todo["Description"]):
+            ids = unpack(self.get(token))
+            if _holds(ids, todo["ID"]):
+                del ids[bisect_left(ids, todo["ID"])]
+            self.postings[token] = ids.tobytes()
+
+    def remove_all(self, todo: dict) -> None:
+        self.postings = {}
+        self.stored = None
+
+    def apply(self, op: str, todo: dict) -> None:
+        """Applies a successful ``add``, ``set_done``, ``remove`` or
+        ``remove_all``."""
+        getattr(self, op)(todo)
+
+    def lookup(self, terms: Iterable[str]) -> List[int]:
+        """Returns the IDs of the todos holding every term, in order."""
+        lists = sorted((self.get(term) for term in terms), key=len)
+        if not lists or not lists[0]:
+            return []
+        found = unpack(lists[0]).tolist()
+        for packed in lists[1:]:
+            ids = unpack(packed)
+            if len(found) * 32 < len(ids):
+                # Few candidates left: probing for each beats a set of ids.
+                found = [i for i in found if _holds(ids, i)]
+            else:
+                found = sorted(set(found).intersection(ids))
+        return found
+
+
+def load_postings(
+    path: Path, version: int, signature: Signature
+) -> Optional[StoredPostings]:
+    """Returns the postings stored at ``path`` if they describe
+    ``signature`` in the layout ``version``.
+
+    Only the header and the directory are read. A later write renames a
+    new file into place, so the mapping keeps the postings as loaded.
+    """
+    try:
+        with path.open("rb") as stored:
+            if stored.read(HEADER.size) != HEADER.pack(version, *signature):
+                return None
+            (size,) = DIRECTORY_SIZE.unpack(stored.read(DIRECTORY_SIZE.size))
+            if size > os.fstat(stored.fileno()).st_size:
+                return None
+            directory = marshal.loads(stored.read(size))
+            mapping = mmap.mmap(stored.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, EOFError, ValueError, TypeError, OverflowError):
+        return None
+    base = HEADER.size + DIRECTORY_SIZE.size + size
+    return StoredPostings(mapping, directory, base)
+
+
+def store_postings(
+    path: Path, version: int, signature: Signature, postings: dict
+) -> None:
+    """Stores ``postings`` at ``path`` as describing ``signature``."""
+    directory = {}
+    offset = 0
+    for term, ids in postings.items():
+        directory[term] = (offset, len(ids))
+        offset += len(ids)
+    data = marshal.dumps(directory)
+    try:
+        with atomic_open(path, SIDECAR, "wb") as stored:
+            stored.write(HEADER.pack(version, *signature))
+            stored.write(DIRECTORY_SIZE.pack(len(data)))
+            stored.write(data)
+            stored.writelines(postings.values())
+    except (OSError, ValueError, struct.error):
+        pass
+
+
+def restamp_postings(
+    path: Path, version: int, old: Signature, new: Signature
+) -> None:
+    """Moves the postings at ``path`` from describing ``old`` to ``new``,
+    rewriting only the header, if they describe ``old``."""
+    try:
+        with path.open("r+b") as stored:
+            if stored.read(HEADER.size) == HEADER.pack(version, *old):
+                stored.seek(0)
+                stored.write(HEADER.pack(version, *new))
+    except (OSError, struct.error):
+        pass
+
+
+def load(db_path: Path, signature: Signature) -> Optional[SearchIndex]:
+    """Returns the stored index if it describes ``signature``."""
+    stored = load_postings(search_path(db_path), SEARCH_VERSION, signature)
+    return None if stored is None else SearchIndex(stored=stored)
+
+
+def store(db_path: Path, signature: Signature, index: SearchIndex) -> None:
+    """Stores ``index`` as describing the database at ``signature``."""
+    path = search_path(db_path)
+    store_postings(path, SEARCH_VERSION, signature, index.all_postings())
+
+
+def restamp(db_path: Path, old: Signature, new: Signature) -> None:
+    restamp_postings(search_path(db_path), SEARCH_VERSION, old, new)
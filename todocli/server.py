@@ -0,0 +1,73 @@
+"""The resident daemon behind ``todocli serve``.
+
+It lives apart from ``todocli.daemon`` so that commands, which only need
+the client, do not pay for importing ``socketserver`` and ``threading``.
+"""
+import json
+import socketserver
+import threading
+from pathlib import Path
+
+from todocli.current_todo import CurrentTodo
+from todocli.daemon import OPS, connect, encode, socket_path
+from todocli.stats import StatsResponse
+
+
+def _reply(result) -> dict:
+    if isinstance(result, CurrentTodo):
+        return {"todo": result.todo, "code": result.code.name}
+    if isinstance(result, StatsResponse):
+        return {"stats": result.stats.as_json(), "code": result.code.name}
+    return {"todos": result.todo_list, "code": result.return_code.name}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request["op"]
+                if op not in OPS:
+                    raise KeyError(op)
+                with self.server.manager_lock:
+                    result = getattr(self.server.manager, op)(
+                        *request.get("args", [])
+                    )
+                reply = _reply(result)
+            except (ValueError, KeyError, TypeError) as error:
+                reply = {"error": f"{type(error).__name__}: {error}"}
+            self.wfile.write(encode(reply))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        Path(self.server_address).unlink()
+
+
+def make_server(manager, db_path: Path) -> _Server:
+    """Binds the socket for ``db_path`` and makes ``manager`` resident.
+
+    Raises ``OSError`` if another daemon already serves ``db_path``.
+    """
+    path = socket_path(db_path)
+    client = connect(db_path)
+    if client is not None:
+        client.close()
+        raise OSError(f"A daemon is already serving {db_path}")
+    if path.exists():
+        # Left behind by a daemon that did not shut down cleanly.
+        path.unlink()
+    manager.resident = True
+    server = _Server(str(path), _Handler)
+    server.manager = manager
+    server.manager_lock = threading.Lock()
+    return server
+
+
+def serve(manager, db_path: Path) -> None:
+    """Answers requests for ``manager`` until interrupted or terminated."""
+    with make_server(manager, db_path) as server:
+        server.serve_forever()
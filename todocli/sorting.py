@@ -0,0 +1,75 @@
+"""Ordering and paging of todos for the list command."""
+import heapq
+from datetime import date
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+FIELDS = ("ID", "Description", "Priority", "Due", "Done")
+# Later than any real day so undated todos sort last.
+NO_DUE = date.max.toordinal() + 1
+
+
+def date_ordinal(due: str) -> int:
+    """Returns the day ordinal of a ``%Y-%m-%d`` date."""
+    return date(int(due[:4]), int(due[5:7]), int(due[8:10])).toordinal()
+
+
+def due_ordinal(todo: dict) -> int:
+    """Returns the due date as a day ordinal, undated todos last."""
+    due = todo["Due"]
+    if not due:
+        return NO_DUE
+    return date_ordinal(due)
+
+
+KEYS = {
+    "ID": itemgetter("ID"),
+    "Description": itemgetter("Description"),
+    "Priority": itemgetter("Priority"),
+    "Due": due_ordinal,
+    "Done": itemgetter("Done"),
+}
+
+
+def parse_sort_by(sort_by: Optional[str]) -> List[str]:
+    """Splits a comma separated ``--sort-by`` value into field names.
+
+    Raises ``ValueError`` naming the first unknown field.
+    """
+    fields = [field.strip() for field in (sort_by or "").split(",")]
+    fields = [field for field in fields if field]
+    for field in fields:
+        if field not in KEYS:
+            raise ValueError(field)
+    return fields
+
+
+def sort_key(fields: Sequence[str]) -> Callable[[dict], Any]:
+    """Returns a key ordering todos by each of ``fields`` in turn."""
+    if len(fields) == 1:
+        return KEYS[fields[0]]
+    keys = [KEYS[field] for field in fields]
+    return lambda todo: tuple(key(todo) for key in keys)
+
+
+def select(
+    todos: Iterable[dict],
+    sort_by: Sequence[str] = (),
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """Returns the todos shown on one page.
+
+    Sort keys are computed once per todo. Unsorted pages stop reading once
+    the last shown todo is reached and sorted pages keep a heap of
+    ``offset + limit`` todos instead of sorting the whole list.
+    """
+    stop = None if limit is None else offset + limit
+    if not sort_by:
+        return [*islice(todos, offset, stop)]
+    if stop is None:
+        ordered = sorted(todos, key=sort_key(sort_by))
+    else:
+        ordered = heapq.nsmallest(stop, todos, key=sort_key(sort_by))
+    return ordered[offset:]
@@ -0,0 +1,334 @@
+"""SQLite storage for the to-do database.
+
+Each todo is a row, so a mutation is a single statement instead of a
+rewrite of the whole database, and filtering and ordering are served from
+indexes on Priority, Due and Done.
+"""
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from todocli import fuzzy, search
+from todocli.current_todo import CurrentTodo
+from todocli.durability import Durability
+from todocli.locking import LOCK_TIMEOUT
+from todocli.return_codes import Code
+from todocli.stats import Stats, StatsResponse
+from todocli.todo import Todo, gc_paused
+from todocli.todo_manager import Batch, DBResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Description TEXT NOT NULL,
+    Priority INTEGER NOT NULL,
+    Due TEXT,
+    Done INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS todos_priority ON todos (Priority);
+CREATE INDEX IF NOT EXISTS todos_due ON todos (Due);
+CREATE INDEX IF NOT EXISTS todos_done ON todos (Done);
+"""
+# WAL commits are durable with FULL and survive a crash, but not a power
+# loss, with NORMAL until the next checkpoint.
+SYNCHRONOUS = {"always": "FULL", "batch": "NORMAL", "none": "OFF"}
+COLUMNS = ("ID", "Description", "Priority", "Due", "Done")
+ORDER_BY = {column: column for column in COLUMNS}
+ORDER_BY["Due"] = "Due IS NULL, Due"
+
+
+def _as_todo(row: sqlite3.Row) -> Todo:
+    return Todo(
+        row["ID"],
+        row["Description"],
+        row["Priority"],
+        row["Due"],
+        bool(row["Done"]),
+    )
+
+
+class SQLiteTodoManager:
+    def __init__(
+        self, db_path: Path, durability: Optional[Durability] = None
+    ) -> None:
+        self._db_path = db_path
+        self.durability = durability or Durability()
+        self._batch: Optional[Batch] = None
+        self._batch_db: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def create(db_path: Path) -> Code:
+        """Creates the todos table and its indexes."""
+        try:
+            with closing(sqlite3.connect(str(db_path))) as db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(SCHEMA)
+            return Code.SUCCESS
+        except sqlite3.Error:
+            return Code.DB_INIT_ERROR
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._db_path.is_file():
+            raise sqlite3.OperationalError("unable to open database file")
+        # SQLite locks the database itself, waiting up to the same timeout.
+        db = sqlite3.connect(str(self._db_path), timeout=LOCK_TIMEOUT)
+        db.row_factory = sqlite3.Row
+        # The level is one of the fixed values of ``SYNCHRONOUS``.
+        db.execute(f"PRAGMA synchronous={SYNCHRONOUS[self.durability.mode]}")
+        return db
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """Yields a connection that commits on success.
+
+        Inside a transaction the transaction's connection is reused and
+        left uncommitted.
+        """
+        if self._batch_db is not None:
+            yield self._batch_db
+            return
+        with closing(self._connect()) as db, db:
+            yield db
+
+    def _in_batch(self, current_todo: CurrentTodo) -> CurrentTodo:
+        if self._batch is not None and current_todo.code != Code.SUCCESS:
+            self._batch.code = current_todo.code
+        return current_todo
+
+    @contextmanager
+    def transaction(self) -> Iterator[Batch]:
+        """Applies every mutation in the block in one SQL transaction.
+
+        If a mutation fails, or the block raises, the transaction is rolled
+        back and every later mutation in the block returns the failure
+        code, which is also left on the yielded ``Batch``.
+        """
+        try:
+            self._batch_db = self._connect()
+            self._batch = Batch(Code.SUCCESS)
+        except sqlite3.Error:
+            self._batch = Batch(Code.DB_READ_ERROR)
+        try:
+            yield self._batch
+            if self._batch.code == Code.SUCCESS:
+                self._batch_db.commit()
+        except sqlite3.Error:
+            self._batch.code = Code.DB_WRITE_ERROR
+        finally:
+            if self._batch_db is not None:
+                self._batch_db.rollback()
+                self._batch_db.close()
+            self._batch = None
+            self._batch_db = None
+
+    def read_todos(self) -> DBResponse:
+        """Reads todos."""
+        return self.select_todos()
+
+    def select_todos(
+        self,
+        sort_by: Sequence[str] = (),
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> DBResponse:
+        """Reads one sorted page of todos, ordered and paged in SQL.
+
+        Undated todos sort last and ties keep ID order, as in
+        ``sorting.select``.
+        """
+        for field in sort_by:
+            if field not in COLUMNS:
+                raise ValueError(f"Cannot sort by {field!r}")
+        order = [ORDER_BY[field] for field in sort_by if field != "ID"]
+        order.append("ID")
+        # Only the fixed expressions of ``ORDER_BY`` go into the query.
+        query = (
+            f"SELECT * FROM todos ORDER BY {', '.join(order)}"
+            " LIMIT ? OFFSET ?"
+        )
+        try:
+            with closing(self._connect()) as db:
+                rows = db.execute(
+                    query, (-1 if limit is None else limit, offset)
+                ).fetchall()
+        except sqlite3.Error:
+            return DBResponse([], Code.DB_READ_ERROR)
+        with gc_paused():
+            todos = [_as_todo(row) for row in rows]
+        return DBResponse(todos, Code.SUCCESS)
+
+    def query_todos(
+        self,
+        priority: Optional[int] = None,
+        done: Optional[bool] = None,
+        due_from: Optional[str] = None,
+        due_to: Optional[str] = None,
+    ) -> DBResponse:
+        """Reads the todos meeting every condition that is not None.
+
+        Due bounds are inclusive and undated todos never meet them.
+        """
+        conditions = {
+            "Priority = ?": priority,
+            "Done = ?": done,
+            "Due >= ?": due_from,
+            "Due <= ?": due_to,
+        }
+        where = [sql for sql, value in conditions.items() if value is not None]
+        query = "SELECT * FROM todos"
+        if where:
+            # Only the fixed conditions above go into the query; their
+            # values are bound.
+            query += f" WHERE {' AND '.join(where)}"
+        values = [value for value in conditions.values() if value is not None]
+        try:
+            with closing(self._connect()) as db:
+                rows = db.execute(query + " ORDER BY ID", values).fetchall()
+        except sqlite3.Error:
+            return DBResponse([], Code.DB_READ_ERROR)
+        return DBResponse([_as_todo(row) for row in rows], Code.SUCCESS)
+
+    def read_stats(self) -> StatsResponse:
+        """Reads the counts of the todos, grouped by SQLite, which reads
+        them from the indexes on Priority, Due and Done."""
+        try:
+            with closing(self._connect()) as db:
+                counts = db.execute(
+                    "SELECT Priority, Done, COUNT(*) FROM todos"
+                    " GROUP BY Priority, Done"
+                ).fetchall()
+                open_due = db.execute(
+                    "SELECT Due, COUNT(*) FROM todos"
+                    " WHERE Done = 0 AND Due IS NOT NULL GROUP BY Due"
+                ).fetchall()
+        except sqlite3.Error:
+            return StatsResponse(Stats(), Code.DB_READ_ERROR)
+        return StatsResponse(
+            Stats(
+                {(row[0], bool(row[1])): row[2] for row in counts},
+                {row[0]: row[1] for row in open_due},
+            ),
+            Code.SUCCESS,
+        )
+
+    def search_todos(
+        self, query: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions hold every word of ``query``.
+
+        SQLite narrows the rows down with ``LIKE``, which also matches
+        inside words, and the rest is left to ``search.matches``. ``LIKE``
+        only ignores the case of ASCII letters, so other terms are only
+        checked in Python.
+        """
+        terms = set(search.tokenize(query))
+        if not terms:
+            return DBResponse([], Code.SUCCESS)
+        values = [
+            f"%{term}%" for term in terms if all(ord(c) < 128 for c in term)
+        ]
+        query_sql = "SELECT * FROM todos"
+        if values:
+            # The terms themselves are bound, not pasted in.
+            where = " AND ".join(["Description LIKE ?"] * len(values))
+            query_sql += f" WHERE {where}"
+        try:
+            with closing(self._connect()) as db:
+                rows = db.execute(
+                    query_sql + " ORDER BY ID", values
+                ).fetchall()
+        except sqlite3.Error:
+            return DBResponse([], Code.DB_READ_ERROR)
+        todos = [_as_todo(row) for row in rows]
+        todos = [todo for todo in todos if search.matches(todo, terms)]
+        return DBResponse(search.rank(todos, query)[:limit], Code.SUCCESS)
+
+    def match_todos(
+        self, text: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions approximately match ``text``.
+
+        Every row is scored, as there is no trigram index to shortlist
+        them.
+        """
+        try:
+            todos = fuzzy.closest(self.iter_todos(), text)
+        except OSError:
+            return DBResponse([], Code.DB_READ_ERROR)
+        return DBResponse(todos[:limit], Code.SUCCESS)
+
+    def iter_todos(self) -> Iterator[Todo]:
+        """Yields todos straight from a cursor.
+
+        Raises ``OSError`` if the database cannot be read.
+        """
+        try:
+            with closing(self._connect()) as db:
+                for row in db.execute("SELECT * FROM todos ORDER BY ID"):
+                    yield _as_todo(row)
+        except sqlite3.Error as error:
+            raise OSError(str(error)) from error
+
+    def add(
+        self, description: str, priority: int, due: str = None
+    ) -> CurrentTodo:
+        """Add todo."""
+        if self._batch is not None and self._batch.code != Code.SUCCESS:
+            return CurrentTodo({}, self._batch.code)
+        try:
+            with self._session() as db:
+                todo_id = db.execute(
+                    "INSERT INTO todos (Description, Priority, Due) "
+                    "VALUES (?, ?, ?)",
+                    (description, priority, due),
+                ).lastrowid
+        except sqlite3.Error:
+            return self._in_batch(CurrentTodo({}, Code.DB_WRITE_ERROR))
+        todo = Todo(todo_id, description, priority, due)
+        return CurrentTodo(todo, Code.SUCCESS)
+
+    def _fetch(self, db: sqlite3.Connection, todo_id: int) -> CurrentTodo:
+        row = db.execute(
+            "SELECT * FROM todos WHERE ID = ?", (todo_id,)
+        ).fetchone()
+        if row is None:
+            return CurrentTodo({}, Code.ID_ERROR)
+        return CurrentTodo(_as_todo(row), Code.SUCCESS)
+
+    def _mutate(self, statement: str, todo_id: int) -> CurrentTodo:
+        """Runs ``statement`` against an existing todo."""
+        if self._batch is not None and self._batch.code != Code.SUCCESS:
+            return CurrentTodo({}, self._batch.code)
+        try:
+            with self._session() as db:
+                current_todo = self._fetch(db, todo_id)
+                if current_todo.code == Code.SUCCESS:
+                    db.execute(statement, (todo_id,))
+        except sqlite3.Error:
+            current_todo = CurrentTodo({}, Code.DB_WRITE_ERROR)
+        return self._in_batch(current_todo)
+
+    def set_done(self, todo_id: int) -> CurrentTodo:
+        """Set a to-do as done."""
+        current_todo = self._mutate(
+            "UPDATE todos SET Done = 1 WHERE ID = ?", todo_id
+        )
+        if current_todo.code == Code.SUCCESS:
+            current_todo.todo["Done"] = True
+        return current_todo
+
+    def remove(self, todo_id: int) -> CurrentTodo:
+        """Removes todo."""
+        return self._mutate("DELETE FROM todos WHERE ID = ?", todo_id)
+
+    def remove_all(self) -> CurrentTodo:
+        """Removes all todos."""
+        if self._batch is not None and self._batch.code != Code.SUCCESS:
+            return CurrentTodo({}, self._batch.code)
+        try:
+            with self._session() as db:
+                db.execute("DELETE FROM todos")
+        except sqlite3.Error:
+            return self._in_batch(CurrentTodo({}, Code.DB_WRITE_ERROR))
+        return CurrentTodo({}, Code.SUCCESS)
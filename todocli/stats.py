@@ -0,0 +1,168 @@
+"""Counts of the todos for ``todocli stats``, kept next to the database.
+
+The counts are stored with the signature of the database they describe,
+like the secondary indexes, and patched by ``add``, ``set_done``,
+``remove`` and ``remove_all``, so reading them costs the same however many
+todos there are. Any other write leaves them stale and the next read
+rebuilds them from the todos.
+
+Whether a todo is overdue depends on the day it is read, so instead of
+overdue counts the open todos are counted per due date, and a date range
+sums the dates in it. A bitmap of the done IDs tells ``set_done`` and
+``remove`` what state a todo was in before.
+"""
+import marshal
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from todocli.cache import Signature
+from todocli.durability import SIDECAR, atomic_open
+from todocli.indexes import is_marked, mark
+from todocli.return_codes import Code
+from todocli.todo import Todo
+
+STATS_VERSION = 1
+# Every write changes the counts.
+UNCHANGED_BY: Tuple[str, ...] = ()
+
+
+def stats_path(db_path: Path) -> Path:
+    return db_path.parent / f".{db_path.name}.stats"
+
+
+def _bump(counts: Dict[Any, int], key: Any, step: int) -> None:
+    counts[key] = counts.get(key, 0) + step
+    if not counts[key]:
+        del counts[key]
+
+
+class Stats:
+    """Counts of the live todos of a database.
+
+    ``counts`` maps each ``(Priority, Done)`` pair to its number of todos
+    and ``open_due`` each due date to the number of open todos due then.
+    ``done`` is a bitmap with bit ``ID`` set for every done todo.
+    """
+
+    def __init__(
+        self,
+        counts: Optional[Dict[Tuple[int, bool], int]] = None,
+        open_due: Optional[Dict[str, int]] = None,
+        done: bytes = b"",
+    ) -> None:
+        self.counts = counts or {}
+        self.open_due = open_due or {}
+        self.done = bytearray(done)
+
+    @classmethod
+    def build(cls, todos: Sequence[Todo]) -> "Stats":
+        """Counts ``todos``, a field at a time with ``Counter``."""
+        counts = Counter((todo.Priority, todo.Done) for todo in todos)
+        open_due = Counter(
+            todo.Due for todo in todos if todo.Due and not todo.Done
+        )
+        done = bytearray()
+        for todo in todos:
+            if todo.Done:
+                mark(done, todo.ID, True)
+        return cls(dict(counts), dict(open_due), done)
+
+    def add(self, todo: dict) -> None:
+        _bump(self.counts, (todo["Priority"], bool(todo["Done"])), 1)
+        if todo["Done"]:
+            mark(self.done, todo["ID"], True)
+        elif todo["Due"]:
+            _bump(self.open_due, todo["Due"], 1)
+
+    def set_done(self, todo: dict) -> None:
+        if is_marked(self.done, todo["ID"]):
+            return
+        self.remove(todo)
+        self.add(todo)
+
+    def remove(self, todo: dict) -> None:
+        # The bitmap, not the todo, holds the state before the write.
+        was_done = is_marked(self.done, todo["ID"])
+        _bump(self.counts, (todo["Priority"], was_done), -1)
+        if was_done:
+            mark(self.done, todo["ID"], False)
+        elif todo["Due"]:
+            _bump(self.open_due, todo["Due"], -1)
+
+    def remove_all(self, todo: dict) -> None:
+        self.counts, self.open_due = {}, {}
+        self.done = bytearray()
+
+    def apply(self, op: str, todo: dict) -> None:
+        """Applies a successful ``add``, ``set_done``, ``remove`` or
+        ``remove_all``."""
+        getattr(self, op)(todo)
+
+    def count(
+        self, priority: Optional[int] = None, done: Optional[bool] = None
+    ) -> int:
+        """Returns the number of todos with ``priority`` and ``done``, each
+        only if it is not None."""
+        return sum(
+            count
+            for (todo_priority, todo_done), count in self.counts.items()
+            if priority in (None, todo_priority) and done in (None, todo_done)
+        )
+
+    def count_open_due(
+        self, due_from: Optional[str] = None, due_to: Optional[str] = None
+    ) -> int:
+        """Returns the number of open todos due between the inclusive
+        ``%Y-%m-%d`` bounds that are not None."""
+        return sum(
+            count
+            for due, count in self.open_due.items()
+            if (due_from or due) <= due <= (due_to or due)
+        )
+
+    def as_json(self) -> Dict[str, Any]:
+        """Returns the counts, without the bitmap, as JSON can hold them."""
+        counts = [[*key, count] for key, count in self.counts.items()]
+        return {"counts": counts, "open_due": self.open_due}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Stats":
+        counts = {
+            (priority, done): count for priority, done, count in data["counts"]
+        }
+        return cls(counts, data["open_due"])
+
+
+class StatsResponse(NamedTuple):
+    # Empty counts on failure.
+    stats: Stats
+    code: Code
+
+
+def load(db_path: Path, signature: Signature) -> Optional[Stats]:
+    """Returns the stored counts if they describe ``signature``."""
+    try:
+        data = stats_path(db_path).read_bytes()
+        version, stored_signature, *fields = marshal.loads(data)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != STATS_VERSION or tuple(stored_signature) != signature:
+        return None
+    return Stats(*fields)
+
+
+def store(db_path: Path, signature: Signature, stats: Stats) -> None:
+    """Stores ``stats`` as describing the database at ``signature``."""
+    data: Any = (
+        STATS_VERSION,
+        signature,
+        stats.counts,
+        stats.open_due,
+        stats.done,
+    )
+    try:
+        with atomic_open(stats_path(db_path), SIDECAR, "wb") as stored:
+            stored.write(marshal.dumps(data))
+    except (OSError, ValueError):
+        pass
@@ -1,9 +1,49 @@
 import json
+import os
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from importlib import import_module
 from pathlib import Path
-from typing import Any, List, NamedTuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+from todocli import cache, codec
+from todocli.cache import Signature, file_signature, stat_signature
 from todocli.current_todo import CurrentTodo
+from todocli.durability import Durability, atomic_open
+from todocli.locking import LOCK_TIMEOUT, LockTimeout, file_lock, lock_path
 from todocli.return_codes import Code
+from todocli.sorting import select
+from todocli.todo import Todo, from_json, gc_paused
+
+if TYPE_CHECKING:  # pragma: no cover
+    from todocli.stats import StatsResponse
+
+DT_FORMAT = "%Y-%m-%d"
+READ_CHUNK = 64 * 1024
+# Files kept next to the database that ``add``, ``set_done``, ``remove``
+# and ``remove_all`` patch rather than leave to be rebuilt. Each module has
+# ``load``, ``store`` and ``UNCHANGED_BY``, the ops after which ``restamp``
+# only moves it to the new database signature. Like the cache, each stores
+# a layout version, bumped whenever its layout changes, and is written with
+# ``durability.SIDECAR``. They are only imported by a write or a read that
+# uses them, which keeps them out of the CLI's start.
+SIDECARS = ("indexes", "search", "fuzzy", "stats")
+
+
+def sidecar_modules() -> List[Any]:
+    return [import_module(f"todocli.{name}") for name in SIDECARS]
 
 
 class DBResponse(NamedTuple):
@@ -11,87 +51,685 @@ class DBResponse(NamedTuple):
     return_code: Code
 
 
+def live_todos(todos: list) -> Iterator[Todo]:
+    """Yields todos, skipping tombstones left behind by removes."""
+    for todo in todos:
+        if isinstance(todo, Todo):
+            yield todo
+
+
+def index_todos(todos: list) -> Dict[int, int]:
+    """Maps todo IDs to their offset in ``todos``."""
+    index = {}
+    for offset, todo in enumerate(todos):
+        if isinstance(todo, Todo):
+            index[todo.ID] = offset
+    return index
+
+
+class _Window:
+    """A sliding window over a text file, refilled a chunk at a time."""
+
+    def __init__(self, db, chunk_size: int) -> None:
+        self._db = db
+        self._chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> None:
+        chunk = self._db.read(self._chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.pos :] + chunk  # noqa: E203
+        self.pos = 0
+
+    def skip(self, chars: str) -> None:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in chars:
+                self.pos += 1
+            if self.pos < len(self.text) or self.eof:
+                return
+            self.fill()
+
+
+def iter_json_array(db, chunk_size: int = READ_CHUNK) -> Iterator[Any]:
+    """Yields the items of a JSON array as they are decoded.
+
+    Only one chunk of the file and the item being decoded are held in
+    memory. Raises ``json.JSONDecodeError`` on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    window = _Window(db, chunk_size)
+    window.skip(" \t\r\n")
+    if not window.text.startswith("[", window.pos):
+        raise json.JSONDecodeError("Expecting '['", window.text, window.pos)
+    window.pos += 1
+    while True:
+        window.skip(" \t\r\n,")
+        if window.text.startswith("]", window.pos):
+            return
+        try:
+            item, end = decoder.raw_decode(window.text, window.pos)
+        except json.JSONDecodeError:
+            if window.eof:
+                raise
+            end = len(window.text)
+        # A number cut off at the end of a chunk still decodes, so only
+        # trust an item once something follows it.
+        if end < len(window.text) or window.eof:
+            yield item
+            window.pos = end
+        else:
+            window.fill()
+
+
+def find_entry(todos: list, todo_id: int) -> Optional[Todo]:
+    """Finds a todo by ID in a list read with its tombstones.
+
+    Entries are kept in ID order, so this is a binary search.
+    """
+    low, high = 0, len(todos)
+    while low < high:
+        middle = (low + high) // 2
+        entry = todos[middle]
+        entry_id = entry.ID if isinstance(entry, Todo) else entry
+        if entry_id == todo_id:
+            return entry if isinstance(entry, Todo) else None
+        if entry_id < todo_id:
+            low = middle + 1
+        else:
+            high = middle
+    return None
+
+
+def resident_read(func):
+    """Serves reads from memory while the database file is unchanged.
+
+    Only used once ``resident`` is set, by the daemon. Every write made
+    through the manager refreshes the copy, and writes made by other
+    processes change the file's signature so the next read reloads it.
+    """
+
+    @wraps(func)
+    def wrapper(self, include_removed: bool = False) -> DBResponse:
+        if not self.resident:
+            return func(self, include_removed)
+        try:
+            signature = file_signature(self._db_path)
+        except OSError:
+            return DBResponse([], Code.DB_READ_ERROR)
+        if self._resident is None or self._resident[0] != signature:
+            todos, read_error = func(self, include_removed=True)
+            if read_error != Code.SUCCESS:
+                return DBResponse([], read_error)
+            self._resident = (signature, todos)
+        todos = self._resident[1]
+        if not include_removed:
+            todos = list(live_todos(todos))
+        return DBResponse(todos, Code.SUCCESS)
+
+    return wrapper
+
+
+def next_todo_id(todos: list) -> int:
+    """Returns the ID the next added todo gets.
+
+    IDs only ever increase and the last entry is never compacted away, so
+    this is the ID of the last entry plus one.
+    """
+    if not todos:
+        return 1
+    last = todos[-1]
+    if isinstance(last, Todo):
+        return last.ID + 1
+    return last + 1
+
+
+class Batch:
+    """Outcome of the mutations applied inside a transaction.
+
+    ``changed`` is set once a mutation succeeds; a block that changed
+    nothing leaves the database as it was, without a write.
+    """
+
+    def __init__(self, code: Code) -> None:
+        self.code = code
+        self.changed = False
+
+
+def exclusive(func):
+    """Runs a mutation while holding the database's write lock."""
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self._locked() as lock_error:
+            if lock_error != Code.SUCCESS:
+                return CurrentTodo({}, lock_error)
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
 class TodoManager:
     def read_write(func):
+        @exclusive
         def wrapper(self, *args, **kwargs):
-            todos, read_error = self.read_todos()
+            if self._batch is not None:
+                return self._apply_in_batch(func, *args, **kwargs)
+            todos, read_error = self.read_todos(include_removed=True)
             if read_error != Code.SUCCESS:
                 return CurrentTodo({}, read_error)
             self.todos = todos
+            self._index = index_todos(todos)
+            sidecars = self._load_sidecars(func.__name__)
             current_todo = func(self, *args, **kwargs)
             if current_todo.code != Code.SUCCESS:
+                self._remember(None)
                 return current_todo
-            todos, write_error = self._write_todos(todos)
+            todos, write_error = self._write_todos(self.todos)
+            self._remember(self.todos if write_error == Code.SUCCESS else None)
+            if write_error == Code.SUCCESS:
+                self._update_sidecars(sidecars, func.__name__, current_todo)
             self.todos = []
+            self._index = {}
             if write_error != Code.SUCCESS:
                 return CurrentTodo({}, write_error)
             return current_todo
 
         return wrapper
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self,
+        db_path: Path,
+        durability: Optional[Durability] = None,
+        fmt: str = codec.DEFAULT_FORMAT,
+    ) -> None:
         self._db_path = db_path
+        self.durability = durability or Durability()
+        self.fmt = fmt
         self.todos: list = []
+        self._index: Dict[int, int] = {}
+        self._batch: Optional[Batch] = None
+        self.lock_timeout = LOCK_TIMEOUT
+        self._lock_held = False
+        self.resident = False
+        self._resident: Optional[Tuple[Tuple[int, int, int], list]] = None
+
+    def _remember(self, todos: Optional[list]) -> None:
+        """Keeps ``todos`` as the resident copy of the file just written.
+
+        ``None`` drops the copy, e.g. when a failed mutation may have left
+        it half changed.
+        """
+        if not self.resident:
+            return
+        self._resident = None
+        if todos is not None:
+            try:
+                self._resident = (file_signature(self._db_path), todos)
+            except OSError:
+                pass
+
+    def _load_sidecar(self, sidecar: Any) -> Any:
+        """Returns what ``sidecar``, ``indexes`` or ``search``, stored if it
+        matches the database now."""
+        try:
+            return sidecar.load(self._db_path, file_signature(self._db_path))
+        except OSError:
+            return None
+
+    def _store_sidecar(self, sidecar: Any, updated: Any) -> None:
+        """Stores ``updated`` in ``sidecar`` as describing the database
+        now."""
+        try:
+            signature = file_signature(self._db_path)
+        except OSError:
+            return
+        sidecar.store(self._db_path, signature, updated)
+
+    def _load_sidecars(self, op: str) -> Tuple[Optional[Signature], list]:
+        """Returns the database signature and the sidecars ``op`` changes
+        that match it, with their contents.
+
+        Sidecars listing ``op`` in their ``UNCHANGED_BY`` are not read.
+        """
+        try:
+            signature = file_signature(self._db_path)
+        except OSError:
+            return None, []
+        loaded = [
+            (sidecar, sidecar.load(self._db_path, signature))
+            for sidecar in sidecar_modules()
+            if op not in sidecar.UNCHANGED_BY
+        ]
+        return signature, [
+            (sidecar, stored)
+            for sidecar, stored in loaded
+            if stored is not None
+        ]
+
+    def _update_sidecars(
+        self,
+        sidecars: Tuple[Optional[Signature], list],
+        op: str,
+        current_todo: CurrentTodo,
+    ) -> None:
+        """Brings the sidecars that matched the database before a
+        successful ``op`` up to date.
+
+        Those ``op`` leaves unchanged only have their signature replaced.
+        """
+        old_signature, loaded = sidecars
+        try:
+            signature = file_signature(self._db_path)
+        except OSError:
+            return
+        for sidecar in sidecar_modules():
+            if old_signature is not None and op in sidecar.UNCHANGED_BY:
+                sidecar.restamp(self._db_path, old_signature, signature)
+        for sidecar, stored in loaded:
+            stored.apply(op, current_todo.todo)
+            sidecar.store(self._db_path, signature, stored)
+
+    @contextmanager
+    def _locked(self) -> Iterator[Code]:
+        """Holds the write lock for the block and yields whether it was taken.
+
+        The lock is re-entrant within a manager so that a write triggered
+        by another write, or made inside a transaction, does not wait on
+        itself.
+        """
+        if self._lock_held:
+            yield Code.SUCCESS
+            return
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(
+                    file_lock(lock_path(self._db_path), self.lock_timeout)
+                )
+            except LockTimeout:
+                yield Code.LOCK_ERROR
+                return
+            except OSError:
+                yield Code.DB_WRITE_ERROR
+                return
+            self._lock_held = True
+            try:
+                yield Code.SUCCESS
+            finally:
+                self._lock_held = False
+
+    def _apply_in_batch(self, func, *args, **kwargs) -> CurrentTodo:
+        if self._batch.code != Code.SUCCESS:
+            return CurrentTodo({}, self._batch.code)
+        current_todo = func(self, *args, **kwargs)
+        if current_todo.code != Code.SUCCESS:
+            self._batch.code = current_todo.code
+        else:
+            self._batch.changed = True
+        return current_todo
+
+    @contextmanager
+    def transaction(self) -> Iterator[Batch]:
+        """Applies every mutation in the block in one read-write cycle.
+
+        The database is read once on entry and written once on exit, with
+        the write lock held in between, unless no mutation succeeded. If a
+        mutation fails, or the block raises, nothing is written and every
+        later mutation in the block returns the failure code, which is
+        also left on the yielded ``Batch``.
+        """
+        with self._locked() as lock_error:
+            todos, read_error = [], lock_error
+            if lock_error == Code.SUCCESS:
+                todos, read_error = self.read_todos(include_removed=True)
+            self._batch = Batch(read_error)
+            self.todos = todos
+            self._index = index_todos(todos)
+            try:
+                yield self._batch
+                if self._batch.code == Code.SUCCESS and self._batch.changed:
+                    _, self._batch.code = self._write_todos(self.todos)
+                committed = self._batch.code == Code.SUCCESS
+                self._remember(self.todos if committed else None)
+            finally:
+                self._batch = None
+                self.todos = []
+                self._index = {}
+
+    @staticmethod
+    def create(db_path: Path) -> Code:
+        """Creates an empty database."""
+        try:
+            db_path.write_bytes(codec.dumps([]))
+            return Code.SUCCESS
+        except OSError:
+            return Code.DB_INIT_ERROR
 
     def _write_todos(self, todos: list) -> DBResponse:
-        """Writes todos."""
+        """Writes todos to a temporary file renamed over the database."""
         try:
-            with self._db_path.open("w") as db:
-                json.dump(todos, db, indent=4)
-            return DBResponse(todos, Code.SUCCESS)
+            with atomic_open(self._db_path, self.durability, "wb") as db:
+                db.write(codec.dumps(todos, self.fmt))
         except OSError:
             return DBResponse([], Code.DB_WRITE_ERROR)
+        cache.refresh(self._db_path, todos)
+        return DBResponse(todos, Code.SUCCESS)
+
+    def write_entries(self, entries: Iterable[Any]) -> Code:
+        """Replaces the database with ``entries``, encoded as they arrive.
+
+        Used to convert databases, so neither side is held in memory.
+        """
+        try:
+            with atomic_open(self._db_path, self.durability, "wb") as db:
+                for chunk in codec.iter_array(entries, self.fmt):
+                    db.write(chunk)
+        except OSError:
+            return Code.DB_WRITE_ERROR
+        return Code.SUCCESS
+
+    def copy_to(self, target: "TodoManager") -> Code:
+        """Streams every entry, removed IDs included, into ``target``.
+
+        Writers to this database wait until the copy is done.
+        """
+        with self._locked() as lock_error:
+            if lock_error != Code.SUCCESS:
+                return lock_error
+            try:
+                return target.write_entries(
+                    self.iter_todos(include_removed=True)
+                )
+            except ValueError:
+                return Code.JSON_ERROR
+
+    @resident_read
+    def read_todos(self, include_removed: bool = False) -> DBResponse:
+        """Reads todos, from the cache while the database is unchanged."""
+        try:
+            with self._db_path.open("rb") as db:
+                # The signature of the file actually opened, so a write
+                # renamed into place meanwhile cannot be cached as this one.
+                signature = stat_signature(os.fstat(db.fileno()))
+                todos = cache.load(self._db_path, signature)
+                if todos is None:
+                    try:
+                        with gc_paused():
+                            todos = from_json(codec.loads(db.read()))
+                    except (ValueError, TypeError):
+                        return DBResponse([], Code.JSON_ERROR)
+                    cache.store(self._db_path, signature, todos)
+        except OSError:
+            return DBResponse([], Code.DB_READ_ERROR)
+        if not include_removed:
+            todos = list(live_todos(todos))
+        return DBResponse(todos, Code.SUCCESS)
+
+    def iter_todos(self, include_removed: bool = False) -> Iterator[Any]:
+        """Yields todos one at a time while the database is decoded.
+
+        The cache is not read here: it can only be loaded whole, which
+        would keep every todo in memory at once.
+
+        Raises ``OSError`` if the database cannot be read and
+        ``ValueError`` if it is not valid JSON.
+        """
+        with self._db_path.open("r") as db:
+            for offset, todo in enumerate(iter_json_array(db), start=1):
+                if not isinstance(todo, (int, Todo)):
+                    todo = Todo.from_dict(todo, offset)
+                if isinstance(todo, Todo) or include_removed:
+                    yield todo
 
-    def read_todos(self) -> DBResponse:
-        """Reads todos."""
+    def _cache_current(self) -> bool:
         try:
-            with self._db_path.open("r") as db:
-                try:
-                    return DBResponse(json.load(db), Code.SUCCESS)
-                except json.JSONDecodeError:
-                    return DBResponse([], Code.JSON_ERROR)
+            signature = file_signature(self._db_path)
+        except OSError:
+            return False
+        return cache.is_current(self._db_path, signature)
+
+    def select_todos(
+        self,
+        sort_by: Sequence[str] = (),
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> DBResponse:
+        """Reads one sorted page of todos.
+
+        Pages with a limit are streamed so only the shown todos and the
+        sort heap are kept in memory, unless the todos are resident anyway
+        or the cache is current: loading it whole is faster than decoding
+        the JSON a todo at a time.
+        """
+        if limit is None or self.resident or self._cache_current():
+            todos, read_error = self.read_todos()
+            if read_error != Code.SUCCESS or not (sort_by or offset or limit):
+                return DBResponse(todos, read_error)
+            todos = select(todos, sort_by, offset, limit)
+            return DBResponse(todos, Code.SUCCESS)
+        try:
+            todos = select(self.iter_todos(), sort_by, offset, limit)
         except OSError:
             return DBResponse([], Code.DB_READ_ERROR)
+        except ValueError:
+            return DBResponse([], Code.JSON_ERROR)
+        return DBResponse(todos, Code.SUCCESS)
+
+    def query_todos(
+        self,
+        priority: Optional[int] = None,
+        done: Optional[bool] = None,
+        due_from: Optional[str] = None,
+        due_to: Optional[str] = None,
+    ) -> DBResponse:
+        """Reads the todos meeting every condition that is not None.
+
+        Matching IDs are looked up in the stored indexes, so only those
+        todos are checked, though fetching them still loads the whole
+        database on every engine but the fixed one (see ``_fetch_todos``).
+        Without current indexes the todos are scanned and the indexes
+        rebuilt for the next query. Due bounds are inclusive and undated
+        todos never meet them.
+        """
+        from todocli import indexes
+
+        conditions = (priority, done, due_from, due_to)
+        stored_indexes = self._load_sidecar(indexes)
+        if stored_indexes is not None:
+            todos = self._fetch_todos(stored_indexes.match(*conditions))
+            if todos is not None:
+                # Checked again in case a write landed since the indexes
+                # were loaded.
+                todos = [t for t in todos if indexes.matches(t, *conditions)]
+                return DBResponse(todos, Code.SUCCESS)
+        with self._locked() as lock_error:
+            # Held so that no write lands between reading and indexing.
+            if lock_error != Code.SUCCESS:
+                return DBResponse([], lock_error)
+            todos, read_error = self.read_todos()
+            if read_error != Code.SUCCESS:
+                return DBResponse([], read_error)
+            self._store_sidecar(indexes, indexes.Indexes.build(todos))
+        todos = [todo for todo in todos if indexes.matches(todo, *conditions)]
+        return DBResponse(todos, Code.SUCCESS)
+
+    def search_todos(
+        self, query: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions hold every word of ``query``.
+
+        They are ranked by ``search.rank``. Matching IDs are looked up in
+        the stored inverted index, which is rebuilt from a scan when it
+        does not match the database.
+        """
+        from todocli import search
+
+        terms = set(search.tokenize(query))
+        if not terms:
+            return DBResponse([], Code.SUCCESS)
+        todos, read_error = self._read_indexed(
+            search, search.SearchIndex, lambda index: index.lookup(terms)
+        )
+        if read_error != Code.SUCCESS:
+            return DBResponse([], read_error)
+        todos = [todo for todo in todos if search.matches(todo, terms)]
+        return DBResponse(search.rank(todos, query)[:limit], Code.SUCCESS)
+
+    def match_todos(
+        self, text: str, limit: Optional[int] = None
+    ) -> DBResponse:
+        """Reads the todos whose descriptions approximately match ``text``.
+
+        They come closest first, as ``fuzzy.closest`` orders them, from a
+        shortlist looked up in the stored trigram index.
+        """
+        from todocli import fuzzy
+
+        grams = fuzzy.trigrams(text)
+        if not grams:
+            return DBResponse([], Code.SUCCESS)
+        todos, read_error = self._read_indexed(
+            fuzzy, fuzzy.TrigramIndex, lambda index: index.lookup(grams)
+        )
+        if read_error != Code.SUCCESS:
+            return DBResponse([], read_error)
+        return DBResponse(fuzzy.closest(todos, text)[:limit], Code.SUCCESS)
+
+    def read_stats(self) -> "StatsResponse":
+        """Reads the counts of the todos.
+
+        They come from the stored counts, which are rebuilt from a scan
+        when they do not match the database.
+        """
+        from todocli import stats
+        from todocli.stats import Stats, StatsResponse
+
+        stored_stats = self._load_sidecar(stats)
+        if stored_stats is not None:
+            return StatsResponse(stored_stats, Code.SUCCESS)
+        with self._locked() as lock_error:
+            # Held so that no write lands between reading and counting.
+            if lock_error != Code.SUCCESS:
+                return StatsResponse(Stats(), lock_error)
+            todos, read_error = self.read_todos()
+            if read_error != Code.SUCCESS:
+                return StatsResponse(Stats(), read_error)
+            built = Stats.build(todos)
+            self._store_sidecar(stats, built)
+        return StatsResponse(built, Code.SUCCESS)
+
+    def _read_indexed(
+        self,
+        sidecar: Any,
+        index_class: Any,
+        lookup: Callable[[Any], List[int]],
+    ) -> DBResponse:
+        """Reads the todos whose IDs ``lookup`` finds in ``sidecar``.
+
+        When the stored index does not match the database, it is rebuilt
+        with ``index_class`` from a scan and looked up in instead.
+        """
+        stored_index = self._load_sidecar(sidecar)
+        if stored_index is not None:
+            todos = self._fetch_todos(lookup(stored_index))
+            if todos is not None:
+                return DBResponse(todos, Code.SUCCESS)
+        with self._locked() as lock_error:
+            # Held so that no write lands between reading and indexing.
+            if lock_error != Code.SUCCESS:
+                return DBResponse([], lock_error)
+            todos, read_error = self.read_todos()
+            if read_error != Code.SUCCESS:
+                return DBResponse([], read_error)
+            built = index_class.build(todos)
+            self._store_sidecar(sidecar, built)
+        found = set(lookup(built))
+        return DBResponse(
+            [todo for todo in todos if todo["ID"] in found], Code.SUCCESS
+        )
+
+    def _fetch_todos(self, todo_ids: List[int]) -> Optional[List[Todo]]:
+        """Returns the todos with ``todo_ids``, or None if any is missing.
+
+        JSON has no record offsets to seek to, so this still decodes the
+        whole database, or loads it whole from the cache, and then
+        bisects the entry list. An index lookup here only saves checking
+        every todo against the query; reading just the matching records
+        takes the fixed engine's memory map.
+
+        The database may have changed since its indexes were loaded, in
+        which case the caller falls back to a scan.
+        """
+        todos, read_error = self.read_todos(include_removed=True)
+        if read_error != Code.SUCCESS:
+            return None
+        found = [find_entry(todos, todo_id) for todo_id in todo_ids]
+        return None if None in found else found
+
+    def _compact(self) -> None:
+        """Drops tombstones once they outnumber the live todos.
+
+        The last entry is kept so that IDs are never handed out twice.
+        """
+        if len(self.todos) - len(self._index) <= len(self._index):
+            return
+        last = self.todos[-1]
+        self.todos = [
+            todo for todo in self.todos[:-1] if isinstance(todo, Todo)
+        ]
+        self.todos.append(last)
+        self._index = index_todos(self.todos)
 
     @read_write  # type: ignore
     def add(
         self, description: str, priority: int, due: str = None
     ) -> CurrentTodo:
         """Add todo."""
-        todo_json = {
-            "Description": description,
-            "Priority": priority,
-            "Due": due,
-            "Done": False,
-        }
-        self.todos.append(todo_json)
-        return CurrentTodo(
-            todo_json,
-            Code.SUCCESS,
-        )
+        todo = Todo(next_todo_id(self.todos), description, priority, due)
+        self._index[todo.ID] = len(self.todos)
+        self.todos.append(todo)
+        return CurrentTodo(todo, Code.SUCCESS)
 
     @read_write  # type: ignore
     def set_done(self, todo_id: int) -> CurrentTodo:
         """Set a to-do as done."""
-        try:
-            todo = self.todos[todo_id - 1]
-        except IndexError:
+        offset = self._index.get(todo_id)
+        if offset is None:
             return CurrentTodo({}, Code.ID_ERROR)
+        todo = self.todos[offset]
         todo["Done"] = True
         return CurrentTodo(todo, Code.SUCCESS)
 
     @read_write  # type: ignore
     def remove(self, todo_id: int) -> CurrentTodo:
-        """Removes todo."""
-        try:
-            todo = self.todos.pop(todo_id - 1)
-        except IndexError:
+        """Removes todo, leaving its ID behind as a tombstone."""
+        offset = self._index.pop(todo_id, None)
+        if offset is None:
             return CurrentTodo({}, Code.ID_ERROR)
+        todo = self.todos[offset]
+        self.todos[offset] = todo_id
+        self._compact()
         return CurrentTodo(todo, Code.SUCCESS)
 
+    def _clear(self) -> CurrentTodo:
+        last_id = next_todo_id(self.todos) - 1
+        self.todos = [last_id] if last_id else []
+        self._index = {}
+        return CurrentTodo({}, Code.SUCCESS)
+
+    @exclusive
     def remove_all(self) -> CurrentTodo:
-        """Removes all todos."""
-        _, write_error = self._write_todos([])
+        """Removes all todos, keeping a tombstone for the last ID."""
+        if self._batch is not None:
+            return self._apply_in_batch(TodoManager._clear)
+        todos, read_error = self.read_todos(include_removed=True)
+        last_id = next_todo_id(todos) - 1 if read_error == Code.SUCCESS else 0
+        sidecars = self._load_sidecars("remove_all")
+        todos, write_error = self._write_todos([last_id] if last_id else [])
+        self._remember(todos if write_error == Code.SUCCESS else None)
         if write_error != Code.SUCCESS:
             return CurrentTodo({}, write_error)
-        return CurrentTodo({}, Code.SUCCESS)
+        current_todo = CurrentTodo({}, Code.SUCCESS)
+        self._update_sidecars(sidecars, "remove_all", current_todo)
+        return current_todo
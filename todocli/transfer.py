@@ -0,0 +1,123 @@
+"""Streaming readers and writers for moving todos in and out in bulk."""
+import json
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, List, Optional, Tuple
+
+from todocli.sorting import FIELDS
+from todocli.todo import Todo
+from todocli.todo_manager import DT_FORMAT
+
+IMPORT_FORMATS = ("csv", "ndjson")
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+
+NewTodo = Tuple[str, int, Optional[str]]
+
+
+def guess_format(file_name: str) -> str:
+    """Picks a format from a file extension, defaulting to NDJSON."""
+    return "csv" if file_name.lower().endswith(".csv") else "ndjson"
+
+
+def _rows(stream: IO[str], fmt: str) -> Iterator[Any]:
+    """Yields CSV rows as dicts and NDJSON rows as undecoded lines."""
+    if fmt == "csv":
+        import csv
+
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def _parse_priority(priority: Any) -> int:
+    if priority in (None, ""):
+        return 2
+    try:
+        priority = int(priority)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid Priority {priority!r}") from None
+    if not 1 <= priority <= 3:
+        raise ValueError(f"Priority {priority} is not in the range 1 to 3")
+    return priority
+
+
+def _parse_due(due: Any) -> Optional[str]:
+    if due in (None, ""):
+        return None
+    try:
+        parsed = datetime.strptime(due, DT_FORMAT)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"invalid Due {due!r}, expected {DT_FORMAT}"
+        ) from None
+    # strptime also accepts unpadded dates such as 2024-1-5, which the
+    # sorting and the binary engines read by position.
+    return parsed.strftime(DT_FORMAT)
+
+
+def parse_row(row: Any) -> NewTodo:
+    """Validates a raw row and returns the arguments for ``add``."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"invalid JSON ({error.msg})") from None
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    description = row.get("Description")
+    if not description:
+        raise ValueError("missing Description")
+    return (
+        str(description),
+        _parse_priority(row.get("Priority")),
+        _parse_due(row.get("Due")),
+    )
+
+
+def read_new_todos(stream: IO[str], fmt: str) -> Iterator[NewTodo]:
+    """Lazily yields validated todos from a CSV or NDJSON stream.
+
+    Raises ``ValueError`` naming the offending row on the first invalid
+    one.
+    """
+    for row_number, row in enumerate(_rows(stream, fmt), start=1):
+        try:
+            todo = parse_row(row)
+        except ValueError as error:
+            raise ValueError(f"row {row_number}: {error}") from None
+        yield todo
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Splits ``items`` into lists of at most ``size`` items."""
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def write_todos(todos: Iterable[Todo], stream: IO[str], fmt: str) -> int:
+    """Writes todos to ``stream`` as they arrive and returns the count."""
+    count = 0
+    if fmt == "csv":
+        import csv
+
+        writer = csv.DictWriter(stream, FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for count, todo in enumerate(todos, start=1):
+            writer.writerow(dict(todo))
+        return count
+    if fmt == "json":
+        stream.write("[")
+    for count, todo in enumerate(todos, start=1):
+        if fmt == "json" and count > 1:
+            stream.write(",")
+        stream.write(json.dumps(dict(todo)))
+        if fmt == "ndjson":
+            stream.write("\n")
+    if fmt == "json":
+        stream.write("]\n")
+    return count
@@ -0,0 +1,293 @@
+"""The ``--where`` filter language.
+
+An expression compares fields with values and combines the comparisons
+with ``and``, ``or``, ``not`` and parentheses::
+
+    priority <= 2 and not done and due < 2026-11-01
+    description ~ "milk" or (due = none and priority = 1)
+
+Fields are ``id``, ``description``, ``priority``, ``due`` and ``done``,
+in any case. Values are integers, ``YYYY-MM-DD`` dates, quoted strings,
+``true``, ``false`` and ``none``. ``~`` matches descriptions containing a
+string, ignoring case, a bare ``done`` means ``done = true`` and undated
+todos never meet an ordering on ``due``.
+
+An expression is parsed once and compiled into a single Python function.
+The comparisons that must hold for any match and that the secondary
+indexes can answer are also kept as ``query_todos`` arguments, so that
+only the todos they select are checked.
+"""
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from todocli.current_todo import CurrentTodo
+from todocli.return_codes import Code
+from todocli.sorting import date_ordinal
+from todocli.todo_manager import DBResponse
+
+FIELDS = {
+    "id": "ID",
+    "description": "Description",
+    "priority": "Priority",
+    "due": "Due",
+    "done": "Done",
+}
+OPERATORS = ("=", "==", "!=", "<", "<=", ">", ">=", "~")
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<date>\d{4}-\d{2}-\d{2})
+        |(?P<int>\d+)
+        |(?P<string>"[^"]*"|'[^']*')
+        |(?P<symbol><=|>=|!=|==|=|<|>|~|\(|\))
+        |(?P<word>[A-Za-z_]+)
+    )""",
+    re.VERBOSE,
+)
+_CONSTANTS = {"true": True, "false": False, "none": None, "null": None}
+# The type a field's values must have, None being allowed for Due only.
+_TYPES = {"ID": int, "Description": str, "Priority": int, "Due": date}
+
+Node = Tuple[Any, ...]
+
+
+class Where(NamedTuple):
+    predicate: Callable[[dict], bool]
+    query: Dict[str, Any]
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"unexpected {text[position:].strip()!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """A recursive descent parser producing tuples as syntax tree nodes."""
+
+    def __init__(self, text: str) -> None:
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> Tuple[str, str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return ("end", "")
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] == "end":
+            raise ValueError("unexpected end of expression")
+        self.position += 1
+        return token
+
+    def keyword(self, word: str) -> bool:
+        kind, text = self.peek()
+        if kind == "word" and text.lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Node:
+        node = self.either()
+        if self.peek()[0] != "end":
+            raise ValueError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def either(self) -> Node:
+        nodes = [self.both()]
+        while self.keyword("or"):
+            nodes.append(self.both())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def both(self) -> Node:
+        nodes = [self.negation()]
+        while self.keyword("and"):
+            nodes.append(self.negation())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def negation(self) -> Node:
+        if self.keyword("not"):
+            return ("not", self.negation())
+        if self.peek() == ("symbol", "("):
+            self.take()
+            node = self.either()
+            if self.take() != ("symbol", ")"):
+                raise ValueError("expected ')'")
+            return node
+        return self.comparison()
+
+    def comparison(self) -> Node:
+        kind, text = self.take()
+        field = FIELDS.get(text.lower()) if kind == "word" else None
+        if field is None:
+            raise ValueError(
+                f"unknown field {text!r}, try {', '.join(FIELDS)}"
+            )
+        if self.peek()[0] != "symbol" or self.peek()[1] in "()":
+            if field != "Done":
+                raise ValueError(f"{text} needs a comparison")
+            return ("cmp", field, "==", True)
+        operator = self.take()[1]
+        return _checked(field, operator, self.value())
+
+    def value(self) -> Any:
+        kind, text = self.take()
+        if kind == "int":
+            return int(text)
+        if kind == "date":
+            return date.fromordinal(date_ordinal(text))
+        if kind == "string":
+            return text[1:-1]
+        if kind == "word" and text.lower() in _CONSTANTS:
+            return _CONSTANTS[text.lower()]
+        raise ValueError(f"expected a value, got {text!r}")
+
+
+def _checked(field: str, operator: str, value: Any) -> Node:
+    """Returns a comparison node, if the operator and value suit the field."""
+    if field == "Done" or value is None:
+        valid = operator in ("=", "==", "!=") and (
+            isinstance(value, bool) if field == "Done" else field == "Due"
+        )
+    elif operator == "~":
+        valid = field == "Description" and isinstance(value, str)
+    else:
+        valid = isinstance(value, _TYPES[field]) and not isinstance(
+            value, bool
+        )
+    if not valid:
+        raise ValueError(
+            f"cannot compare {field} {operator} {value!r}".replace(
+                "datetime.date", "date"
+            )
+        )
+    if isinstance(value, date):
+        value = value.isoformat()
+    return ("cmp", field, "==" if operator == "=" else operator, value)
+
+
+def _source(node: Node, values: list) -> str:
+    """Writes a node as Python, with its values bound as ``_v<n>``."""
+    kind = node[0]
+    if kind in ("and", "or"):
+        parts = [_source(child, values) for child in node[1]]
+        return "(" + f" {kind} ".join(parts) + ")"
+    if kind == "not":
+        return f"(not {_source(node[1], values)})"
+    _, field, operator, value = node
+    name = f"_v{len(values)}"
+    column = f"todo[{field!r}]"
+    if operator == "~":
+        values.append(value.lower())
+        return f"({name} in {column}.lower())"
+    values.append(value)
+    if value is None:
+        return f"({column} {'is' if operator == '==' else 'is not'} None)"
+    if field == "Due" and operator not in ("==", "!="):
+        return f"({column} is not None and {column} {operator} {name})"
+    return f"({column} {operator} {name})"
+
+
+def _query(node: Node) -> Dict[str, Any]:
+    """Returns ``query_todos`` arguments every match must meet."""
+    conjuncts = node[1] if node[0] == "and" else [node]
+    query: Dict[str, Any] = {}
+    for conjunct in conjuncts:
+        negated = conjunct[0] == "not"
+        if negated:
+            conjunct = conjunct[1]
+        if conjunct[0] != "cmp":
+            continue
+        _, field, operator, value = conjunct
+        if field == "Done" and operator in ("==", "!="):
+            query["done"] = (
+                value != negated if operator == "==" else (value == negated)
+            )
+        elif negated or value is None:
+            continue
+        elif field == "Priority" and operator == "==":
+            query["priority"] = value
+        elif field == "Due" and operator in ("==", ">=", ">", "<=", "<"):
+            query.update(_due_bounds(operator, value))
+    return query
+
+
+def _due_bounds(operator: str, value: str) -> Dict[str, str]:
+    day = date.fromordinal(date_ordinal(value))
+    if operator == ">":
+        return {"due_from": (day + timedelta(days=1)).isoformat()}
+    if operator == "<":
+        return {"due_to": (day - timedelta(days=1)).isoformat()}
+    bounds = {}
+    if operator in ("==", ">="):
+        bounds["due_from"] = value
+    if operator in ("==", "<="):
+        bounds["due_to"] = value
+    return bounds
+
+
+def parse_where(text: str) -> Where:
+    """Compiles a ``--where`` expression.
+
+    Raises ``ValueError`` describing the first problem in ``text``.
+    """
+    node = _Parser(text).parse()
+    values: list = []
+    source = _source(node, values)
+    # The source is built by the parser from a fixed set of operators and
+    # field names. The values are bound as globals of the function, never
+    # pasted into its source, and nothing else is reachable from it.
+    namespace: Dict[str, Any] = {"__builtins__": {}}
+    namespace.update(
+        (f"_v{index}", value) for index, value in enumerate(values)
+    )
+    predicate = eval(f"lambda todo: {source}", namespace)
+    return Where(predicate, _query(node))
+
+
+def not_done(where: Where) -> Where:
+    """Narrows ``where`` to the todos that are not done yet."""
+    predicate = where.predicate
+    return Where(
+        lambda todo: not todo["Done"] and predicate(todo),
+        {**where.query, "done": False},
+    )
+
+
+def matching_todos(manager, where: Where) -> DBResponse:
+    """Reads the todos matching ``where``, through the indexes if it can."""
+    if where.query:
+        todos, read_error = manager.query_todos(**where.query)
+    else:
+        todos, read_error = manager.read_todos()
+    if read_error != Code.SUCCESS:
+        return DBResponse([], read_error)
+    return DBResponse([*filter(where.predicate, todos)], Code.SUCCESS)
+
+
+def apply_where(manager, where: Where, op: str) -> DBResponse:
+    """Calls ``op``, e.g. ``set_done``, on every todo matching ``where``.
+
+    Runs in one transaction, so either every match changes or, if any
+    call fails, none does. Returns the todos as ``op`` returned them.
+    """
+    changed: List[dict] = []
+    with manager.transaction() as batch:
+        todos, read_error = matching_todos(manager, where)
+        if read_error != Code.SUCCESS:
+            batch.code = read_error
+        for todo in todos if batch.code == Code.SUCCESS else ():
+            current_todo: CurrentTodo = getattr(manager, op)(todo["ID"])
+            changed.append(current_todo.todo)
+    if batch.code != Code.SUCCESS:
+        return DBResponse([], batch.code)
+    return DBResponse(changed, Code.SUCCESS)